@@ -0,0 +1,114 @@
+"""
+MiniMax 长连接客户端基准：每次新建连接 (requests.post) vs 连接池 (httpx.Client)
+
+本地起一个模拟 chat_completion_v2 的桩服务，每个新 TCP 连接额外延迟
+--handshake-ms 毫秒，模拟公网 TCP + TLS 握手的往返开销（本地回环本身几乎为零）。
+分别统计单请求延迟分位数，以及服务端看到的连接数。
+
+用法:
+    uv run python scripts/bench_llm_http.py [请求数] [--handshake-ms 40] [--server-ms 5]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import requests
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.llm.manager import MiniMaxProvider
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handshake_ms: float, server_ms: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.handshake = handshake_ms / 1000
+        self.latency = server_ms / 1000
+        self.connections = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    disable_nagle_algorithm = True  # 头与正文分两次写出，避免与延迟 ACK 叠加出 40ms 停顿
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+        time.sleep(self.server.handshake)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.latency)
+        out = json.dumps({
+            "choices": [{"message": {"content": f"echo: {body['messages'][-1]['content']}"}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def report(name: str, latencies: list[float], connections: int) -> None:
+    ms = np.array(latencies) * 1000
+    print(
+        f"{name:<22} mean={ms.mean():7.2f}ms  p50={np.percentile(ms, 50):7.2f}ms  "
+        f"p95={np.percentile(ms, 95):7.2f}ms  连接数={connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", nargs="?", type=int, default=200, help="请求数")
+    parser.add_argument("--handshake-ms", type=float, default=40, help="模拟的新连接握手开销")
+    parser.add_argument("--server-ms", type=float, default=5, help="模拟的服务端处理时间")
+    args = parser.parse_args()
+
+    server = StubServer(args.handshake_ms, args.server_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"桩服务: {base_url}, 请求数: {args.n}, 握手 {args.handshake_ms}ms\n")
+
+    provider = MiniMaxProvider(api_key="bench", base_url=base_url)
+    payload = provider._payload("你是一个助手", "你好")
+
+    # 旧实现：每次请求新建连接
+    server.connections = 0
+    latencies = []
+    for _ in range(args.n):
+        start = time.perf_counter()
+        resp = requests.post(
+            f"{base_url}/chat_completion_v2", headers=provider.headers, json=payload
+        )
+        provider._parse_response(resp)
+        latencies.append(time.perf_counter() - start)
+    report("requests.post", latencies, server.connections)
+    baseline = float(np.mean(latencies))
+
+    # 新实现：provider 持有的连接池客户端
+    server.connections = 0
+    latencies = []
+    for _ in range(args.n):
+        start = time.perf_counter()
+        provider.complete("你是一个助手", "你好")
+        latencies.append(time.perf_counter() - start)
+    report("httpx.Client (pooled)", latencies, server.connections)
+
+    saved = (baseline - float(np.mean(latencies))) * 1000
+    print(f"\n每请求节省: {saved:.2f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
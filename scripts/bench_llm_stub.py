@@ -0,0 +1,234 @@
+"""
+LLM 调用链压测：在本地桩服务（src/models/llm/stub_server.py）上运行 LLMManager
+
+不产生费用、不需要网络，结果可复现（固定 --seed）。场景:
+    complete  逐个调用，统计延迟分位数
+    batch     complete_batch 并发调用，统计吞吐与服务端最大并发
+    stream    流式调用，统计首 token 时间（TTFT）
+    throttle  服务端 RPM 配额 + 随机 429，统计重试后的成功率与限流器等待
+    dedupe    相同提示词并发调用，对比服务端实际收到的请求数（single-flight 合并）
+    parse     逐篇 vs 打包解析数据库中的文章（需加 --parse，会写入解析结果）
+
+压测调用不读写响应缓存；除 parse 场景（解析模块自行创建 LLMManager）外不写入遥测账本。
+
+用法:
+    uv run python scripts/bench_llm_stub.py [请求数] [--engine deepseek] [--latency lognormal:0.3,0.4]
+        [--tps 200] [--rpm 120] [--rate-limit 0.1] [--only batch,stream] [--parse]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.llm.manager import LLMManager
+from src.models.llm.rate_limit import TokenBucket
+from src.models.llm.stub_server import StubConfig, StubLLMServer, start_stub
+
+SCENARIOS = ("complete", "batch", "stream", "throttle", "dedupe", "parse")
+
+SYSTEM_PROMPT = "你是一个新闻编辑助手。"
+
+
+def make_llm(engine: str, server: StubLLMServer) -> LLMManager:
+    llm = LLMManager(engine, cache=False, base_url=server.base_url)
+    for provider in llm.router.providers:
+        provider.ledger = None
+    return llm
+
+
+def report(name: str, latencies: list[float], elapsed: float | None = None) -> None:
+    arr = np.array(latencies) * 1000
+    line = (
+        f"{name:<10} n={len(arr):4d}  p50={np.percentile(arr, 50):7.1f}ms  "
+        f"p95={np.percentile(arr, 95):7.1f}ms  max={arr.max():7.1f}ms"
+    )
+    if elapsed:
+        line += f"  吞吐={len(arr) / elapsed:6.2f} 次/s"
+    print(line)
+
+
+def server_delta(server: StubLLMServer, before: dict) -> str:
+    after = server.stats()
+    return (
+        f"服务端: 请求={after['requests'] - before['requests']}  "
+        f"429={after['throttled'] - before['throttled']}  最大并发={after['max_inflight']}"
+    )
+
+
+def prompt(i: int) -> str:
+    return f"请用三句话概述第 {i} 条新闻的要点。"
+
+
+# ============ 场景 ============
+
+def bench_complete(llm: LLMManager, server: StubLLMServer, n: int) -> None:
+    before = server.stats()
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        llm.complete(SYSTEM_PROMPT, prompt(i))
+        latencies.append(time.perf_counter() - start)
+    report("complete", latencies)
+    print(f"           {server_delta(server, before)}")
+
+
+def bench_batch(llm: LLMManager, server: StubLLMServer, n: int) -> None:
+    before = server.stats()
+
+    async def timed(i: int) -> float:
+        start = time.perf_counter()
+        await llm.acomplete(SYSTEM_PROMPT, prompt(i))
+        return time.perf_counter() - start
+
+    async def run() -> list[float]:
+        return list(await asyncio.gather(*(timed(i) for i in range(n))))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run())
+    report("batch", latencies, time.perf_counter() - start)
+    print(f"           {server_delta(server, before)}")
+
+
+def bench_stream(llm: LLMManager, server: StubLLMServer, n: int) -> None:
+    ttfts, totals = [], []
+    for i in range(n):
+        start = time.perf_counter()
+        first = None
+        for _ in llm.stream(SYSTEM_PROMPT, prompt(i)):
+            if first is None:
+                first = time.perf_counter() - start
+        ttfts.append(first or 0.0)
+        totals.append(time.perf_counter() - start)
+    report("ttft", ttfts)
+    report("stream", totals)
+
+
+def bench_throttle(llm: LLMManager, server: StubLLMServer, n: int) -> None:
+    before = server.stats()
+    limiter = llm.provider.limiter
+    limiter_before = limiter.stats()
+
+    start = time.perf_counter()
+    try:
+        results = llm.complete_batch(SYSTEM_PROMPT, [prompt(i) for i in range(n)])
+        ok = sum(1 for r in results if r)
+    except Exception as e:
+        ok = 0
+        print(f"throttle   失败: {type(e).__name__}: {e}")
+    elapsed = time.perf_counter() - start
+
+    print(f"throttle   n={n:4d}  成功={ok}  耗时={elapsed:6.1f}s  {server_delta(server, before)}")
+    print(f"           限流器: 之前 {limiter_before}\n                   之后 {limiter.stats()}")
+
+
+def bench_dedupe(llm: LLMManager, server: StubLLMServer, n: int) -> None:
+    before = server.stats()
+    flight_before = llm.singleflight_stats()
+
+    async def run() -> list[str]:
+        same = prompt(0)
+        return list(await asyncio.gather(*(llm.acomplete(SYSTEM_PROMPT, same) for _ in range(n))))
+
+    results = asyncio.run(run())
+    flight = llm.singleflight_stats()
+    print(
+        f"dedupe     n={n:4d}  相同结果={len(set(results)) == 1}  "
+        f"合并={flight['saved'] - flight_before['saved']}  {server_delta(server, before)}"
+    )
+
+
+def bench_parse(server: StubLLMServer, n: int, pack_size: int) -> None:
+    from src.agents import article_parser_langgraph as parser
+    from src.storage import get_db
+
+    articles = get_db().get_articles(limit=n)
+    if not articles:
+        print("parse      数据库中没有文章")
+        return
+    article_ids = [a.id for a in articles]
+
+    for name, parse in (
+        ("逐篇", parser.parse_batch),
+        (f"打包x{pack_size}", lambda ids: parser.parse_packed(ids, pack_size)),
+    ):
+        before = server.stats()
+        start = time.perf_counter()
+        results = parse(article_ids)
+        elapsed = time.perf_counter() - start
+        completed = sum(1 for r in results if r["status"] == "completed")
+        print(
+            f"parse {name:<6} 耗时={elapsed:6.1f}s  吞吐={len(article_ids) / elapsed:6.2f} 篇/s  "
+            f"成功={completed}/{len(article_ids)}  {server_delta(server, before)}"
+        )
+
+
+BENCHES = {
+    "complete": bench_complete,
+    "batch": bench_batch,
+    "stream": bench_stream,
+    "dedupe": bench_dedupe,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", nargs="?", type=int, default=50, help="每个场景的请求数")
+    parser.add_argument("--engine", default="deepseek", help="provider（决定接口风格: minimax / 其他为 OpenAI）")
+    parser.add_argument("--latency", default="lognormal:0.3,0.4", help="桩服务首 token 延迟分布")
+    parser.add_argument("--tps", type=float, default=200, help="桩服务输出速度（token/s）")
+    parser.add_argument("--tokens", type=int, default=100, help="桩服务平均输出长度（token）")
+    parser.add_argument("--rpm", type=int, default=120, help="throttle 场景的服务端 RPM 配额")
+    parser.add_argument("--rate-limit", type=float, default=0.1, help="throttle 场景的随机 429 概率")
+    parser.add_argument("--only", default="", help="只运行指定场景，逗号分隔")
+    parser.add_argument("--parse", action="store_true", help="运行 parse 场景（写入数据库）")
+    parser.add_argument("--pack", type=int, default=8, help="parse 场景的打包篇数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    selected = [s.strip() for s in args.only.split(",") if s.strip()] or [
+        s for s in SCENARIOS if s != "parse" or args.parse
+    ]
+    unknown = [s for s in selected if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}，可选 {', '.join(SCENARIOS)}")
+
+    config = StubConfig(
+        port=0,
+        latency=args.latency,
+        tps=args.tps,
+        completion_tokens=args.tokens,
+        seed=args.seed,
+    )
+    server = start_stub(config)
+    print(f"桩服务: {server.base_url}  延迟={args.latency}  tps={args.tps}\n")
+    try:
+        llm = make_llm(args.engine, server)
+        for scenario in selected:
+            if scenario == "throttle":
+                # 限流参数只在本场景生效
+                server.config.rate_limit = args.rate_limit
+                server.bucket = TokenBucket(args.rpm) if args.rpm > 0 else None
+                bench_throttle(llm, server, args.n)
+                server.config.rate_limit = 0.0
+                server.bucket = None
+            elif scenario == "parse":
+                # 解析模块自行创建 LLMManager，通过环境变量指向桩服务
+                os.environ["LLM_BASE_URL"] = server.base_url
+                bench_parse(server, args.n, args.pack)
+            else:
+                BENCHES[scenario](llm, server, args.n)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"\n服务端合计: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
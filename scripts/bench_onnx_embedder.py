@@ -0,0 +1,104 @@
+"""
+ONNX 嵌入推理基准：与 PyTorch fp32 的一致性 + 各批大小吞吐
+
+一致性：同一批文本分别用 fp32 SentenceTransformer 与 ONNX 编码，
+统计逐条余弦相似度（均值 / 最小值 / P1），以及 top-10 近邻重合率。
+
+用法:
+    uv sync --extra onnx
+    uv run python scripts/bench_onnx_embedder.py [样本数] [--runtime onnx-int8]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import load_config
+from src.storage import get_db
+from src.storage.vector_store import get_embedder
+
+BATCH_SIZES = [1, 8, 32, 64, 128]
+FALLBACK_TEXTS = [
+    "OpenAI 发布新一代推理模型，数学与代码能力显著提升",
+    "英伟达财报超预期，数据中心业务收入同比大涨",
+    "自动驾驶公司完成新一轮融资，估值超百亿美元",
+    "Apple announces new on-device AI features for iPhone",
+    "欧盟人工智能法案正式生效，高风险系统需备案",
+    "国产大模型开源权重，多项基准追平闭源模型",
+    "Robotics startup unveils humanoid robot for warehouse logistics",
+    "芯片出口管制升级，多家厂商调整供应链布局",
+]
+
+
+def load_texts(n: int) -> list[str]:
+    """从文章库取样本文本，库为空时使用内置样例"""
+    texts: list[str] = []
+    for page in get_db().iter_articles(batch_size=min(n, 1000)):
+        texts.extend(f"{a.title}\n\n{a.summary}" for a in page)
+        if len(texts) >= n:
+            break
+    if not texts:
+        texts = FALLBACK_TEXTS
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def normalize(v: np.ndarray) -> np.ndarray:
+    return v / np.clip(np.linalg.norm(v, axis=1, keepdims=True), 1e-12, None)
+
+
+def agreement(reference: np.ndarray, candidate: np.ndarray) -> None:
+    ref, cand = normalize(reference), normalize(candidate)
+    cos = (ref * cand).sum(axis=1)
+    print(
+        f"余弦一致性: mean={cos.mean():.5f}  min={cos.min():.5f}  "
+        f"p1={np.percentile(cos, 1):.5f}"
+    )
+
+    k = min(10, len(ref) - 1)
+    if k < 1:
+        return
+    top_ref = np.argsort(-(ref @ ref.T), axis=1)[:, 1:k + 1]
+    top_cand = np.argsort(-(cand @ cand.T), axis=1)[:, 1:k + 1]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(top_ref, top_cand)])
+    print(f"top-{k} 近邻重合率: {overlap:.3f}")
+
+
+def throughput(name: str, embedder, texts: list[str]) -> None:
+    embedder.encode(texts[:8], batch_size=8)  # 预热
+    cells = []
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        embedder.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        cells.append(f"bs={batch_size}: {len(texts) / elapsed:7.1f}")
+    print(f"{name:<10} 句/秒  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", nargs="?", type=int, default=512, help="样本数")
+    parser.add_argument("--runtime", default="onnx-int8", choices=["onnx", "onnx-int8"])
+    args = parser.parse_args()
+
+    config = load_config().vector_db
+    texts = load_texts(args.n)
+    print(f"模型: {config.embedding_model}, 样本数: {len(texts)}")
+
+    fp32 = get_embedder(config.embedding_model, "torch")
+    onnx = get_embedder(config.embedding_model, args.runtime, config.onnx_dir)
+
+    agreement(
+        np.asarray(fp32.encode(texts, batch_size=64)),
+        np.asarray(onnx.encode(texts, batch_size=64)),
+    )
+    throughput("torch", fp32, texts)
+    throughput(args.runtime, onnx, texts)
+
+
+if __name__ == "__main__":
+    main()
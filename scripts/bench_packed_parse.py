@@ -0,0 +1,118 @@
+"""
+文章解析成本基准：逐篇调用 (parse_batch) vs 打包调用 (parse_packed)
+
+默认只做离线估算：对数据库中最近的文章，按当前 provider 的分词计数统计两种方式的
+调用次数与输入 / 输出 token，并按单价折算费用。加 --live 时实际调用 LLM，
+分别计时并统计吞吐（会写入解析结果，两次运行的结果互相覆盖）。
+打包模式的单篇输入上限（PACK_ARTICLE_MAX_TOKENS）低于逐篇模式，输入 token 的差异也包含这部分。
+
+用法:
+    uv run python scripts/bench_packed_parse.py [文章数] [--pack 8] [--input-price 2] [--output-price 8] [--live]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.article_parser_langgraph import (
+    PACK_ITEM_OUTPUT_TOKENS,
+    PACKED_SYSTEM_PROMPT,
+    PARSE_MAX_INPUT_TOKENS,
+    PARSE_OUTPUT_TOKENS,
+    PARSE_PROMPT,
+    _article_sections,
+    build_packs,
+    get_llm,
+    parse_batch,
+    parse_packed,
+)
+from src.storage import get_db
+
+
+def estimate(articles: list, pack_size: int) -> tuple[dict, dict]:
+    """两种方式的 (调用次数, 输入 token, 输出 token) 估算"""
+    llm = get_llm()
+    counter = llm.provider.counter
+
+    budget = llm.budget(output_tokens=PARSE_OUTPUT_TOKENS, max_input_tokens=PARSE_MAX_INPUT_TOKENS)
+    single_input = 0
+    for article in articles:
+        fitted = budget.fit(_article_sections(article), PARSE_PROMPT)
+        single_input += counter.count(PARSE_PROMPT.format(**fitted))
+
+    packs = build_packs(articles, pack_size)
+    system_tokens = counter.count(PACKED_SYSTEM_PROMPT)
+    packed_input = sum(
+        system_tokens + counter.count("\n".join(block for _, block in pack)) for pack in packs
+    )
+
+    # 输出按每篇结果的 JSON 长度估计，打包时每篇多出 id 键
+    single = {
+        "calls": len(articles),
+        "input": single_input,
+        "output": len(articles) * PACK_ITEM_OUTPUT_TOKENS // 2,
+    }
+    packed = {
+        "calls": len(packs),
+        "input": packed_input,
+        "output": len(articles) * (PACK_ITEM_OUTPUT_TOKENS // 2 + 4),
+    }
+    return single, packed
+
+
+def report(name: str, stats: dict, input_price: float, output_price: float) -> float:
+    cost = (stats["input"] * input_price + stats["output"] * output_price) / 1_000_000
+    print(
+        f"{name:<14} 调用={stats['calls']:5d}  输入={stats['input']:9d}  "
+        f"输出≈{stats['output']:8d}  费用≈{cost:.4f}"
+    )
+    return cost
+
+
+def run_live(name: str, parse, article_ids: list[int]) -> None:
+    start = time.perf_counter()
+    results = parse(article_ids)
+    elapsed = time.perf_counter() - start
+    completed = sum(1 for r in results if r["status"] == "completed")
+    print(
+        f"{name:<14} 耗时={elapsed:7.1f}s  吞吐={len(article_ids) / elapsed:6.2f} 篇/s  "
+        f"成功={completed}/{len(article_ids)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", nargs="?", type=int, default=50, help="文章数")
+    parser.add_argument("--pack", type=int, default=8, help="每次调用打包的文章数")
+    parser.add_argument("--input-price", type=float, default=2.0, help="输入单价（元 / 百万 token）")
+    parser.add_argument("--output-price", type=float, default=8.0, help="输出单价（元 / 百万 token）")
+    parser.add_argument("--live", action="store_true", help="实际调用 LLM 并计时")
+    args = parser.parse_args()
+
+    articles = get_db().get_articles(limit=args.n)
+    if not articles:
+        print("数据库中没有文章")
+        return
+    print(f"文章数: {len(articles)}, 打包篇数: {args.pack}\n")
+
+    single, packed = estimate(articles, args.pack)
+    single_cost = report("逐篇调用", single, args.input_price, args.output_price)
+    packed_cost = report(f"打包 x{args.pack}", packed, args.input_price, args.output_price)
+    print(
+        f"\n调用次数减少 {1 - packed['calls'] / single['calls']:.0%}，"
+        f"输入 token 减少 {1 - packed['input'] / max(single['input'], 1):.0%}，"
+        f"费用减少 {1 - packed_cost / max(single_cost, 1e-12):.0%}"
+    )
+
+    if args.live:
+        print()
+        article_ids = [a.id for a in articles]
+        run_live("逐篇调用", parse_batch, article_ids)
+        run_live(f"打包 x{args.pack}", lambda ids: parse_packed(ids, args.pack), article_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+批量检索基准：逐条 search vs search_many
+
+用法:
+    uv run python scripts/bench_search_many.py [查询数]
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import load_config
+from src.storage.vector_store import VectorStore
+
+QUERIES = [
+    "大模型融资", "自动驾驶进展", "芯片出口管制", "开源模型发布", "AI 医疗应用",
+    "机器人创业公司", "云计算价格战", "智能手机销量", "新能源汽车出海", "具身智能",
+]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    queries = [QUERIES[i % len(QUERIES)] + f" {i}" for i in range(n)]
+
+    store = VectorStore(load_config().vector_db)
+    print(f"向量条数: {store.count()}, 查询数: {n}")
+
+    # 预热：加载模型
+    store.search("warmup", n_results=1)
+
+    start = time.perf_counter()
+    looped = [store.search(q, n_results=5) for q in queries]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = store.search_many(queries, n_results=5)
+    batch_time = time.perf_counter() - start
+
+    same = sum(
+        [r["id"] for r in a] == [r["id"] for r in b] for a, b in zip(looped, batched)
+    )
+    print(f"逐条 search:  {loop_time * 1000:.1f} ms ({loop_time / n * 1000:.2f} ms/查询)")
+    print(f"search_many: {batch_time * 1000:.1f} ms ({batch_time / n * 1000:.2f} ms/查询)")
+    print(f"加速比: {loop_time / batch_time:.1f}x, 结果一致: {same}/{n}")
+
+
+if __name__ == "__main__":
+    main()
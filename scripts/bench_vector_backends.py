@@ -0,0 +1,110 @@
+"""
+向量后端基准：召回率 / 查询延迟 / 写入耗时
+
+合成带聚类结构的 384 维向量（与 all-MiniLM-L6-v2 同维），以精确暴力检索为基准
+计算 recall@k，对比 numpy（精确 / int8 / IVF）与 chroma（若已安装）。
+
+用法:
+    uv run python scripts/bench_vector_backends.py [向量数] [查询数]
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import VectorDBConfig
+from src.storage.vector_backends import create_backend
+
+DIM = 384
+K = 10
+BATCH = 1000
+
+
+def make_data(n: int, n_queries: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """围绕若干中心生成向量，模拟主题聚集的新闻语料"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 200, 8), DIM)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=n + n_queries)
+    data = centers[labels] + 0.6 * rng.normal(size=(n + n_queries, DIM)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data[:n], data[n:]
+
+
+def ground_truth(data: np.ndarray, queries: np.ndarray) -> list[set[int]]:
+    scores = queries @ data.T
+    top = np.argpartition(-scores, K - 1, axis=1)[:, :K]
+    return [set(row.tolist()) for row in top]
+
+
+def run(name: str, config: VectorDBConfig, data: np.ndarray, queries: np.ndarray, truth) -> None:
+    try:
+        backend = create_backend(config)
+    except ImportError as e:
+        print(f"{name:<16} 跳过: {e}")
+        return
+
+    start = time.perf_counter()
+    for i in range(0, len(data), BATCH):
+        chunk = data[i:i + BATCH]
+        ids = [str(j) for j in range(i, i + len(chunk))]
+        metadatas = [{"feed_name": f"feed{j % 5}"} for j in range(i, i + len(chunk))]
+        backend.upsert(ids, chunk.tolist(), [""] * len(chunk), metadatas)
+    insert_time = time.perf_counter() - start
+
+    # 预热（IVF 在首次查询时训练）
+    backend.query(queries[:1].tolist(), K)
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = backend.query([query.tolist()], K)
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected & {int(i) for i in result["ids"][0]})
+
+    start = time.perf_counter()
+    for query in queries:
+        backend.query([query.tolist()], K, where={"feed_name": {"$eq": "feed1"}})
+    filtered = (time.perf_counter() - start) / len(queries)
+
+    backend.close()
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(
+        f"{name:<16} recall@{K}={hits / (K * len(queries)):.3f}  "
+        f"p50={p50:.2f}ms  p95={p95:.2f}ms  过滤={filtered * 1000:.2f}ms  "
+        f"写入={insert_time:.1f}s"
+    )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    data, queries = make_data(n, n_queries)
+    truth = ground_truth(data, queries)
+    nlist = int(np.sqrt(n))
+    print(f"向量数: {n}, 维度: {DIM}, 查询数: {n_queries}, IVF nlist: {nlist}")
+
+    variants = {
+        "numpy":          {"backend": "numpy"},
+        "numpy-int8":     {"backend": "numpy", "numpy_quantize": True},
+        "numpy-ivf":      {"backend": "numpy", "numpy_ivf_nlist": nlist, "numpy_ivf_nprobe": 8},
+        "numpy-ivf-int8": {"backend": "numpy", "numpy_ivf_nlist": nlist, "numpy_quantize": True},
+        "chroma":         {"backend": "chroma"},
+    }
+    for name, options in variants.items():
+        workdir = tempfile.mkdtemp(prefix="bench-vec-")
+        try:
+            config = VectorDBConfig(path=workdir, collection="bench", **options)
+            run(name, config, data, queries, truth)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
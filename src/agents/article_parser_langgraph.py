@@ -3,7 +3,11 @@
 
 工作流（优化后，单次 LLM 调用）：
     START → [load] → [parse] → [save] → END
+
+打包模式（parse_packed）：一次 LLM 调用解析多篇文章，按 token 预算分组，
+逐篇校验返回结果，未通过的文章回退到上面的单篇工作流。
 """
+import asyncio
 import json
 import logging
 import sys
@@ -16,10 +20,58 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from langgraph.graph import StateGraph, END, START
 
+from src.models.llm.router import run_sync
+from src.models.llm.telemetry import caller_tag
+from src.models.llm.tokens import Section, TokenCounter
 from src.storage.db import Database
 
 log = logging.getLogger(__name__)
 
+# 单篇解析的输入上限（token）：正文超长的页面只取前部，其余按上下文窗口尽量保留
+PARSE_MAX_INPUT_TOKENS = 8000
+PARSE_OUTPUT_TOKENS = 1024
+
+PARSE_PROMPT = """请分析以下文章，返回 JSON 格式结果。
+
+文章标题：{title}
+文章摘要：{summary}
+文章内容：{body}
+
+请返回以下 JSON（不要添加其他文字）：
+{{
+    "summary": "100字以内的摘要",
+    "keywords": ["关键词1", "关键词2", "关键词3"],
+    "category": "从以下选一个：科技、财经、汽车、房产、教育、游戏、娱乐、体育、军事、国际、社会、其他",
+    "sentiment": "positive/negative/neutral"
+}}"""
+
+CATEGORIES = ("科技", "财经", "汽车", "房产", "教育", "游戏", "娱乐", "体育", "军事", "国际", "社会", "其他")
+SENTIMENTS = ("positive", "negative", "neutral")
+
+# 打包解析：每次调用的篇数上限、单篇输入上限与每篇的输出预留（token）
+PACK_SIZE = 8
+PACK_ARTICLE_MAX_TOKENS = 1500
+PACK_ITEM_OUTPUT_TOKENS = 256
+
+PACKED_SYSTEM_PROMPT = """你是新闻文章分析助手。用户会给出多篇文章，每篇以 [id=编号] 开头。
+
+请逐篇分析，只返回一个 JSON 对象，键为文章 id（字符串），值为该篇的分析结果：
+{
+    "<id>": {
+        "summary": "100字以内的摘要",
+        "keywords": ["关键词1", "关键词2", "关键词3"],
+        "category": "从以下选一个：科技、财经、汽车、房产、教育、游戏、娱乐、体育、军事、国际、社会、其他",
+        "sentiment": "positive/negative/neutral"
+    }
+}
+每篇文章都必须有结果，不要添加其他文字。"""
+
+PACKED_ARTICLE = """[id={id}]
+文章标题：{title}
+文章摘要：{summary}
+文章内容：{body}
+"""
+
 
 # ============ 1. State 定义 ============
 
@@ -63,6 +115,17 @@ def get_db() -> Database:
 
 # ============ 3. 节点函数 ============
 
+def _extract_json(response: str):
+    """去掉 <think> 块与 markdown 代码块后解析 JSON"""
+    response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL)
+    response = response.strip()
+    if response.startswith("```"):
+        response = response.split("```")[1]
+        if response.startswith("json"):
+            response = response[4:]
+    return json.loads(response.strip())
+
+
 def load_article(state: ArticleState) -> ArticleState:
     """加载文章"""
     db = get_db()
@@ -85,36 +148,23 @@ def parse_article(state: ArticleState) -> ArticleState:
 
     llm = get_llm()
 
-    content_preview = state["original_content"][:2000] if state["original_content"] else state["original_summary"]
-
-    prompt = f"""请分析以下文章，返回 JSON 格式结果。
-
-文章标题：{state['title']}
-文章内容：{content_preview}
-
-请返回以下 JSON（不要添加其他文字）：
-{{
-    "summary": "100字以内的摘要",
-    "keywords": ["关键词1", "关键词2", "关键词3"],
-    "category": "从以下选一个：科技、财经、汽车、房产、教育、游戏、娱乐、体育、军事、国际、社会、其他",
-    "sentiment": "positive/negative/neutral"
-}}"""
+    # 按 token 预算截断：标题 > 摘要 > 正文
+    budget = llm.budget(output_tokens=PARSE_OUTPUT_TOKENS, max_input_tokens=PARSE_MAX_INPUT_TOKENS)
+    fitted = budget.fit(
+        [
+            Section("title", state["title"] or "", 0),
+            Section("summary", state["original_summary"] or "", 1),
+            Section("body", state["original_content"] or "", 2),
+        ],
+        PARSE_PROMPT,
+    )
+    prompt = PARSE_PROMPT.format(**fitted)
 
+    response = ""
     try:
-        response = llm.generate(prompt)
-
-        # 清理 <think> 标签
-        response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL)
-
-        # 清理可能的 markdown 代码块
-        response = response.strip()
-        if response.startswith("```"):
-            response = response.split("```")[1]
-            if response.startswith("json"):
-                response = response[4:]
-        response = response.strip()
-
-        result = json.loads(response)
+        with caller_tag("parse"):
+            response = llm.complete("", prompt)
+        result = _extract_json(response)
 
         return {
             "summary": result.get("summary", ""),
@@ -136,19 +186,22 @@ def save_result(state: ArticleState) -> ArticleState:
     if state.get("status") == "failed":
         return state
 
+    _save_analysis(get_db(), state["article_id"], state)
+    return {"status": "completed"}
+
+
+def _save_analysis(db: Database, article_id: int, result: dict) -> None:
     from src.storage.db import ArticleAnalysis
 
-    db = get_db()
     analysis = ArticleAnalysis(
-        article_id=state["article_id"],
-        summary_llm=state["summary"],
-        keywords=",".join(state["keywords"]),
-        category=state["category"],
-        sentiment=state["sentiment"],
+        article_id=article_id,
+        summary_llm=result["summary"],
+        keywords=",".join(result["keywords"]),
+        category=result["category"],
+        sentiment=result["sentiment"],
         parsed_at=datetime.now().isoformat(),
     )
     db.save_analysis(analysis)
-    return {"status": "completed"}
 
 
 # ============ 4. 构建工作流 ============
@@ -225,6 +278,157 @@ def parse_batch(article_ids: List[int]) -> List[dict]:
     return app.batch(initial_states)
 
 
+
+# ============ 6. 打包解析 ============
+
+def _article_sections(article) -> list[Section]:
+    return [
+        Section("title", article.title or "", 0),
+        Section("summary", article.summary or "", 1),
+        Section("body", article.content or "", 2),
+    ]
+
+
+def pack_articles(
+    blocks: list[tuple[int, str]], capacity: int, counter: TokenCounter, pack_size: int = PACK_SIZE
+) -> list[list[tuple[int, str]]]:
+    """按 token 容量与篇数上限顺序贪心分组
+
+    Args:
+        blocks: (文章 id, 渲染后的文章文本)
+        capacity: 每组可用的输入 token
+        counter: token 计数器
+        pack_size: 每组最多篇数
+    """
+    packs: list[list[tuple[int, str]]] = []
+    current: list[tuple[int, str]] = []
+    used = 0
+    for article_id, block in blocks:
+        tokens = counter.count(block)
+        if current and (len(current) >= pack_size or used + tokens > capacity):
+            packs.append(current)
+            current, used = [], 0
+        current.append((article_id, block))
+        used += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _validate_item(item) -> dict | None:
+    """校验单篇结果：摘要与关键词必须合法，分类 / 情感不合法时取默认值；不合格返回 None"""
+    if not isinstance(item, dict):
+        return None
+    summary = item.get("summary")
+    keywords = item.get("keywords")
+    if not isinstance(summary, str) or not summary.strip():
+        return None
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return None
+    category = item.get("category")
+    sentiment = item.get("sentiment")
+    return {
+        "summary": summary.strip(),
+        "keywords": keywords,
+        "category": category if category in CATEGORIES else "其他",
+        "sentiment": sentiment if sentiment in SENTIMENTS else "neutral",
+    }
+
+
+def _parse_pack_response(response: str, article_ids: list[int]) -> dict[int, dict]:
+    """解析打包响应，返回通过校验的 文章 id → 结果"""
+    try:
+        data = _extract_json(response)
+    except (json.JSONDecodeError, IndexError) as e:
+        log.warning(f"[parse_packed] JSON 解析失败: {e}, response: {response[:200]}")
+        return {}
+    # 兼容模型返回 [{"id": ..., ...}] 数组
+    if isinstance(data, list):
+        data = {str(item.get("id")): item for item in data if isinstance(item, dict)}
+    if not isinstance(data, dict):
+        return {}
+
+    results = {}
+    for article_id in article_ids:
+        item = _validate_item(data.get(str(article_id)))
+        if item is not None:
+            results[article_id] = item
+    return results
+
+
+async def _complete_packs(llm, prompts: list[str]) -> list:
+    """并发发出各组请求，单组失败不影响其他组（失败项为异常对象）"""
+    return await asyncio.gather(
+        *(llm.acomplete(PACKED_SYSTEM_PROMPT, prompt, json_mode=True) for prompt in prompts),
+        return_exceptions=True,
+    )
+
+
+def build_packs(articles: list, pack_size: int = PACK_SIZE) -> list[list[tuple[int, str]]]:
+    """把文章渲染并分组，每组的输入不超过 LLM 的上下文预算"""
+    llm = get_llm()
+    pack_budget = llm.budget(output_tokens=PARSE_OUTPUT_TOKENS + PACK_ITEM_OUTPUT_TOKENS * pack_size)
+    capacity = pack_budget.available(PACKED_SYSTEM_PROMPT)
+    # 单篇上限不超过整组容量，保证任何一篇都能单独成组
+    article_budget = llm.budget(max_input_tokens=min(PACK_ARTICLE_MAX_TOKENS, capacity))
+
+    blocks = []
+    for article in articles:
+        fitted = article_budget.fit(_article_sections(article), PACKED_ARTICLE)
+        blocks.append((article.id, PACKED_ARTICLE.format(id=article.id, **fitted)))
+    return pack_articles(blocks, capacity, pack_budget.counter, pack_size)
+
+
+def parse_packed(article_ids: List[int], pack_size: int = PACK_SIZE) -> List[dict]:
+    """打包批量解析：每次调用解析至多 pack_size 篇，未通过校验的文章回退到单篇解析"""
+    db = get_db()
+    llm = get_llm()
+
+    results: dict[int, dict] = {}
+    articles = []
+    for article_id in article_ids:
+        article = db.get_article_by_id(article_id)
+        if article is None:
+            results[article_id] = {
+                "article_id": article_id,
+                "status": "failed",
+                "error": f"Article {article_id} not found",
+            }
+        else:
+            articles.append(article)
+
+    packs = build_packs(articles, pack_size)
+    prompts = ["\n".join(block for _, block in pack) for pack in packs]
+    with caller_tag("parse"):
+        responses = run_sync(_complete_packs(llm, prompts)) if prompts else []
+
+    fallback = []
+    for pack, response in zip(packs, responses):
+        ids = [article_id for article_id, _ in pack]
+        if isinstance(response, BaseException):
+            log.warning(f"[parse_packed] {len(ids)} 篇的打包调用失败: {response}")
+            items = {}
+        else:
+            items = _parse_pack_response(response, ids)
+        for article_id in ids:
+            item = items.get(article_id)
+            if item is None:
+                fallback.append(article_id)
+                continue
+            _save_analysis(db, article_id, item)
+            results[article_id] = {"article_id": article_id, **item, "status": "completed"}
+
+    log.info(
+        f"[parse_packed] {len(articles)} 篇 / {len(packs)} 次调用，"
+        f"回退单篇解析 {len(fallback)} 篇"
+    )
+    if fallback:
+        for result in parse_batch(fallback):
+            results[result["article_id"]] = result
+
+    return [results[article_id] for article_id in article_ids]
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
@@ -30,8 +30,14 @@ import json
 import logging
 from typing import Any
 
+from src.models.llm.telemetry import caller_tag
+from src.models.llm.tokens import Section
+
 logger = logging.getLogger(__name__)
 
+# PPT 结构 JSON 的输出预留
+PLAN_OUTPUT_TOKENS = 4096
+
 
 class ContentPlanner:
     """内容规划器 - 将 Markdown 转换为 PPT 结构"""
@@ -115,7 +121,7 @@ class ContentPlanner:
 - bullet_points 要简洁
 - 整个 PPT 逻辑连贯"""
 
-        user_prompt = f"""请将以下 Markdown 文档转换为 PPT 结构。
+        user_template = f"""请将以下 Markdown 文档转换为 PPT 结构。
 
 配置：
 - 最大页数: {options.get("max_slides", 15)}
@@ -123,15 +129,25 @@ class ContentPlanner:
 
 原始文档内容：
 
-{markdown_content[:8000]}
+{{document}}
 
 请生成 JSON 格式的 PPT 结构。"""
 
-        response = self._llm.complete(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            json_mode=True,
-        )
+        # 文档按 token 预算截断，尽量填满上下文窗口
+        budget = self._llm.budget(output_tokens=PLAN_OUTPUT_TOKENS)
+        fitted = budget.fit([Section("document", markdown_content)], system_prompt, user_template)
+        if len(fitted["document"]) < len(markdown_content):
+            logger.info(
+                f"[ContentPlanner] 文档超出上下文预算，截取前 {len(fitted['document'])} 字符"
+            )
+        user_prompt = user_template.replace("{document}", fitted["document"])
+
+        with caller_tag("ppt_plan"):
+            response = self._llm.complete(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                json_mode=True,
+            )
 
         return json.loads(response.strip())
 
@@ -16,11 +16,16 @@ from datetime import datetime
 from typing import List, Optional, TypedDict
 from langgraph.graph import StateGraph, END, START
 
+from src.models.llm.telemetry import caller_tag
+from src.models.llm.tokens import Section
 from src.storage.db import Database
 from src.agents import get_llm
 
 log = logging.getLogger(__name__)
 
+# 日报输出预留（推理模型的 <think> 也计入输出）
+REPORT_OUTPUT_TOKENS = 8192
+
 
 # ============ 1. State 定义 ============
 
@@ -92,26 +97,15 @@ def organize_articles(state: DailyReportState) -> DailyReportState:
     return {"organized": organized, "status": "organizing"}
 
 
-def generate_report(state: DailyReportState) -> DailyReportState:
-    """使用 LLM 生成日报"""
-    log.info("[generate] 开始生成日报")
-
-    if state.get("status") == "failed":
-        return state
-
-    llm = get_llm()
-
-    date_range = state["date_range"]
-    organized = state["organized"]
-
-    # 构建带链接的文章摘要
+def _build_report_prompt(date_range: str, organized: dict, fitted: dict[str, str]) -> str:
+    """日报提示词；fitted 为各篇标题 / 摘要按预算截断后的文本（为空时得到固定部分）"""
     articles_summary = []
     for category, articles in organized.items():
         articles_summary.append(f"\n## {category} ({len(articles)} 篇)")
-        for i, article in enumerate(articles, 1):
-            articles_summary.append(f"[{i}] {article['title']}")
+        for i, article in enumerate(articles):
+            articles_summary.append(f"[{i + 1}] {fitted.get(f'{category}/{i}/title', '')}")
             articles_summary.append(f"链接: {article['url']}")
-            articles_summary.append(f"核心: {article['summary_llm'][:200]}..." if len(article['summary_llm']) > 200 else f"核心: {article['summary_llm']}")
+            articles_summary.append(f"核心: {fitted.get(f'{category}/{i}/summary', '')}")
             articles_summary.append("")
 
     articles_text = "\n".join(articles_summary)
@@ -131,12 +125,12 @@ AI三大媒体日报 - {date_range}
 
 """
 
-    for category, articles in organized.items():
+    # 格式示例只给出结构，摘要已在上文给出，不再重复
+    for category in organized:
         prompt += f"### {category}\n"
-        for i, article in enumerate(articles, 1):
-            prompt += f"[{i}] {article['title']}\n"
-            prompt += f"链接: {article['url']}\n"
-            prompt += f"核心内容：{article['summary_llm'][:200]}...\n\n"
+        prompt += "[编号] 标题\n"
+        prompt += "链接: 原文链接\n"
+        prompt += "核心内容：3-5句话概括要点\n\n"
 
     prompt += """```
 
@@ -148,8 +142,34 @@ AI三大媒体日报 - {date_range}
 5. 总字数：800-1500字
 6. 使用中文标点符号
 """
+    return prompt
+
+
+def generate_report(state: DailyReportState) -> DailyReportState:
+    """使用 LLM 生成日报"""
+    log.info("[generate] 开始生成日报")
+
+    if state.get("status") == "failed":
+        return state
+
+    llm = get_llm()
+
+    date_range = state["date_range"]
+    organized = state["organized"]
+
+    # 标题优先完整保留，摘要在剩余预算内按水位均分（而不是各截 200 字）
+    sections = []
+    for category, articles in organized.items():
+        for i, article in enumerate(articles):
+            sections.append(Section(f"{category}/{i}/title", article["title"], 0))
+            sections.append(Section(f"{category}/{i}/summary", article["summary_llm"] or "", 1))
+
+    budget = llm.budget(output_tokens=REPORT_OUTPUT_TOKENS)
+    skeleton = _build_report_prompt(date_range, organized, {})
+    prompt = _build_report_prompt(date_range, organized, budget.fit(sections, skeleton))
 
-    report_content = llm.generate(prompt)
+    with caller_tag("report"):
+        report_content = llm.complete("", prompt)
 
     # 清理 <think> 标签
     report_content = re.sub(r"<think>.*?</think>", "", report_content, flags=re.DOTALL)
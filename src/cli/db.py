@@ -0,0 +1,126 @@
+"""数据库维护模块
+
+命令:
+    backup      - 在线备份（完整 / 增量快照）
+    restore     - 从快照恢复数据库
+    snapshots   - 列出快照
+    rebuild-fts - 全量重建文章全文索引
+"""
+from typing import Optional
+
+import typer
+
+from src.config import load_config
+from src.storage.backup import SQLiteBackup
+from src.storage.logger import setup_logger
+
+app = typer.Typer(
+    help="数据库维护",
+    add_completion=False,
+)
+
+
+def _setup_logging(verbose: bool) -> None:
+    """配置日志"""
+    config = load_config()
+    log_level = "DEBUG" if verbose else config.logging.level
+    setup_logger(
+        log_file=config.logging.file,
+        level=log_level,
+        rotation=config.logging.rotation,
+        retention=config.logging.retention,
+    )
+
+
+def _get_backup(
+    output_dir: Optional[str] = None,
+    step_pages: Optional[int] = None,
+    sleep: Optional[float] = None,
+    level: int = 6,
+) -> SQLiteBackup:
+    """根据配置和命令行参数创建备份器"""
+    config = load_config().database
+    return SQLiteBackup(
+        db_path=config.path,
+        backup_dir=output_dir or config.backup_dir,
+        step_pages=step_pages or config.backup_step_pages,
+        sleep=config.backup_sleep if sleep is None else sleep,
+        compress_level=level,
+    )
+
+
+@app.command("backup")
+def db_backup(
+    incremental: bool = typer.Option(
+        False, "--incremental", "-i", help="只保存相对上一快照变化的页"
+    ),
+    output_dir: Optional[str] = typer.Option(None, "--output", "-o", help="快照目录"),
+    step_pages: Optional[int] = typer.Option(None, "--step-pages", help="每步复制的页数"),
+    sleep: Optional[float] = typer.Option(None, "--sleep", help="步间休眠秒数"),
+    level: int = typer.Option(6, "--level", help="gzip 压缩级别 (1-9)"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """使用 SQLite Online Backup API 备份数据库，不阻塞抓取写入"""
+    _setup_logging(verbose)
+    backup = _get_backup(output_dir, step_pages, sleep, level)
+
+    try:
+        result = backup.backup(incremental=incremental)
+    except (FileNotFoundError, RuntimeError) as e:
+        typer.echo(f"备份失败: {e}")
+        raise typer.Exit(1)
+
+    typer.echo(
+        f"快照已保存: {result.path} ({result.kind}, "
+        f"{result.pages_written}/{result.page_count} 页, "
+        f"{result.bytes_written / 1024 / 1024:.2f} MB, {result.elapsed:.1f}s)"
+    )
+
+
+@app.command("restore")
+def db_restore(
+    target: str = typer.Argument(..., help="恢复目标文件路径（不能已存在）"),
+    snapshot: Optional[str] = typer.Option(None, "--snapshot", "-s", help="快照名（默认最新）"),
+    output_dir: Optional[str] = typer.Option(None, "--output", "-o", help="快照目录"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """从快照恢复数据库"""
+    _setup_logging(verbose)
+    backup = _get_backup(output_dir)
+
+    try:
+        path = backup.restore(target, snapshot)
+    except (FileNotFoundError, FileExistsError) as e:
+        typer.echo(f"恢复失败: {e}")
+        raise typer.Exit(1)
+
+    typer.echo(f"数据库已恢复: {path}")
+
+
+@app.command("snapshots")
+def db_snapshots(
+    output_dir: Optional[str] = typer.Option(None, "--output", "-o", help="快照目录"),
+) -> None:
+    """列出快照"""
+    snapshots = _get_backup(output_dir).list_snapshots()
+    if not snapshots:
+        typer.echo("没有快照")
+        return
+
+    for m in snapshots:
+        parent = f" <- {m['parent']}" if m["parent"] else ""
+        typer.echo(
+            f"{m['name']}  {m['kind']:<5}  {m['pages_written']}/{m['page_count']} 页{parent}"
+        )
+
+
+@app.command("rebuild-fts")
+def db_rebuild_fts(
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """全量重建文章全文索引（索引损坏或手动修改过 articles 表时使用）"""
+    from src.storage import get_db
+
+    _setup_logging(verbose)
+    get_db().rebuild_fts()
+    typer.echo("全文索引已重建")
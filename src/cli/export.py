@@ -0,0 +1,109 @@
+"""数据导出模块
+
+命令:
+    parquet - 导出文章与解析结果为分区 Parquet
+    compact - 合并分区内的 part 文件，每篇文章只保留最新版本
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+import typer
+
+from src.config import load_config
+from src.storage import get_db
+from src.storage.export import CompactStats, ParquetExporter
+from src.storage.logger import setup_logger
+
+app = typer.Typer(
+    help="数据导出",
+    add_completion=False,
+)
+
+
+def _setup_logging(verbose: bool) -> None:
+    """配置日志"""
+    config = load_config()
+    log_level = "DEBUG" if verbose else config.logging.level
+    setup_logger(
+        log_file=config.logging.file,
+        level=log_level,
+        rotation=config.logging.rotation,
+        retention=config.logging.retention,
+    )
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        typer.echo(f"无效的日期格式: {value}，请使用 YYYY-MM-DD")
+        raise typer.Exit(1)
+
+
+@app.command("parquet")
+def export_parquet(
+    date_from: Optional[str] = typer.Option(None, "--from", help="起始日期 YYYY-MM-DD（含）"),
+    date_to: Optional[str] = typer.Option(None, "--to", help="结束日期 YYYY-MM-DD（含）"),
+    output_dir: str = typer.Option("data/export", "--output", "-o", help="输出目录"),
+    incremental: bool = typer.Option(
+        False, "--incremental", "-i", help="只导出上次水位之后变化的行"
+    ),
+    page_size: int = typer.Option(5000, "--page-size", help="每页读取行数"),
+    compact: bool = typer.Option(False, "--compact", help="导出后合并 part 文件（去除旧版本）"),
+    no_content: bool = typer.Option(False, "--no-content", help="不导出正文列"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """按月份和订阅源分区导出 Article + ArticleAnalysis 到 Parquet"""
+    _setup_logging(verbose)
+
+    if incremental and (date_from or date_to):
+        typer.echo("--incremental 不能与 --from / --to 同时使用（水位覆盖全部文章）")
+        raise typer.Exit(1)
+
+    start_date = _parse_date(date_from)
+    end_date = _parse_date(date_to)
+    if end_date:
+        end_date += timedelta(days=1)
+
+    exporter = ParquetExporter(
+        get_db(),
+        output_dir,
+        page_size=page_size,
+        include_content=not no_content,
+    )
+    try:
+        stats = exporter.export(start_date, end_date, incremental=incremental)
+    except RuntimeError as e:
+        typer.echo(f"导出失败: {e}")
+        raise typer.Exit(1)
+
+    typer.echo(f"已导出 {stats.rows} 行到 {len(stats.files)} 个文件: {output_dir}")
+    if incremental:
+        typer.echo(f"导出水位: {stats.watermark}")
+    if compact:
+        _echo_compact(exporter.compact())
+
+
+def _echo_compact(stats: CompactStats) -> None:
+    typer.echo(
+        f"已合并 {stats.partitions} 个分区: 删除 {stats.files_removed} 个文件, "
+        f"去除 {stats.rows_removed} 行旧版本"
+    )
+
+
+@app.command("compact")
+def export_compact(
+    output_dir: str = typer.Option("data/export", "--output", "-o", help="导出目录"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """合并各分区的 part 文件，每篇文章只保留最新版本（增量导出后定期执行）"""
+    _setup_logging(verbose)
+
+    try:
+        stats = ParquetExporter(get_db(), output_dir).compact()
+    except RuntimeError as e:
+        typer.echo(f"合并失败: {e}")
+        raise typer.Exit(1)
+    _echo_compact(stats)
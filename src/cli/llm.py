@@ -0,0 +1,129 @@
+"""LLM 调用模块
+
+命令:
+    stats - 按阶段 / provider 汇总调用延迟、吞吐与费用（读取遥测账本）
+    stub  - 启动本地桩 LLM 服务（OpenAI / MiniMax 兼容），用于压测与离线运行流水线
+"""
+import time
+
+import typer
+
+from src.config import load_config
+
+app = typer.Typer(
+    help="LLM 调用统计与本地桩服务",
+    add_completion=False,
+)
+
+# 可用的分组字段
+GROUP_FIELDS = ("caller", "provider", "model")
+
+
+def _fmt_seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}s"
+
+
+@app.command("stats")
+def llm_stats(
+    days: float = typer.Option(7, "--days", "-d", help="统计最近多少天，0 表示全部"),
+    by: str = typer.Option(
+        "caller,provider", "--by", "-b", help="分组字段，逗号分隔: caller / provider / model"
+    ),
+) -> None:
+    """按阶段 / provider 显示 P50 / P95 延迟、TTFT、吞吐与费用"""
+    from src.models.llm.telemetry import read_records, summarize
+
+    fields = tuple(f.strip() for f in by.split(",") if f.strip())
+    unknown = [f for f in fields if f not in GROUP_FIELDS]
+    if not fields or unknown:
+        typer.echo(f"无效的分组字段: {by}，可选 {', '.join(GROUP_FIELDS)}")
+        raise typer.Exit(1)
+
+    config = load_config().llm.telemetry
+    since = time.time() - days * 86400 if days > 0 else None
+    rows = summarize(
+        read_records(config.path, backups=config.backups, since=since),
+        by=fields,
+        prices=config.prices,
+    )
+    if not rows:
+        typer.echo(f"没有调用记录 ({config.path})")
+        return
+
+    header = [*fields, "调用", "错误", "缓存", "P50", "P95", "TTFT", "输入tok", "输出tok", "tok/s", "费用"]
+    table = [header]
+    for row in rows:
+        table.append([
+            *(str(row[f]) for f in fields),
+            str(row["calls"]),
+            str(row["errors"]),
+            str(row["cache_hits"]),
+            _fmt_seconds(row["p50"]),
+            _fmt_seconds(row["p95"]),
+            _fmt_seconds(row["ttft_p50"]),
+            str(row["prompt_tokens"]),
+            str(row["completion_tokens"]),
+            "-" if row["tokens_per_second"] is None else f"{row['tokens_per_second']:.1f}",
+            f"{row['cost']:.4f}",
+        ])
+
+    widths = [max(len(r[i]) for r in table) for i in range(len(header))]
+    for i, line in enumerate(table):
+        typer.echo("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+        if i == 0:
+            typer.echo("  ".join("-" * w for w in widths))
+
+    total_cost = sum(row["cost"] for row in rows)
+    total_calls = sum(row["calls"] for row in rows)
+    typer.echo(f"\n合计: {total_calls} 次调用, 费用 {total_cost:.4f}")
+
+
+@app.command("stub")
+def llm_stub(
+    host: str = typer.Option("127.0.0.1", "--host", help="监听地址"),
+    port: int = typer.Option(8765, "--port", "-p", help="监听端口"),
+    latency: str = typer.Option(
+        "lognormal:0.5,0.4", "--latency", "-l",
+        help="首 token 延迟分布（秒）: const:0.5 / uniform:0.2,1 / exp:0.5 / lognormal:0.5,0.4 / pareto:0.3,2.5",
+    ),
+    tps: float = typer.Option(50, "--tps", help="输出速度（token/s），0 表示瞬时"),
+    completion_tokens: int = typer.Option(200, "--tokens", help="填充文本的平均输出长度（token）"),
+    think_tokens: int = typer.Option(0, "--think", help="附加 <think> 推理块的长度（token）"),
+    rate_limit: float = typer.Option(0.0, "--rate-limit", help="随机返回 429 的概率"),
+    rpm: int = typer.Option(0, "--rpm", help="每分钟请求配额，超出返回 429"),
+    canned: str = typer.Option(None, "--canned", help="canned 响应规则文件（JSON）"),
+    seed: int = typer.Option(None, "--seed", help="随机种子"),
+) -> None:
+    """启动本地桩 LLM 服务（Ctrl+C 退出）
+
+    另一个终端中设置 LLM_BASE_URL 后运行流水线即可，例如:
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 uv run main.py rss parse
+    """
+    from src.models.llm.stub_server import StubConfig, StubLLMServer
+
+    try:
+        server = StubLLMServer(StubConfig(
+            host=host,
+            port=port,
+            latency=latency,
+            tps=tps,
+            completion_tokens=completion_tokens,
+            think_tokens=think_tokens,
+            rate_limit=rate_limit,
+            rpm=rpm,
+            canned=canned,
+            seed=seed,
+        ))
+    except ValueError as e:
+        typer.echo(str(e))
+        raise typer.Exit(1)
+
+    typer.echo(f"桩 LLM 服务: {server.base_url}")
+    typer.echo(f"使用: LLM_BASE_URL={server.base_url} uv run main.py ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        typer.echo(f"\n统计: {server.stats()}")
@@ -4,11 +4,19 @@
     rss     - RSS 内容处理 (fetch, parse, report)
     image   - 图片生成
     ppt     - PPT 相关
+    db      - 数据库维护 (backup, restore, rebuild-fts)
+    export  - 数据导出 (parquet, compact)
+    rag     - RAG 向量库 (sync, backfill, compact, migrate, serve-embedder)
+    llm     - LLM 调用统计与本地桩服务 (stats, stub)
 """
 import typer
 
+from src.cli.db import app as db_app
+from src.cli.export import app as export_app
 from src.cli.image import app as image_app
+from src.cli.llm import app as llm_app
 from src.cli.ppt import ppt_app
+from src.cli.rag import app as rag_app
 from src.cli.rss import app as rss_app
 
 app = typer.Typer(
@@ -23,6 +31,10 @@ def main() -> None:
     app.add_typer(rss_app, name="rss")
     app.add_typer(image_app, name="image")
     app.add_typer(ppt_app, name="ppt")
+    app.add_typer(db_app, name="db")
+    app.add_typer(export_app, name="export")
+    app.add_typer(rag_app, name="rag")
+    app.add_typer(llm_app, name="llm")
     app()
 
 
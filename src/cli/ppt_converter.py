@@ -44,8 +44,11 @@ def convert_markdown_to_ppt_data(
     """
     import json
 
+    from src.models.llm.telemetry import caller_tag
+
     prompt = PPT_GENERATE_PROMPT.format(markdown_content=markdown_content)
-    json_str = llm.complete("", prompt)
+    with caller_tag("ppt_plan"):
+        json_str = llm.complete("", prompt)
 
     try:
         data = json.loads(json_str)
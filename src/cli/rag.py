@@ -0,0 +1,186 @@
+"""RAG 向量库模块
+
+命令:
+    sync           - 增量同步文章到向量库
+    backfill       - 多进程全量重建嵌入（可断点续跑）
+    compact        - 清理孤儿 / 过期向量并压缩索引
+    migrate        - 为旧向量补充数值时间元数据
+    serve-embedder - 启动共享嵌入模型服务
+"""
+from typing import Optional
+
+import typer
+
+from src.config import load_config
+from src.storage.logger import setup_logger
+
+app = typer.Typer(
+    help="RAG 向量库",
+    add_completion=False,
+)
+
+
+def _setup_logging(verbose: bool) -> None:
+    """配置日志"""
+    config = load_config()
+    log_level = "DEBUG" if verbose else config.logging.level
+    setup_logger(
+        log_file=config.logging.file,
+        level=log_level,
+        rotation=config.logging.rotation,
+        retention=config.logging.retention,
+    )
+
+
+@app.command("sync")
+def rag_sync(
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", "-b", help="每批写入的文章数"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """增量同步：只嵌入新增或变化的文章，删除已移除文章的向量"""
+    from src.services.vector_sync import VectorSyncJob
+    from src.storage import get_db
+    from src.storage.vector_store import VectorStore
+
+    _setup_logging(verbose)
+    config = load_config().vector_db
+
+    stats = VectorSyncJob(
+        get_db(),
+        VectorStore(config),
+        batch_size=batch_size or config.sync_batch_size,
+        encode_batch_size=config.encode_batch_size,
+        retention_days=config.retention_days,
+    ).run()
+
+    typer.echo(
+        f"同步完成: 新增 {stats.added}, 更新 {stats.updated}, "
+        f"删除 {stats.deleted}, 未变化 {stats.unchanged}"
+    )
+
+
+@app.command("backfill")
+def rag_backfill(
+    workers: int = typer.Option(4, "--workers", "-w", help="编码进程数"),
+    threads: Optional[int] = typer.Option(
+        None, "--threads", "-t", help="每个编码进程的线程数（默认 CPU 核数 / 进程数）"
+    ),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", "-b", help="每批文章数"),
+    restart: bool = typer.Option(False, "--restart", help="忽略检查点，从头开始"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """多进程全量回填嵌入（更换模型后使用），中断后重跑自动从检查点继续"""
+    from src.services.embedding_backfill import BackfillProgress, EmbeddingBackfill
+    from src.storage import get_db
+    from src.storage.vector_store import VectorStore
+
+    _setup_logging(verbose)
+    config = load_config().vector_db
+
+    def report(p: BackfillProgress) -> None:
+        eta = f"{p.eta / 60:.1f} 分钟" if p.eta != float("inf") else "-"
+        typer.echo(
+            f"\r  {p.articles}/{p.total} 篇 ({p.vectors} 条向量), "
+            f"{p.rate:.1f} 篇/秒, 剩余约 {eta}    ",
+            nl=False,
+        )
+
+    backfill = EmbeddingBackfill(
+        get_db(),
+        VectorStore(config),
+        workers=workers,
+        threads_per_worker=threads,
+        batch_size=batch_size or config.sync_batch_size,
+        encode_batch_size=config.encode_batch_size,
+        progress=report,
+        retention_days=config.retention_days,
+    )
+    if restart:
+        backfill.reset()
+
+    try:
+        result = backfill.run()
+    except RuntimeError as e:
+        typer.echo(f"\n回填中断: {e}（重跑将从检查点继续）")
+        raise typer.Exit(1)
+
+    typer.echo(f"\n回填完成: {result.articles} 篇, {result.vectors} 条向量, {result.elapsed:.1f}s")
+
+
+@app.command("compact")
+def rag_compact(
+    retention_days: Optional[int] = typer.Option(
+        None, "--retention-days", "-r", help="保留天数（默认读取 vector_db.retention_days，0 为不限）"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", help="只统计待清理的向量，不修改"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """与 articles 表对账：删除孤儿与过期向量，压缩重建索引，报告前后大小与延迟"""
+    from src.services.vector_compact import CompactStats, VectorCompactJob
+    from src.storage import get_db
+    from src.storage.vector_store import VectorStore
+
+    _setup_logging(verbose)
+    config = load_config().vector_db
+
+    stats = VectorCompactJob(
+        get_db(),
+        VectorStore(config),
+        retention_days=config.retention_days if retention_days is None else retention_days,
+    ).run(dry_run=dry_run)
+
+    p = CompactStats.percentile
+    typer.echo(
+        f"扫描 {stats.scanned} 条向量: 孤儿 {stats.orphans}, 过期 {stats.expired}"
+        + ("（dry-run，未修改）" if dry_run else "")
+        + ("" if dry_run or stats.compacted else "，无可回收空间，未压缩")
+    )
+    typer.echo(
+        f"向量数: {stats.count_before} → {stats.count_after}, "
+        f"存储: {stats.size_before / 1024 / 1024:.2f} MB → {stats.size_after / 1024 / 1024:.2f} MB"
+    )
+    typer.echo(
+        f"查询延迟 p50/p95: {p(stats.latency_before, 50):.2f}/{p(stats.latency_before, 95):.2f} ms"
+        f" → {p(stats.latency_after, 50):.2f}/{p(stats.latency_after, 95):.2f} ms"
+    )
+
+
+@app.command("migrate")
+def rag_migrate(
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """为已有向量补充 published_ts / date_key 元数据，启用数值日期过滤"""
+    from src.storage.vector_store import VectorStore
+
+    _setup_logging(verbose)
+    updated = VectorStore(load_config().vector_db).migrate_time_metadata()
+    typer.echo(f"迁移完成: 更新 {updated} 条向量元数据")
+
+
+@app.command("serve-embedder")
+def serve_embedder(
+    socket_path: Optional[str] = typer.Option(
+        None, "--socket", "-s", help="Unix socket 路径（默认读取 vector_db.embedding_socket）"
+    ),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="嵌入模型名"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+) -> None:
+    """启动常驻嵌入模型服务，供多个进程共享一个已加载的模型"""
+    from src.storage.embedding_server import EmbeddingServer
+
+    _setup_logging(verbose)
+    config = load_config().vector_db
+
+    socket_path = socket_path or config.embedding_socket
+    if not socket_path:
+        typer.echo("请通过 --socket 指定路径，或在 config.yaml 中配置 vector_db.embedding_socket")
+        raise typer.Exit(1)
+
+    server = EmbeddingServer(
+        model or config.embedding_model,
+        socket_path,
+        runtime=config.embedding_runtime,
+        onnx_dir=config.onnx_dir,
+    )
+    typer.echo(f"嵌入服务启动中: {socket_path}")
+    server.serve_forever()
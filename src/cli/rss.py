@@ -10,7 +10,7 @@ from typing import Optional
 
 import typer
 
-from src.agents.article_parser_langgraph import parse_batch
+from src.agents.article_parser_langgraph import parse_batch, parse_packed
 from src.agents.report_workflow import generate_daily_report
 from src.cli.ppt import generate_ppt_from_content
 from src.config import load_config
@@ -57,6 +57,7 @@ def fetch_feeds(
 @app.command("parse")
 def parse_articles(
     limit: int = typer.Option(50, "--limit", "-l", help="最大解析文章数"),
+    pack: int = typer.Option(0, "--pack", help="每次 LLM 调用打包解析的文章数，0 表示逐篇解析"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
 ) -> None:
     """使用 LLM 解析未处理的文章"""
@@ -69,7 +70,7 @@ def parse_articles(
         return
 
     article_ids = [a.id for a in unparsed[:limit]]
-    results = parse_batch(article_ids)
+    results = parse_packed(article_ids, pack_size=pack) if pack > 1 else parse_batch(article_ids)
 
     completed = sum(1 for r in results if r["status"] == "completed")
     failed = len(results) - completed
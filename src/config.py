@@ -11,11 +11,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+class HttpClientConfig(BaseModel):
+    pool_size: int = 20            # 连接池大小（同一主机的最大连接数）
+    keepalive_expiry: float = 60   # 空闲连接保活时间（秒）
+    connect_timeout: float = 10    # 建立连接超时（秒）
+    read_timeout: float = 120      # 读取响应超时（秒）
+    http2: bool = True             # 安装 h2 时启用 HTTP/2
+
+
 class LLMConfig(BaseModel):
     provider: str
     api_key: str
     base_url: str
     model: str
+    max_concurrency: int = 16      # 最大在途请求数（AIMD 自适应并发的上界）
+    rpm: int = 0                   # 每分钟请求数配额，0 表示不限
+    tpm: int = 0                   # 每分钟 token 配额，0 表示不限
+    context_window: int = 0        # 上下文窗口（token），0 表示按模型名取内置值
+    tokenizer: str = ""            # HF 分词器仓库名或 tokenizer.json 路径，空表示按字符比例估算
+    http: HttpClientConfig = HttpClientConfig()
 
 
 class LLMProvidersConfig(BaseModel):
@@ -24,9 +38,45 @@ class LLMProvidersConfig(BaseModel):
     deepseek: Optional[LLMConfig] = None
 
 
+class LLMCacheConfig(BaseModel):
+    enabled: bool = True
+    path: str = "data/llm_cache.db"
+    ttl_days: float = 30           # 有效期（天），0 表示永不过期
+    max_size_mb: int = 512         # 响应总大小上限，超过后按 LRU 淘汰
+    prompt_version: str = "v1"     # 提示词版本，修改提示词后递增使旧缓存失效
+
+
+class LLMRouterConfig(BaseModel):
+    failover: list[str] = []       # 故障转移 / 对冲顺序（主 provider 之后），空表示只用主 provider
+    max_attempts: int = 3          # 总尝试次数（含首次）
+    backoff_base: float = 0.5      # 退避基数（秒），第 n 次重试等待 U(0, base * 2^n)
+    backoff_max: float = 8.0       # 单次退避上限（秒）
+    hedge: bool = True             # 是否启用对冲请求
+    hedge_percentile: float = 95   # 主请求超过该延迟分位数时发出对冲
+    hedge_min_samples: int = 20    # 直方图样本数达到后才启用对冲
+    hedge_min_delay: float = 1.0   # 对冲等待下限（秒）
+    hedge_budget: float = 0.1      # 对冲请求占总请求数的上限
+
+
+class LLMPriceConfig(BaseModel):
+    input: float = 0.0             # 输入单价（元 / 百万 token）
+    output: float = 0.0            # 输出单价（元 / 百万 token）
+
+
+class LLMTelemetryConfig(BaseModel):
+    enabled: bool = True
+    path: str = "data/llm_telemetry.jsonl"
+    max_size_mb: int = 20          # 单个账本文件上限，超过后轮转
+    backups: int = 5               # 保留的轮转文件数
+    prices: dict[str, LLMPriceConfig] = {}  # 模型名前缀 → 单价，用于估算费用
+
+
 class LLMConfigWrapper(BaseModel):
     default: str
     providers: LLMProvidersConfig
+    cache: LLMCacheConfig = LLMCacheConfig()
+    router: LLMRouterConfig = LLMRouterConfig()
+    telemetry: LLMTelemetryConfig = LLMTelemetryConfig()
 
 
 class RSSFeedConfig(BaseModel):
@@ -42,11 +92,31 @@ class RSSConfig(BaseModel):
 
 class DatabaseConfig(BaseModel):
     path: str
+    backup_dir: str = "data/backups"
+    backup_step_pages: int = 1024   # 每步复制的页数
+    backup_sleep: float = 0.005     # 步间休眠（秒），让出 I/O 给写入方
 
 
 class VectorDBConfig(BaseModel):
     path: str
     collection: str
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_runtime: str = "torch"        # 嵌入推理后端：torch / onnx / onnx-int8
+    onnx_dir: str = "data/onnx"             # ONNX 导出产物目录
+    embedding_socket: Optional[str] = None  # 嵌入服务 socket，配置后优先使用
+    sync_batch_size: int = 512     # rag sync 每批写入向量库的文章数
+    encode_batch_size: int = 64    # 嵌入模型单次前向的批大小
+    embedding_cache: Optional[str] = None   # 嵌入缓存目录，配置后启用
+    embedding_cache_dtype: str = "float16"  # float16 / float32
+    max_chunks_per_article: int = 0   # 正文分段嵌入的最大片段数，0 表示只嵌入标题 + 摘要
+    chunk_size: int = 400          # 正文片段最大字符数
+    chunk_overlap: int = 80        # 相邻片段重叠字符数（整句）
+    retention_days: int = 0        # 向量保留天数（按发布时间），0 表示永久保留
+    backend: str = "chroma"        # 向量后端：chroma / numpy
+    numpy_quantize: bool = False   # numpy 后端：维护 int8 量化副本用于粗排
+    numpy_rerank: int = 4          # int8 粗排保留 n_results × rerank 个候选做 float32 精排
+    numpy_ivf_nlist: int = 0       # numpy 后端：IVF 聚类数，0 表示精确检索
+    numpy_ivf_nprobe: int = 8      # IVF 查询时扫描的聚类数
 
 
 class LoggingConfig(BaseModel):
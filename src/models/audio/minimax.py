@@ -4,7 +4,8 @@ MiniMax TTS 音频提供者
 import os
 from pathlib import Path
 
-import requests
+from src.config import HttpClientConfig, load_config
+from src.models.http_client import build_client
 
 BASE_URL = "https://api.minimaxi.com/v1"
 
@@ -20,15 +21,27 @@ PRESET_VOICES: dict[str, str] = {
 class MiniMaxProvider:
     """MiniMax TTS 音频提供者"""
 
-    def __init__(self) -> None:
+    def __init__(self, http: HttpClientConfig | None = None) -> None:
+        """
+        Args:
+            http: 连接池配置，默认复用 llm.providers.minimax.http
+        """
         self.api_key = os.getenv("MINIMAX_API_KEY")
         self.group_id = os.getenv("MINIMAX_GROUP_ID")
         if not self.api_key:
             raise ValueError("请在 .env 文件中配置 MINIMAX_API_KEY")
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        # Content-Type 由 json= / files= 自动设置（multipart 需要带 boundary）
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        # 鉴权头按请求携带：音频下载地址在其他主机上，不应带上 API Key
+        self.client = build_client(http or self._load_http_config())
+
+    @staticmethod
+    def _load_http_config() -> HttpClientConfig:
+        try:
+            minimax = load_config().llm.providers.minimax
+            return minimax.http if minimax else HttpClientConfig()
+        except Exception:
+            return HttpClientConfig()
 
     def clone_voice(self, audio_path: str, prefix: str = "my_voice") -> str:
         """注册克隆音色"""
@@ -37,7 +50,7 @@ class MiniMaxProvider:
         with open(audio_path, "rb") as f:
             files = {"file": (os.path.basename(audio_path), f)}
             data = {"purpose": "voice_clone"}
-            resp = requests.post(upload_url, headers=self.headers, data=data, files=files)
+            resp = self.client.post(upload_url, headers=self.headers, data=data, files=files)
 
         if resp.status_code != 200:
             raise RuntimeError(f"文件上传失败: {resp.text}")
@@ -57,7 +70,7 @@ class MiniMaxProvider:
             "file_id": file_id,
             "voice_name": prefix,
         }
-        resp = requests.post(url, headers=self.headers, json=payload)
+        resp = self.client.post(url, headers=self.headers, json=payload)
         if resp.status_code != 200:
             raise RuntimeError(f"音色注册失败: {resp.text}")
 
@@ -75,7 +88,7 @@ class MiniMaxProvider:
             "voice_id": voice_id if voice_id in PRESET_VOICES else "male-shaun",
         }
 
-        resp = requests.post(url, headers=self.headers, json=payload)
+        resp = self.client.post(url, headers=self.headers, json=payload)
         if resp.status_code != 200:
             raise RuntimeError(f"音频合成失败: {resp.text}")
 
@@ -86,7 +99,7 @@ class MiniMaxProvider:
 
         # 下载或保存音频
         if audio_url.startswith("http"):
-            audio_resp = requests.get(audio_url)
+            audio_resp = self.client.get(audio_url)
             if audio_resp.status_code != 200:
                 raise RuntimeError("音频下载失败")
             content = audio_resp.content
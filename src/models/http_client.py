@@ -0,0 +1,64 @@
+"""
+外部模型 API 的长连接 HTTP 客户端
+
+每个 provider 持有一个长生命周期的 httpx 客户端：
+- 连接池 + keep-alive：同一主机的后续请求复用 TCP / TLS 连接，省去每次握手
+- 连接 / 读取超时分别配置，避免请求无限挂起
+- 安装 h2 时启用 HTTP/2（单连接多路复用），否则使用 HTTP/1.1
+
+配置项见 config.py 中的 HttpClientConfig（llm.providers.<name>.http）。
+
+Usage:
+    from src.models.http_client import build_client
+
+    client = build_client(HttpClientConfig(), headers={"Authorization": "Bearer ..."})
+    resp = client.post(url, json=payload)
+"""
+import httpx
+
+from src.config import HttpClientConfig
+
+
+def http2_available() -> bool:
+    """是否安装了 HTTP/2 依赖 h2"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_kwargs(config: HttpClientConfig, headers: dict | None, pool_size: int) -> dict:
+    return {
+        "headers": headers,
+        "timeout": httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        "http2": config.http2 and http2_available(),
+    }
+
+
+def build_client(
+    config: HttpClientConfig | None = None,
+    headers: dict | None = None,
+) -> httpx.Client:
+    """创建同步连接池客户端（线程安全，可在线程池间共享）"""
+    config = config or HttpClientConfig()
+    return httpx.Client(**_client_kwargs(config, headers, config.pool_size))
+
+
+def build_async_client(
+    config: HttpClientConfig | None = None,
+    headers: dict | None = None,
+    pool_size: int | None = None,
+) -> httpx.AsyncClient:
+    """创建异步连接池客户端（绑定创建时的事件循环）
+
+    Args:
+        pool_size: 覆盖 config.pool_size，通常取 provider 的 max_concurrency
+    """
+    config = config or HttpClientConfig()
+    return httpx.AsyncClient(**_client_kwargs(config, headers, pool_size or config.pool_size))
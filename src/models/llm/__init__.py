@@ -13,8 +13,15 @@ from .manager import (
     MiniMaxProvider,
     ModelScopeProvider,
     BaseProvider,
+    OpenAICompatibleProvider,
     LLMProviderProtocol,
 )
+from .cache import LLMCache
+from .rate_limit import RateLimiter, RateLimitError
+from .router import LLMRouter
+from .singleflight import SingleFlight
+from .telemetry import Ledger, Usage, caller_tag
+from .tokens import PromptBudget, Section, TokenCounter
 
 __all__ = [
     "LLMManager",
@@ -22,5 +29,17 @@ __all__ = [
     "MiniMaxProvider",
     "ModelScopeProvider",
     "BaseProvider",
+    "OpenAICompatibleProvider",
     "LLMProviderProtocol",
+    "LLMCache",
+    "RateLimiter",
+    "RateLimitError",
+    "LLMRouter",
+    "SingleFlight",
+    "PromptBudget",
+    "Section",
+    "TokenCounter",
+    "Ledger",
+    "Usage",
+    "caller_tag",
 ]
@@ -0,0 +1,176 @@
+"""
+LLM 响应持久化缓存 - SQLite
+
+键: hash(provider, model, system_prompt, user_prompt, json_mode, prompt_version)
+- TTL: 超过有效期的条目视为未命中，并在写入时顺带清理
+- LRU: 总大小超过上限时，按最近访问时间淘汰（总大小由触发器维护在 meta 表中，写入时不扫全表）
+- 命中 / 未命中计数
+
+进程崩溃后重跑，已完成的调用直接命中缓存，几乎零成本。
+
+Usage:
+    from src.models.llm.cache import LLMCache
+
+    cache = LLMCache("data/llm_cache.db", ttl=30 * 86400, max_bytes=512 * 1024 * 1024)
+    key = cache.key("deepseek", "deepseek-chat", system, user, json_mode=True)
+    if (text := cache.get(key)) is None:
+        text = provider.complete(system, user, json_mode=True)
+        cache.put(key, text, provider="deepseek", model="deepseek-chat")
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """SQLite LLM 响应缓存（TTL + 按大小 LRU 淘汰）"""
+
+    def __init__(self, path: str, ttl: float = 30 * 86400, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite 文件路径
+            ttl: 有效期（秒），0 表示永不过期
+            max_bytes: 响应文本总大小上限（字节），超过后按 LRU 淘汰
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, provider TEXT, model TEXT, response TEXT NOT NULL,
+                size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at);
+
+            -- 响应总大小：与增删改在同一事务内由触发器更新，多进程共享同一缓存时也保持准确
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (name, value)
+                SELECT 'total_size', COALESCE(SUM(size), 0) FROM responses;
+            CREATE TRIGGER IF NOT EXISTS responses_size_ai AFTER INSERT ON responses BEGIN
+                UPDATE meta SET value = value + new.size WHERE name = 'total_size';
+            END;
+            CREATE TRIGGER IF NOT EXISTS responses_size_ad AFTER DELETE ON responses BEGIN
+                UPDATE meta SET value = value - old.size WHERE name = 'total_size';
+            END;
+            CREATE TRIGGER IF NOT EXISTS responses_size_au AFTER UPDATE OF size ON responses BEGIN
+                UPDATE meta SET value = value - old.size + new.size WHERE name = 'total_size';
+            END;
+            COMMIT;
+        """)
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        provider: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        prompt_version: str = "",
+    ) -> str:
+        """缓存键"""
+        payload = json.dumps(
+            [provider, model, system_prompt, user_prompt, json_mode, prompt_version],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """查询缓存，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and row[1] + self.ttl < now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, provider: str = "", model: str = "") -> None:
+        """写入缓存，随后按 TTL 与大小上限清理"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            # 用 UPSERT 而非 INSERT OR REPLACE：REPLACE 的隐式删除不触发删除触发器
+            self._conn.execute(
+                "INSERT INTO responses "
+                "(key, provider, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET provider = excluded.provider, "
+                "model = excluded.model, response = excluded.response, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (key, provider, model, response, size, now, now),
+            )
+            if self.ttl:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+                )
+            self._evict()
+            self._conn.commit()
+
+    def _total_size(self) -> int:
+        return self._conn.execute(
+            "SELECT value FROM meta WHERE name = 'total_size'"
+        ).fetchone()[0]
+
+    def _evict(self) -> None:
+        """总大小超限时按最近访问时间淘汰，降到上限的 90%"""
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        log.info(f"[LLMCache] LRU 淘汰 {len(victims)} 条, 释放 {freed / 1024:.0f} KB")
+
+    def clear(self) -> int:
+        """清空缓存，返回删除条数"""
+        with self._lock:
+            count = self._conn.execute("DELETE FROM responses").rowcount
+            self._conn.commit()
+        return count
+
+    def stats(self) -> dict:
+        """缓存统计：条数 / 总大小 / 本进程命中与未命中"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self._total_size()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
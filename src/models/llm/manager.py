@@ -8,13 +8,45 @@
 - 单次推理 (complete)
 - 批量推理 (complete_batch)
 - 流式生成 (stream)
+- 异步推理 (acomplete / acomplete_batch / astream)：单事件循环上承载大量并发请求，
+  每个 provider 以信号量限制在途请求数（llm.providers.<name>.max_concurrency）
+- 限流 (rate_limit.py)：按 provider 共享 RPM / TPM 令牌桶与 AIMD 自适应并发，
+  429 按 Retry-After 暂停后重试
+- 路由 (router.py)：抖动退避重试、按延迟分位数对冲、按 llm.router.failover 故障转移
+- 响应缓存 (SQLite，见 cache.py)
+- 请求合并 (singleflight.py)：进程内相同的在途请求共享一次上游调用
+- 调用遥测 (telemetry.py)：每次调用的延迟 / token / 错误写入 JSONL 账本
 """
+import asyncio
+import contextvars
+import json
 import logging
+import os
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
-from typing import Iterator, Protocol, runtime_checkable
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Protocol, runtime_checkable
 
-from src.config import load_config
+from src.config import (
+    HttpClientConfig,
+    LLMCacheConfig,
+    LLMRouterConfig,
+    LLMTelemetryConfig,
+    load_config,
+)
+from src.models.http_client import build_async_client, build_client
+
+from .cache import LLMCache
+from .rate_limit import EXPECTED_OUTPUT_TOKENS, RateLimitError, get_limiter, parse_retry_after
+from .router import LLMRouter, get_histogram, mark_dispatched, run_sync
+from .singleflight import SingleFlight
+from .streaming import ThinkFilter, aiter_sse, iter_sse
+from .telemetry import CallRecord, Ledger, Usage, current_caller, get_ledger
+from .tokens import PromptBudget, TokenCounter
+from .tokens import context_window as default_context_window
 
 log = logging.getLogger(__name__)
 
@@ -36,14 +68,167 @@ class LLMProviderProtocol(Protocol):
         ...
 
     def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
-        """流式生成"""
+        """流式生成，只输出可见文本（不含 <think> 推理块）"""
+        ...
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, json_mode: bool = False) -> str:
+        """异步单次推理"""
+        ...
+
+    async def acomplete_batch(
+        self, system_prompt: str, user_prompts: list[str], json_mode: bool = False
+    ) -> list[str]:
+        """异步批量推理"""
+        ...
+
+    def astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """异步流式生成"""
         ...
 
 
 # ============ Base Provider ============
 
 class BaseProvider:
-    """Provider 基类 - 提供统一的 complete_batch 实现"""
+    """Provider 基类 - 统一的限流、429 重试、批量推理与异步并发控制
+
+    子类实现 _complete / _stream / _acomplete / _astream（单次原始调用），
+    _complete / _acomplete 返回 (文本, 接口返回的 Usage 或 None)，
+    429 统一转换为 RateLimitError。公开方法在外层套上共享限流器（见 rate_limit.py），
+    异步方法另有按事件循环隔离的信号量作为硬上限。
+    设置了 ledger 时，每次原始调用（含重试与失败）写入一条遥测记录。
+    """
+
+    name: str = ""
+    model: str = ""
+    max_concurrency: int = 16
+    max_retries: int = 3
+    ledger: Ledger | None = None
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int | None = None,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        context_window: int = 0,
+        tokenizer: str = "",
+    ) -> None:
+        """
+        Args:
+            max_concurrency / rpm / tpm: 限流参数，None 表示沿用该 provider 共享限流器的现有配置
+        """
+        self.model = model
+        self.limiter = get_limiter(self.name, rpm=rpm, tpm=tpm, max_concurrency=max_concurrency)
+        self.max_concurrency = self.limiter.max_concurrency
+        self.counter = TokenCounter(model, tokenizer)
+        self.context_window = context_window or default_context_window(model)
+
+    # ============ 原始调用（子类实现） ============
+
+    def _complete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        raise NotImplementedError
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def _acomplete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        raise NotImplementedError
+
+    def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    # ============ 限流反馈 ============
+
+    def _reserve(self, system_prompt: str, user_prompt: str) -> int:
+        """调用前预扣的 token 数（提示词 + 预期输出）"""
+        return (
+            self.counter.count(system_prompt)
+            + self.counter.count(user_prompt)
+            + EXPECTED_OUTPUT_TOKENS
+        )
+
+    def _on_success(self, reserved: int, started: float, used: Usage | None) -> None:
+        """started 为通过限流器的时刻，延迟只含上游调用，同时计入路由的对冲直方图"""
+        latency = time.monotonic() - started
+        self.limiter.release(
+            started,
+            latency=latency,
+            tokens_delta=used.total_tokens - reserved if used else 0,
+        )
+        get_histogram(self.name).observe(latency)
+
+    def _on_throttled(
+        self, reserved: int, started: float, error: RateLimitError, attempt: int
+    ) -> None:
+        """记录 429；重试次数用尽时重新抛出"""
+        self.limiter.release(
+            started, throttled=True, retry_after=error.retry_after, tokens_delta=-reserved
+        )
+        if attempt >= self.max_retries:
+            raise error
+        log.warning(f"[{self.name}] 触发限流，第 {attempt + 1} 次重试")
+
+    # ============ 遥测 ============
+
+    def _record(
+        self,
+        started: float,
+        prompts: tuple[str, str],
+        text: str = "",
+        usage: Usage | None = None,
+        error: BaseException | None = None,
+        ttft: float | None = None,
+        stream: bool = False,
+    ) -> None:
+        """写入一条调用记录；成功但接口未返回用量时按分词计数估算"""
+        if self.ledger is None:
+            return
+        record = CallRecord(
+            ts=time.time(),
+            provider=self.name,
+            model=self.model,
+            caller=current_caller(),
+            latency=time.monotonic() - started,
+            ttft=ttft,
+            stream=stream,
+        )
+        if error is not None:
+            cancelled = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+            record.error = "Cancelled" if cancelled else type(error).__name__
+        elif usage is not None:
+            record.prompt_tokens = usage.prompt_tokens
+            record.completion_tokens = usage.completion_tokens
+        else:
+            record.prompt_tokens = sum(self.counter.count(p) for p in prompts)
+            record.completion_tokens = self.counter.count(text)
+            record.estimated = True
+        self.ledger.append(record)
+
+    # ============ 同步 ============
+
+    def complete(self, system_prompt: str, user_prompt: str, json_mode: bool = False) -> str:
+        """单次推理 - 受限流器控制，429 时按 Retry-After 暂停后重试"""
+        reserved = self._reserve(system_prompt, user_prompt)
+        for attempt in range(self.max_retries + 1):
+            started = self.limiter.acquire(reserved)
+            try:
+                text, used = self._complete(system_prompt, user_prompt, json_mode)
+            except RateLimitError as e:
+                self._record(started, (system_prompt, user_prompt), error=e)
+                self._on_throttled(reserved, started, e, attempt)
+                continue
+            except BaseException as e:
+                self.limiter.release(started, tokens_delta=-reserved)
+                self._record(started, (system_prompt, user_prompt), error=e)
+                raise
+            self._on_success(reserved, started, used)
+            self._record(started, (system_prompt, user_prompt), text, used)
+            return text
+        raise AssertionError("unreachable")
 
     def complete_batch(
         self, system_prompt: str, user_prompts: list[str], json_mode: bool = False
@@ -54,53 +239,248 @@ class BaseProvider:
         def call(prompt: str) -> str:
             return self.complete(system_prompt, prompt, json_mode)
 
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            results = list(executor.map(call, user_prompts))
+        # 每个任务带上提交时的上下文（遥测的阶段标记）
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, 32)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, call, prompt)
+                for prompt in user_prompts
+            ]
+            results = [future.result() for future in futures]
 
         success_count = sum(1 for r in results if r)
         log.info(f"[complete_batch] 完成 {success_count}/{len(user_prompts)} 成功")
         return results
 
+    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """流式生成，整个流期间占用一个限流名额（流式输出不做 429 重试）"""
+        reserved = self._reserve(system_prompt, user_prompt)
+        started = self.limiter.acquire(reserved)
+        prompts = (system_prompt, user_prompt)
+        chunks: list[str] = []
+        ttft = None
+        try:
+            for chunk in self._stream(system_prompt, user_prompt):
+                if ttft is None:
+                    ttft = time.monotonic() - started
+                chunks.append(chunk)
+                yield chunk
+        except RateLimitError as e:
+            self.limiter.release(
+                started, throttled=True, retry_after=e.retry_after, tokens_delta=-reserved
+            )
+            self._record(started, prompts, error=e, ttft=ttft, stream=True)
+            raise
+        except BaseException as e:
+            self.limiter.release(started)
+            self._record(started, prompts, error=e, ttft=ttft, stream=True)
+            raise
+        self.limiter.release(started)
+        self._record(started, prompts, "".join(chunks), ttft=ttft, stream=True)
 
-# ============ DeepSeek ============
+    # ============ 异步 ============
 
-class DeepSeekProvider(BaseProvider):
-    """DeepSeek LLM 提供者"""
+    def _loop_state(self) -> dict:
+        """当前事件循环专属的状态（信号量、异步客户端）
 
-    def __init__(self, api_key: str, model: str = "deepseek-chat") -> None:
-        from openai import OpenAI
+        asyncio 原语与异步 HTTP 连接池都绑定创建时的事件循环，
+        多次 asyncio.run() 之间不能复用，因此按循环分别创建，循环销毁后自动释放。
+        """
+        loop = asyncio.get_running_loop()
+        if not hasattr(self, "_loops"):
+            self._loops: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = {
+                "semaphore": asyncio.Semaphore(max(self.max_concurrency, 1))
+            }
+        return state
 
-        if not api_key:
-            raise ValueError("请在 .env 文件中配置 DEEPSEEK_API_KEY 或 config.yaml")
-        self.client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com/v1")
-        self.model = model
-        log.info(f"[DeepSeekProvider] 初始化完成, model={model}")
+    def _async_client(self):
+        """当前事件循环的异步客户端，首次使用时由 _new_async_client 创建"""
+        state = self._loop_state()
+        if "client" not in state:
+            state["client"] = self._new_async_client()
+        return state["client"]
 
-    def complete(
+    def _new_async_client(self):
+        raise NotImplementedError
+
+    async def acomplete(
         self, system_prompt: str, user_prompt: str, json_mode: bool = False
     ) -> str:
-        """完成推理"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        kwargs: dict = {"model": self.model, "messages": messages}
+        """异步单次推理，在途请求数受 max_concurrency 与限流器共同限制"""
+        reserved = self._reserve(system_prompt, user_prompt)
+        async with self._loop_state()["semaphore"]:
+            for attempt in range(self.max_retries + 1):
+                started = await self.limiter.aacquire(reserved)
+                mark_dispatched()
+                try:
+                    text, used = await self._acomplete(system_prompt, user_prompt, json_mode)
+                except RateLimitError as e:
+                    self._record(started, (system_prompt, user_prompt), error=e)
+                    self._on_throttled(reserved, started, e, attempt)
+                    continue
+                except BaseException as e:
+                    self.limiter.release(started, tokens_delta=-reserved)
+                    self._record(started, (system_prompt, user_prompt), error=e)
+                    raise
+                self._on_success(reserved, started, used)
+                self._record(started, (system_prompt, user_prompt), text, used)
+                return text
+        raise AssertionError("unreachable")
+
+    async def acomplete_batch(
+        self, system_prompt: str, user_prompts: list[str], json_mode: bool = False
+    ) -> list[str]:
+        """异步批量推理 - 全部请求同时提交，由信号量与限流器控制，结果与输入顺序一致"""
+        log.info(f"[acomplete_batch] 开始批量推理 {len(user_prompts)} 条")
+        results = await asyncio.gather(
+            *(self.acomplete(system_prompt, p, json_mode) for p in user_prompts)
+        )
+        success_count = sum(1 for r in results if r)
+        log.info(f"[acomplete_batch] 完成 {success_count}/{len(user_prompts)} 成功")
+        return list(results)
+
+    async def astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """异步流式生成，整个流期间占用一个并发名额"""
+        reserved = self._reserve(system_prompt, user_prompt)
+        async with self._loop_state()["semaphore"]:
+            started = await self.limiter.aacquire(reserved)
+            prompts = (system_prompt, user_prompt)
+            chunks: list[str] = []
+            ttft = None
+            try:
+                async for chunk in self._astream(system_prompt, user_prompt):
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    chunks.append(chunk)
+                    yield chunk
+            except RateLimitError as e:
+                self.limiter.release(
+                    started, throttled=True, retry_after=e.retry_after, tokens_delta=-reserved
+                )
+                self._record(started, prompts, error=e, ttft=ttft, stream=True)
+                raise
+            except BaseException as e:
+                self.limiter.release(started)
+                self._record(started, prompts, error=e, ttft=ttft, stream=True)
+                raise
+            self.limiter.release(started)
+            self._record(started, prompts, "".join(chunks), ttft=ttft, stream=True)
+
+
+# ============ OpenAI 兼容接口 ============
+
+class OpenAICompatibleProvider(BaseProvider):
+    """OpenAI 兼容接口的 provider 基类（DeepSeek / ModelScope）"""
+
+    BASE_URL = ""
+    ENV_KEY = ""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        **kwargs,
+    ) -> None:
+        from openai import OpenAI
+
+        if not api_key:
+            raise ValueError(f"请在 .env 文件中配置 {self.ENV_KEY} 或 config.yaml")
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url or self.BASE_URL
+        # 429 重试由限流器统一处理，关闭 SDK 内置重试
+        self.client = OpenAI(api_key=api_key, base_url=self.base_url, max_retries=0)
+        log.info(f"[{type(self).__name__}] 初始化完成, model={model}")
+
+    def _new_async_client(self):
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+
+    @contextmanager
+    def _translate_errors(self):
+        """把 SDK 的 429 异常转换为 RateLimitError"""
+        import openai
+
+        try:
+            yield
+        except openai.RateLimitError as e:
+            raise RateLimitError(
+                str(e), self.name, parse_retry_after(getattr(e.response, "headers", None))
+            ) from e
+
+    def _request(self, system_prompt: str, user_prompt: str, json_mode: bool) -> dict:
+        kwargs: dict = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        }
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
 
-        resp = self.client.chat.completions.create(**kwargs)
-        return resp.choices[0].message.content or ""
+    @staticmethod
+    def _parse_response(resp) -> tuple[str, Usage | None]:
+        usage = getattr(resp, "usage", None)
+        return resp.choices[0].message.content or "", Usage.from_counts(
+            getattr(usage, "prompt_tokens", None),
+            getattr(usage, "completion_tokens", None),
+            getattr(usage, "total_tokens", None),
+        )
 
-    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
-        """流式生成"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        stream = self.client.chat.completions.create(model=self.model, messages=messages, stream=True)
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+    def _complete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        with self._translate_errors():
+            resp = self.client.chat.completions.create(
+                **self._request(system_prompt, user_prompt, json_mode)
+            )
+        return self._parse_response(resp)
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        with self._translate_errors():
+            stream = self.client.chat.completions.create(
+                **self._request(system_prompt, user_prompt, False), stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def _acomplete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        with self._translate_errors():
+            resp = await self._async_client().chat.completions.create(
+                **self._request(system_prompt, user_prompt, json_mode)
+            )
+        return self._parse_response(resp)
+
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        with self._translate_errors():
+            stream = await self._async_client().chat.completions.create(
+                **self._request(system_prompt, user_prompt, False), stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+# ============ DeepSeek ============
+
+class DeepSeekProvider(OpenAICompatibleProvider):
+    """DeepSeek LLM 提供者"""
+
+    name = "deepseek"
+    BASE_URL = "https://api.deepseek.com/v1"
+    ENV_KEY = "DEEPSEEK_API_KEY"
+
+    def __init__(self, api_key: str, model: str = "deepseek-chat", **kwargs) -> None:
+        super().__init__(api_key, model, **kwargs)
 
 
 # ============ MiniMax ============
@@ -108,33 +488,40 @@ class DeepSeekProvider(BaseProvider):
 class MiniMaxProvider(BaseProvider):
     """MiniMax LLM 提供者"""
 
+    name = "minimax"
     BASE_URL = "https://api.minimaxi.com/v1"
+    # base_resp.status_code 中表示限流的错误码（RPM / TPM）
+    RATE_LIMIT_CODES = {1002, 1039}
 
-    def __init__(self, api_key: str, group_id: str | None = None, model: str = "abab6.5s-chat") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        group_id: str | None = None,
+        model: str = "abab6.5s-chat",
+        http: HttpClientConfig | None = None,
+        base_url: str | None = None,
+        **kwargs,
+    ) -> None:
         if not api_key:
             raise ValueError("请在 .env 文件中配置 MINIMAX_API_KEY 或 config.yaml")
+        super().__init__(model, **kwargs)
         self.api_key = api_key
+        self.base_url = base_url or self.BASE_URL
         self.group_id = group_id
-        self.model = model
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        self.http = http or HttpClientConfig()
+        # Content-Type 由 json= 自动设置
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.client = build_client(self.http, headers=self.headers)
         log.info(f"[MiniMaxProvider] 初始化完成, model={model}")
 
     def _url(self, endpoint: str) -> str:
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         if self.group_id:
             url += f"?GroupId={self.group_id}"
         return url
 
-    def complete(
-        self, system_prompt: str, user_prompt: str, json_mode: bool = False
-    ) -> str:
-        """完成推理"""
-        import requests
-
-        payload = {
+    def _payload(self, system_prompt: str, user_prompt: str) -> dict:
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt},
@@ -142,63 +529,134 @@ class MiniMaxProvider(BaseProvider):
             ],
         }
 
-        resp = requests.post(self._url("/chat_completion_v2"), headers=self.headers, json=payload)
+    def _check_status(self, resp) -> None:
+        """HTTP 状态检查（响应体需已读取）；429 转换为 RateLimitError"""
+        if resp.status_code == 429:
+            raise RateLimitError(
+                f"MiniMax 限流: {resp.text}", self.name, parse_retry_after(resp.headers)
+            )
         if resp.status_code != 200:
             raise RuntimeError(f"MiniMax API 错误: {resp.text}")
 
-        content = resp.json().get("choices", [{}])[0].get("message", {}).get("content")
+    def _check_base_resp(self, data: dict, headers) -> None:
+        """业务状态码检查：限流错误码转换为 RateLimitError，其余非零状态抛出 RuntimeError"""
+        base_resp = data.get("base_resp") or {}
+        code = base_resp.get("status_code") or 0
+        if code in self.RATE_LIMIT_CODES:
+            raise RateLimitError(
+                f"MiniMax 限流: {base_resp.get('status_msg')}",
+                self.name,
+                parse_retry_after(headers),
+            )
+        if code:
+            raise RuntimeError(f"MiniMax API 错误: {code} {base_resp.get('status_msg')}")
+
+    def _parse_response(self, resp) -> tuple[str, Usage | None]:
+        """解析 chat_completion_v2 响应"""
+        self._check_status(resp)
+        data = resp.json()
+        self._check_base_resp(data, resp.headers)
+        content = (data.get("choices") or [{}])[0].get("message", {}).get("content")
         if not content:
             raise RuntimeError("响应为空")
-        return content
+        usage = data.get("usage") or {}
+        return content, Usage.from_counts(
+            usage.get("prompt_tokens"), usage.get("completion_tokens"), usage.get("total_tokens")
+        )
 
-    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
-        """流式生成 - MiniMax 暂不支持，返回空迭代器"""
-        log.warning("[MiniMaxProvider] 流式生成暂不支持")
-        return iter([])
+    def _stream_payload(self, system_prompt: str, user_prompt: str) -> dict:
+        return {**self._payload(system_prompt, user_prompt), "stream": True}
 
+    def _stream_delta(self, event: str, headers) -> str | None:
+        """解析一个 SSE 事件，返回增量文本；流结束标记返回 None
 
-# ============ ModelScope (Qwen) ============
+        只取 delta.content：流末尾汇总完整 message 的事件不再重复输出。
+        """
+        if event.strip() == "[DONE]":
+            return None
+        data = json.loads(event)
+        self._check_base_resp(data, headers)
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
 
-class ModelScopeProvider(BaseProvider):
-    """ModelScope (Qwen) LLM 提供者"""
+    def _complete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        resp = self.client.post(
+            self._url("/chat_completion_v2"), json=self._payload(system_prompt, user_prompt)
+        )
+        return self._parse_response(resp)
 
-    def __init__(self, api_key: str, model: str = "qwen-turbo") -> None:
-        from openai import OpenAI
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """SSE 流式生成，过滤 <think> 推理块"""
+        think = ThinkFilter()
+        with self.client.stream(
+            "POST",
+            self._url("/chat_completion_v2"),
+            json=self._stream_payload(system_prompt, user_prompt),
+        ) as resp:
+            if resp.status_code != 200:
+                resp.read()
+                self._check_status(resp)
+            for event in iter_sse(resp.iter_lines()):
+                delta = self._stream_delta(event, resp.headers)
+                if delta is None:
+                    break
+                text = think.feed(delta)
+                if text:
+                    yield text
+        text = think.flush()
+        if text:
+            yield text
 
-        if not api_key:
-            raise ValueError("请在 .env 文件中配置 MODELSCOPE_API_KEY 或 config.yaml")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api-inference.modelscope.cn/v1",
+    def _new_async_client(self):
+        return build_async_client(
+            self.http,
+            headers=self.headers,
+            pool_size=max(self.max_concurrency, self.http.pool_size),
         )
-        self.model = model
-        log.info(f"[ModelScopeProvider] 初始化完成, model={model}")
 
-    def complete(
-        self, system_prompt: str, user_prompt: str, json_mode: bool = False
-    ) -> str:
-        """完成推理"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        kwargs: dict = {"model": self.model, "messages": messages}
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
+    async def _acomplete(
+        self, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, Usage | None]:
+        resp = await self._async_client().post(
+            self._url("/chat_completion_v2"), json=self._payload(system_prompt, user_prompt)
+        )
+        return self._parse_response(resp)
 
-        resp = self.client.chat.completions.create(**kwargs)
-        return resp.choices[0].message.content or ""
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        think = ThinkFilter()
+        async with self._async_client().stream(
+            "POST",
+            self._url("/chat_completion_v2"),
+            json=self._stream_payload(system_prompt, user_prompt),
+        ) as resp:
+            if resp.status_code != 200:
+                await resp.aread()
+                self._check_status(resp)
+            async for event in aiter_sse(resp.aiter_lines()):
+                delta = self._stream_delta(event, resp.headers)
+                if delta is None:
+                    break
+                text = think.feed(delta)
+                if text:
+                    yield text
+        text = think.flush()
+        if text:
+            yield text
 
-    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
-        """流式生成"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        stream = self.client.chat.completions.create(model=self.model, messages=messages, stream=True)
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+
+# ============ ModelScope (Qwen) ============
+
+class ModelScopeProvider(OpenAICompatibleProvider):
+    """ModelScope (Qwen) LLM 提供者"""
+
+    name = "modelscope"
+    BASE_URL = "https://api-inference.modelscope.cn/v1"
+    ENV_KEY = "MODELSCOPE_API_KEY"
+
+    def __init__(self, api_key: str, model: str = "qwen-turbo", **kwargs) -> None:
+        super().__init__(api_key, model, **kwargs)
 
 
 # ============ LLM Manager ============
@@ -238,17 +696,87 @@ class LLMManager:
         # 流式生成
         for chunk in llm.stream("你是一个助手", "你好"):
             print(chunk, end="", flush=True)
+
+        # 异步批量推理（单事件循环，并发受 max_concurrency 限制）
+        results = await llm.acomplete_batch("你是一个助手", prompts)
+
+        # 跳过缓存（如需要多样化输出时）
+        result = llm.complete("你是一个助手", "讲个笑话", use_cache=False)
+
+    complete / complete_batch 及其异步版本经由 LLMRouter 调度：
+    失败时退避重试并切换到 llm.router.failover 中的下一个 provider，
+    主请求过慢时向备用 provider 发出对冲请求。
+    未命中缓存的相同请求（provider / 模型 / 提示词相同）同时在途时只发出一次上游调用。
     """
 
-    def __init__(self, engine: str = "deepseek", config_path: str | None = None) -> None:
+    def __init__(
+        self,
+        engine: str = "deepseek",
+        config_path: str | None = None,
+        cache: bool = True,
+        base_url: str | None = None,
+    ) -> None:
         """初始化 LLM 管理器
 
         Args:
             engine: 使用的 provider 名称 (minimax/deepseek/modelscope)
             config_path: 配置文件路径
+            cache: 是否启用响应缓存（还需 llm.cache.enabled 为 true）
+            base_url: 覆盖所有 provider 的接口地址（如本地桩服务），默认取环境变量 LLM_BASE_URL
         """
         self.engine = engine
+        self.base_url = base_url or os.getenv("LLM_BASE_URL") or None
+        if self.base_url:
+            log.info(f"[LLMManager] 接口地址覆盖为 {self.base_url}")
         self.provider = self._create_provider(engine, config_path)
+        self.router_config = self._load_router_config(config_path)
+        self.router = LLMRouter(
+            [self.provider, *self._create_failover(config_path)], self.router_config
+        )
+        self.cache_config = self._load_cache_config(config_path)
+        self.cache: LLMCache | None = None
+        # 缓存键不含接口地址，覆盖地址（桩服务）时不读写缓存，以免与真实响应混用
+        if cache and self.cache_config.enabled and not self.base_url:
+            self.cache = _get_cache(self.cache_config)
+        self.telemetry_config = self._load_telemetry_config(config_path)
+        self.ledger: Ledger | None = None
+        if self.telemetry_config.enabled:
+            self.ledger = get_ledger(self.telemetry_config)
+            for provider in self.router.providers:
+                provider.ledger = self.ledger
+
+    @staticmethod
+    def _load_cache_config(config_path: str | None) -> LLMCacheConfig:
+        try:
+            return load_config(config_path).llm.cache
+        except Exception:
+            return LLMCacheConfig()
+
+    @staticmethod
+    def _load_telemetry_config(config_path: str | None) -> LLMTelemetryConfig:
+        try:
+            return load_config(config_path).llm.telemetry
+        except Exception:
+            return LLMTelemetryConfig()
+
+    @staticmethod
+    def _load_router_config(config_path: str | None) -> LLMRouterConfig:
+        try:
+            return load_config(config_path).llm.router
+        except Exception:
+            return LLMRouterConfig()
+
+    def _create_failover(self, config_path: str | None) -> list[LLMProviderProtocol]:
+        """按 llm.router.failover 创建备用 provider，未配置密钥的跳过"""
+        providers = []
+        for engine in self.router_config.failover:
+            if engine == self.engine:
+                continue
+            try:
+                providers.append(self._create_provider(engine, config_path))
+            except ValueError as e:
+                log.warning(f"[LLMManager] 备用 provider {engine} 不可用: {e}")
+        return providers
 
     def _create_provider(
         self, engine: str, config_path: str | None = None
@@ -260,18 +788,37 @@ class LLMManager:
 
             if engine == "minimax" and providers.minimax:
                 return MiniMaxProvider(
-                    api_key=providers.minimax.api_key,
+                    api_key=self._api_key(providers.minimax.api_key),
                     model=providers.minimax.model,
+                    max_concurrency=providers.minimax.max_concurrency,
+                    rpm=providers.minimax.rpm,
+                    tpm=providers.minimax.tpm,
+                    context_window=providers.minimax.context_window,
+                    tokenizer=providers.minimax.tokenizer,
+                    base_url=self.base_url,
+                    http=providers.minimax.http,
                 )
             if engine == "deepseek" and providers.deepseek:
                 return DeepSeekProvider(
-                    api_key=providers.deepseek.api_key,
+                    api_key=self._api_key(providers.deepseek.api_key),
                     model=providers.deepseek.model,
+                    max_concurrency=providers.deepseek.max_concurrency,
+                    rpm=providers.deepseek.rpm,
+                    tpm=providers.deepseek.tpm,
+                    context_window=providers.deepseek.context_window,
+                    tokenizer=providers.deepseek.tokenizer,
+                    base_url=self.base_url,
                 )
             if engine == "modelscope" and providers.modelscope:
                 return ModelScopeProvider(
-                    api_key=providers.modelscope.api_key,
+                    api_key=self._api_key(providers.modelscope.api_key),
                     model=providers.modelscope.model,
+                    max_concurrency=providers.modelscope.max_concurrency,
+                    rpm=providers.modelscope.rpm,
+                    tpm=providers.modelscope.tpm,
+                    context_window=providers.modelscope.context_window,
+                    tokenizer=providers.modelscope.tokenizer,
+                    base_url=self.base_url,
                 )
         except Exception as e:
             log.warning(f"[LLMManager] 加载配置失败: {e}，使用环境变量")
@@ -281,37 +828,217 @@ class LLMManager:
 
     def _create_from_env(self, engine: str) -> LLMProviderProtocol:
         """从环境变量创建 provider"""
-        import os
-
         if engine == "minimax":
             return MiniMaxProvider(
-                api_key=os.getenv("MINIMAX_API_KEY", ""),
+                api_key=self._api_key(os.getenv("MINIMAX_API_KEY", "")),
                 group_id=os.getenv("MINIMAX_GROUP_ID"),
+                base_url=self.base_url,
             )
         if engine == "deepseek":
-            return DeepSeekProvider(api_key=os.getenv("DEEPSEEK_API_KEY", ""))
+            return DeepSeekProvider(
+                api_key=self._api_key(os.getenv("DEEPSEEK_API_KEY", "")), base_url=self.base_url
+            )
         if engine == "modelscope":
-            return ModelScopeProvider(api_key=os.getenv("MODELSCOPE_API_KEY", ""))
+            return ModelScopeProvider(
+                api_key=self._api_key(os.getenv("MODELSCOPE_API_KEY", "")), base_url=self.base_url
+            )
         raise ValueError(f"Unknown engine: {engine}")
 
+    def _api_key(self, api_key: str) -> str:
+        """覆盖了接口地址（本地桩服务）时允许不配置密钥"""
+        return api_key or ("stub" if self.base_url else "")
+
+    # ============ 缓存 ============
+
+    def _cache_key(
+        self, system_prompt: str, user_prompt: str, json_mode: bool, prompt_version: str | None
+    ) -> str:
+        return LLMCache.key(
+            self.engine,
+            getattr(self.provider, "model", ""),
+            system_prompt,
+            user_prompt,
+            json_mode,
+            prompt_version or self.cache_config.prompt_version,
+        )
+
+    def _cache_put(self, key: str, response: str, provider) -> None:
+        # 空响应多为异常结果，不缓存；缓存键按主 provider / 模型计算，
+        # 故障转移或对冲由其他 provider 应答时不缓存，以免被当作主模型的输出复用
+        if provider is not self.provider:
+            log.debug(f"[LLMManager] 响应来自 {provider.name}，不写入缓存")
+            return
+        if self.cache is not None and response:
+            self.cache.put(
+                key, response, provider=self.engine, model=getattr(self.provider, "model", "")
+            )
+
+    def _record_cache_hit(self, started: float) -> None:
+        if self.ledger is not None:
+            self.ledger.append(CallRecord(
+                ts=time.time(),
+                provider=self.engine,
+                model=getattr(self.provider, "model", ""),
+                caller=current_caller(),
+                latency=time.monotonic() - started,
+                cache_hit=True,
+            ))
+
+    def cache_stats(self) -> dict:
+        """缓存统计（未启用缓存时为空）"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def budget(self, output_tokens: int = 1024, max_input_tokens: int | None = None) -> PromptBudget:
+        """提示词预算：按主 provider 的分词计数，上下文取路由中各 provider 的最小值
+
+        Args:
+            output_tokens: 为输出预留的 token
+            max_input_tokens: 输入上限，None 表示尽量填满上下文窗口
+        """
+        return PromptBudget(
+            self.provider.counter,
+            min(p.context_window for p in self.router.providers),
+            output_tokens=output_tokens,
+            max_input_tokens=max_input_tokens,
+        )
+
+    def router_stats(self) -> dict:
+        """路由统计：对冲 / 重试 / 故障转移次数与各 provider 延迟分位数"""
+        return self.router.stats()
+
+    # ============ 推理 ============
+
+    def _lookup(
+        self, system_prompt: str, user_prompt: str, json_mode: bool, prompt_version: str | None
+    ) -> tuple[str, str | None]:
+        """返回 (缓存 / 合并键, 命中的缓存响应)"""
+        started = time.monotonic()
+        key = self._cache_key(system_prompt, user_prompt, json_mode, prompt_version)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            self._record_cache_hit(started)
+        return key, cached
+
     def complete(
         self,
         system_prompt: str,
         user_prompt: str,
         json_mode: bool = False,
+        use_cache: bool = True,
+        prompt_version: str | None = None,
     ) -> str:
-        """单次推理"""
-        return self.provider.complete(system_prompt, user_prompt, json_mode)
+        """单次推理
+
+        未命中缓存时，与进程内相同的在途请求合并为一次上游调用（见 singleflight.py）。
+
+        Args:
+            use_cache: 是否读写响应缓存；False 视为需要独立采样，也不与其他请求合并
+            prompt_version: 提示词版本（参与缓存键），默认取 llm.cache.prompt_version
+        """
+        if not use_cache:
+            return self.router.complete(system_prompt, user_prompt, json_mode)
+
+        key, cached = self._lookup(system_prompt, user_prompt, json_mode, prompt_version)
+        if cached is not None:
+            return cached
+
+        def call() -> str:
+            response, provider = run_sync(
+                self.router.acomplete_routed(system_prompt, user_prompt, json_mode)
+            )
+            self._cache_put(key, response, provider)
+            return response
+
+        return _flight.do(key, call)
 
     def complete_batch(
         self,
         system_prompt: str,
         user_prompts: list[str],
         json_mode: bool = False,
+        use_cache: bool = True,
+        prompt_version: str | None = None,
     ) -> list[str]:
-        """批量推理"""
-        return self.provider.complete_batch(system_prompt, user_prompts, json_mode)
+        """批量推理，只对未命中缓存的提示词发起调用，重复的提示词只调用一次"""
+        log.info(f"[LLMManager] 开始批量推理 {len(user_prompts)} 条")
+        results = run_sync(
+            self.acomplete_batch(system_prompt, user_prompts, json_mode, use_cache, prompt_version)
+        )
+        log.info(f"[LLMManager] 完成 {sum(1 for r in results if r)}/{len(user_prompts)} 成功")
+        return results
 
     def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
         """流式生成"""
         return self.provider.stream(system_prompt, user_prompt)
+
+    # ============ 异步推理 ============
+
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = False,
+        use_cache: bool = True,
+        prompt_version: str | None = None,
+    ) -> str:
+        """异步单次推理，参数同 complete"""
+        if not use_cache:
+            return await self.router.acomplete(system_prompt, user_prompt, json_mode)
+
+        key, cached = self._lookup(system_prompt, user_prompt, json_mode, prompt_version)
+        if cached is not None:
+            return cached
+
+        async def call() -> str:
+            response, provider = await self.router.acomplete_routed(
+                system_prompt, user_prompt, json_mode
+            )
+            self._cache_put(key, response, provider)
+            return response
+
+        return await _flight.ado(key, call)
+
+    async def acomplete_batch(
+        self,
+        system_prompt: str,
+        user_prompts: list[str],
+        json_mode: bool = False,
+        use_cache: bool = True,
+        prompt_version: str | None = None,
+    ) -> list[str]:
+        """异步批量推理，只对未命中缓存的提示词发起调用，重复的提示词只调用一次"""
+        results = await asyncio.gather(
+            *(
+                self.acomplete(system_prompt, p, json_mode, use_cache, prompt_version)
+                for p in user_prompts
+            )
+        )
+        return [r or "" for r in results]
+
+    def astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """异步流式生成"""
+        return self.provider.astream(system_prompt, user_prompt)
+
+    @staticmethod
+    def singleflight_stats() -> dict:
+        """请求合并统计（进程内所有 LLMManager 共享）：上游调用数 / 合并掉的调用数"""
+        return _flight.stats()
+
+
+# 相同的在途请求在进程内合并（键含 provider 与模型，不同 LLMManager 之间同样合并）
+_flight = SingleFlight()
+
+# 同一缓存文件在进程内共享一个连接
+_caches: dict[str, LLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(config: LLMCacheConfig) -> LLMCache:
+    with _caches_lock:
+        if config.path not in _caches:
+            _caches[config.path] = LLMCache(
+                config.path,
+                ttl=config.ttl_days * 86400,
+                max_bytes=config.max_size_mb * 1024 * 1024,
+            )
+        return _caches[config.path]
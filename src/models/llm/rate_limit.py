@@ -0,0 +1,347 @@
+"""
+Provider 级限流器 - 令牌桶 (RPM / TPM) + AIMD 自适应并发
+
+- 请求桶与 token 桶按每分钟配额连续补充；token 先按估算值预扣，调用完成后按实际用量校正
+- 并发上限按 AIMD 调整：每次正常返回加性增长（约每个窗口 +1），
+  收到 429 或延迟显著高于基线时乘性减半；上次减小之前发出的请求带回的信号忽略，
+  避免同一波 429 把并发连续打到底
+- 429 的 Retry-After 对该 provider 的所有调用生效：期间不再放行新请求
+- 同一 provider 的所有 LLMManager / 线程 / 事件循环共享一个限流器（get_limiter），
+  以不同配额再次获取时按新配额更新
+
+Usage:
+    limiter = get_limiter("deepseek", rpm=500, tpm=300_000, max_concurrency=32)
+
+    started = limiter.acquire(tokens=1200)    # 异步: await limiter.aacquire(tokens=1200)
+    try:
+        text = call_api()
+    except RateLimitError as e:
+        limiter.release(started, throttled=True, retry_after=e.retry_after)
+        raise
+    limiter.release(started, latency=elapsed, tokens_delta=actual - 1200)
+"""
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Mapping
+
+log = logging.getLogger(__name__)
+
+# 未带 Retry-After 的 429 暂停时长（秒）
+DEFAULT_BACKOFF = 2.0
+# 乘性减小系数
+DECREASE_FACTOR = 0.5
+# 延迟超过基线的倍数视为拥塞；基线至少积累多少样本后才启用
+LATENCY_FACTOR = 3.0
+LATENCY_MIN_SAMPLES = 20
+# 等待并发名额时的兜底唤醒间隔（秒）
+_SLOT_TIMEOUT = 1.0
+# 预扣 token 时对输出长度的估计
+EXPECTED_OUTPUT_TOKENS = 512
+
+
+class RateLimitError(RuntimeError):
+    """Provider 返回 429 / 配额超限"""
+
+    def __init__(self, message: str, provider: str = "", retry_after: float | None = None):
+        super().__init__(message)
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """解析 Retry-After（秒数或 HTTP 日期），以及 OpenAI 兼容的 retry-after-ms"""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """每分钟配额的令牌桶（允许透支，透支部分由后续补充抵扣）"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """距可取出 amount 还需等待的秒数（超过容量的请求按满桶计）"""
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+class RateLimiter:
+    """单个 provider 的限流器（线程与事件循环间共享）"""
+
+    def __init__(
+        self,
+        name: str,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+    ):
+        """
+        Args:
+            name: provider 名称
+            rpm: 每分钟请求数上限，0 表示不限
+            tpm: 每分钟 token 数上限，0 表示不限
+            max_concurrency: 并发上限（AIMD 的上界，也是初始值）
+            min_concurrency: AIMD 的下界
+        """
+        self.name = name
+        self.rpm, self.tpm = rpm, tpm
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(max_concurrency, 1)
+        self.min_concurrency = max(min(min_concurrency, self.max_concurrency), 1)
+        self.limit = float(self.max_concurrency)
+        self.inflight = 0
+        self.blocked_until = 0.0
+
+        self._lock = threading.Lock()
+        self._waiters: deque[Callable[[], None]] = deque()
+        self._last_decrease = 0.0
+        self._baseline: float | None = None
+        self._samples = 0
+
+        # 统计
+        self.throttled = 0
+        self.decreases = 0
+
+    @staticmethod
+    def _rebucket(bucket: TokenBucket | None, per_minute: int) -> TokenBucket | None:
+        """按新配额替换令牌桶，已用掉的额度不因更新而恢复"""
+        if per_minute <= 0:
+            return None
+        if bucket is not None and bucket.capacity == per_minute:
+            return bucket
+        new = TokenBucket(per_minute)
+        if bucket is not None:
+            bucket._refill(time.monotonic())
+            new.level = min(bucket.level, new.capacity)
+        return new
+
+    def configure(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 16) -> bool:
+        """更新配额与并发上限，返回是否有变化"""
+        max_concurrency = max(max_concurrency, 1)
+        with self._lock:
+            if (rpm, tpm, max_concurrency) == (self.rpm, self.tpm, self.max_concurrency):
+                return False
+            self.rpm, self.tpm = rpm, tpm
+            self.requests = self._rebucket(self.requests, rpm)
+            self.tokens = self._rebucket(self.tokens, tpm)
+            self.max_concurrency = max_concurrency
+            self.min_concurrency = min(self.min_concurrency, max_concurrency)
+            # 上限调低立即生效；调高时由加性增长逐步放开
+            self.limit = min(self.limit, float(max_concurrency))
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for wake in waiters:
+            wake()
+        return True
+
+    # ============ 放行 ============
+
+    def _try_acquire(self, tokens: int, wake: Callable[[], None]) -> float | None:
+        """尝试占用一个名额：成功返回 0，需定时等待返回秒数，需等待释放返回 None"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.inflight >= int(self.limit):
+                self._waiters.append(wake)
+                return None
+            wait = 0.0
+            if self.requests is not None:
+                wait = self.requests.wait_time(1, now)
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.inflight += 1
+            return 0.0
+
+    def acquire(self, tokens: int = 1) -> float:
+        """阻塞直到可以发出一个请求（预扣 tokens），返回放行时刻，release 时传回"""
+        event = threading.Event()
+        while True:
+            event.clear()
+            wait = self._try_acquire(tokens, event.set)
+            if wait == 0:
+                return time.monotonic()
+            if wait is None:
+                event.wait(_SLOT_TIMEOUT)
+            else:
+                time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 1) -> float:
+        """acquire 的异步版本，等待期间不占用线程"""
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+
+            def wake(future=future) -> None:
+                try:
+                    loop.call_soon_threadsafe(
+                        lambda: future.done() or future.set_result(None)
+                    )
+                except RuntimeError:  # 事件循环已关闭
+                    pass
+
+            wait = self._try_acquire(tokens, wake)
+            if wait == 0:
+                return time.monotonic()
+            if wait is None:
+                try:
+                    await asyncio.wait_for(future, _SLOT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(wait)
+
+    # ============ 反馈 ============
+
+    def release(
+        self,
+        started: float,
+        latency: float | None = None,
+        throttled: bool = False,
+        retry_after: float | None = None,
+        tokens_delta: int = 0,
+    ) -> None:
+        """归还名额并反馈结果
+
+        Args:
+            started: acquire 返回的放行时刻
+            latency: 成功调用的耗时（秒），None 表示失败或无可用信号
+            throttled: 是否收到 429
+            retry_after: 429 携带的 Retry-After（秒）
+            tokens_delta: 实际 token 用量 - 预扣值，用于校正 token 桶
+        """
+        with self._lock:
+            self.inflight = max(self.inflight - 1, 0)
+            if tokens_delta and self.tokens is not None:
+                self.tokens.take(tokens_delta)
+
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                pause = retry_after if retry_after is not None else DEFAULT_BACKOFF
+                self.blocked_until = max(self.blocked_until, now + pause)
+                self._decrease(started, f"429, 暂停 {pause:.1f}s")
+            elif latency is not None:
+                self._observe_latency(latency, started)
+
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for wake in waiters:
+            wake()
+
+    def _observe_latency(self, latency: float, started: float) -> None:
+        if (
+            self._baseline is not None
+            and self._samples >= LATENCY_MIN_SAMPLES
+            and latency > self._baseline * LATENCY_FACTOR
+        ):
+            self._decrease(started, f"延迟 {latency:.1f}s, 基线 {self._baseline:.1f}s")
+            return
+        # 基线只用非拥塞样本更新
+        self._samples += 1
+        self._baseline = (
+            latency if self._baseline is None else 0.95 * self._baseline + 0.05 * latency
+        )
+        # 加性增长：每个窗口（limit 个成功）约 +1
+        self.limit = min(self.limit + 1.0 / self.limit, float(self.max_concurrency))
+
+    def _decrease(self, started: float, reason: str) -> None:
+        # 上次减小之前发出的请求按旧并发上限发出，其信号已被那次减小覆盖
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        self.limit = max(self.limit * DECREASE_FACTOR, float(self.min_concurrency))
+        log.info(f"[RateLimiter:{self.name}] 并发降至 {int(self.limit)} ({reason})")
+
+    def stats(self) -> dict:
+        """当前并发上限 / 在途数 / 429 次数等"""
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "inflight": self.inflight,
+                "throttled": self.throttled,
+                "decreases": self.decreases,
+                "blocked_for": max(self.blocked_until - time.monotonic(), 0.0),
+                "latency_baseline": self._baseline,
+            }
+
+
+# 同一 provider 在进程内共享一个限流器
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(
+    name: str,
+    rpm: int | None = None,
+    tpm: int | None = None,
+    max_concurrency: int | None = None,
+) -> RateLimiter:
+    """获取（首次调用时创建）provider 的共享限流器
+
+    限流器按 provider 共享（配额属于账号）；已存在时只按本次显式传入的配额与并发上限更新，
+    未传入（None）的项保持原值，避免按默认值创建的 provider（环境变量 / 备用 provider）
+    清掉已配置的配额。首次创建时未传入的项取默认值（不限配额，并发 16）。
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(
+                name,
+                rpm=rpm or 0,
+                tpm=tpm or 0,
+                max_concurrency=16 if max_concurrency is None else max_concurrency,
+            )
+        elif (rpm, tpm, max_concurrency) != (None, None, None):
+            rpm = limiter.rpm if rpm is None else rpm
+            tpm = limiter.tpm if tpm is None else tpm
+            if max_concurrency is None:
+                max_concurrency = limiter.max_concurrency
+            if limiter.configure(rpm=rpm, tpm=tpm, max_concurrency=max_concurrency):
+                log.info(
+                    f"[RateLimiter:{name}] 配置更新: rpm={rpm}, tpm={tpm}, "
+                    f"max_concurrency={max_concurrency}"
+                )
+        return limiter
@@ -0,0 +1,323 @@
+"""
+LLM 路由 - 抖动退避重试、对冲请求、跨 provider 故障转移
+
+- 重试：失败后按 full jitter 指数退避，每次重试切换到故障转移顺序中的下一个 provider
+- 对冲：主请求发出后耗时超过该 provider 延迟直方图的 P{hedge_percentile} 时，
+  向下一个 provider 并行发出同一请求；先成功者胜出，另一个被取消。
+  对冲请求数不超过总请求数的 hedge_budget，避免整体变慢时对冲放大负载
+- 延迟直方图按 provider 在进程内共享，由 provider 在通过限流器后计时、只记录成功的上游调用
+  （本地排队不计入），周期性衰减以跟随近期分布
+- 重试只由路由负责：路由下的 provider 自身重试次数置 0，避免两层重试次数相乘
+
+同步调用在后台事件循环上执行，与异步调用共用同一套对冲 / 取消逻辑。
+流式生成不经过路由（已输出的分片无法对冲或重放）。
+
+Usage:
+    router = LLMRouter([deepseek, minimax], LLMRouterConfig(hedge_percentile=95))
+    text = router.complete("system", "user")
+    text = await router.acomplete("system", "user")
+    text, provider = await router.acomplete_routed("system", "user")   # 同时返回应答的 provider
+"""
+import asyncio
+import bisect
+import logging
+import random
+import threading
+from contextvars import ContextVar
+from typing import Callable, Coroutine, TypeVar
+
+from src.config import LLMRouterConfig
+
+from .rate_limit import RateLimitError
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ============ 延迟直方图 ============
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图（10ms ~ 约 13min，相邻桶比例 1.2）"""
+
+    BOUNDS = [0.01 * 1.2 ** i for i in range(63)]
+
+    def __init__(self, decay_every: int = 1000):
+        """
+        Args:
+            decay_every: 每记录这么多样本，所有桶计数减半
+        """
+        self.counts = [0.0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+        self.decay_every = decay_every
+        self._since_decay = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+            self.total += 1
+            self._since_decay += 1
+            if self._since_decay >= self.decay_every:
+                self.counts = [c / 2 for c in self.counts]
+                self.total /= 2
+                self._since_decay = 0
+
+    def percentile(self, q: float) -> float | None:
+        """第 q 百分位的延迟（桶上界，秒），无样本返回 None"""
+        with self._lock:
+            if not self.total:
+                return None
+            target = self.total * q / 100
+            seen = 0.0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.BOUNDS[min(i, len(self.BOUNDS) - 1)]
+            return self.BOUNDS[-1]
+
+    @property
+    def samples(self) -> int:
+        return int(self.total)
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    """provider 的共享延迟直方图"""
+    with _histograms_lock:
+        if name not in _histograms:
+            _histograms[name] = LatencyHistogram()
+        return _histograms[name]
+
+
+# ============ 请求发出通知 ============
+
+# 当前请求通过本地排队（信号量、限流器）、实际发往上游时的回调，由路由按任务设置
+_dispatched: ContextVar[Callable[[], None] | None] = ContextVar("llm_dispatched", default=None)
+
+
+def mark_dispatched() -> None:
+    """provider 即将发出上游请求时调用，对冲计时从此刻开始"""
+    callback = _dispatched.get()
+    if callback is not None:
+        callback()
+
+
+# ============ 后台事件循环 ============
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-router", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Coroutine[None, None, T]) -> T:
+    """在后台事件循环上执行协程并阻塞等待结果（供同步调用方使用）"""
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+# ============ 路由 ============
+
+def is_retryable(error: BaseException) -> bool:
+    """参数错误、鉴权失败等 4xx 重试无意义，其余（超时、连接、5xx、限流）可重试"""
+    if isinstance(error, RateLimitError):
+        return True
+    if isinstance(error, (ValueError, TypeError, KeyError, NotImplementedError)):
+        return False
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return True
+
+
+class LLMRouter:
+    """按故障转移顺序调度多个 provider 的路由器"""
+
+    def __init__(self, providers: list, config: LLMRouterConfig | None = None):
+        """
+        Args:
+            providers: 按优先级排列的 provider，第一个为主 provider
+            config: 重试 / 对冲参数
+        """
+        if not providers:
+            raise ValueError("至少需要一个 provider")
+        self.providers = providers
+        self.config = config or LLMRouterConfig()
+        # 重试由路由的 max_attempts 负责，provider 内部再重试会使上游调用次数成倍增加
+        for provider in providers:
+            if hasattr(provider, "max_retries"):
+                provider.max_retries = 0
+
+        # 统计
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.failovers = 0
+
+    def _provider(self, index: int):
+        return self.providers[index % len(self.providers)]
+
+    def hedge_delay(self, provider) -> float | None:
+        """provider 的对冲等待时间；样本不足或未启用对冲返回 None"""
+        if not self.config.hedge or len(self.providers) < 2:
+            return None
+        if self.hedged >= self.config.hedge_budget * self.requests:
+            return None
+        histogram = get_histogram(provider.name)
+        if histogram.samples < self.config.hedge_min_samples:
+            return None
+        delay = histogram.percentile(self.config.hedge_percentile)
+        return max(delay, self.config.hedge_min_delay) if delay is not None else None
+
+    def _backoff(self, attempt: int) -> float:
+        """full jitter 指数退避"""
+        cap = min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    async def _call(
+        self,
+        provider,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool,
+        dispatched: asyncio.Event | None = None,
+    ) -> str:
+        if dispatched is not None:
+            # 每个请求运行在独立任务中，上下文变量只对本任务可见
+            _dispatched.set(dispatched.set)
+        return await provider.acomplete(system_prompt, user_prompt, json_mode)
+
+    async def _hedged(
+        self, index: int, system_prompt: str, user_prompt: str, json_mode: bool
+    ) -> tuple[str, object]:
+        """一次尝试：主请求超过对冲阈值时向下一个 provider 发出对冲请求，先成功者胜出"""
+        primary = self._provider(index)
+        self.requests += 1
+        dispatched = asyncio.Event()
+        tasks = {
+            asyncio.ensure_future(
+                self._call(primary, system_prompt, user_prompt, json_mode, dispatched)
+            ): primary
+        }
+        delay = self.hedge_delay(primary)
+        try:
+            if delay is not None:
+                # 对冲计时从主请求实际发出开始，在本地限流 / 并发名额上的排队不计入
+                waiter = asyncio.ensure_future(dispatched.wait())
+                await asyncio.wait({*tasks, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    backup = self._provider(index + 1)
+                    self.hedged += 1
+                    log.info(
+                        f"[LLMRouter] {primary.name} 超过 P{self.config.hedge_percentile:g} "
+                        f"({delay:.1f}s)，对冲到 {backup.name}"
+                    )
+                    task = self._call(backup, system_prompt, user_prompt, json_mode)
+                    tasks[asyncio.ensure_future(task)] = backup
+
+            error: BaseException | None = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] is not primary:
+                            self.hedge_wins += 1
+                        return task.result(), tasks[task]
+                    error = task.exception()
+            raise error
+        finally:
+            # 取消落败 / 未完成的请求，释放其连接与限流名额
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()  # 标记已读取，避免未读取异常的告警
+                task.cancel()
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, json_mode: bool = False) -> str:
+        """异步推理：对冲 + 抖动退避重试 + 故障转移"""
+        text, _ = await self.acomplete_routed(system_prompt, user_prompt, json_mode)
+        return text
+
+    async def acomplete_routed(
+        self, system_prompt: str, user_prompt: str, json_mode: bool = False
+    ) -> tuple[str, object]:
+        """同 acomplete，返回 (文本, 实际应答的 provider)；故障转移或对冲胜出时不是主 provider"""
+        attempts = max(self.config.max_attempts, 1)
+        for attempt in range(attempts):
+            try:
+                return await self._hedged(attempt, system_prompt, user_prompt, json_mode)
+            except Exception as e:
+                if attempt + 1 >= attempts or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                current, following = self._provider(attempt), self._provider(attempt + 1)
+                self.retries += 1
+                if following is not current:
+                    self.failovers += 1
+                log.warning(
+                    f"[LLMRouter] {current.name} 失败 ({type(e).__name__}: {e})，"
+                    f"{delay:.1f}s 后由 {following.name} 重试"
+                )
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def acomplete_batch(
+        self, system_prompt: str, user_prompts: list[str], json_mode: bool = False
+    ) -> list[str]:
+        """异步批量推理，并发由各 provider 的信号量与限流器控制"""
+        return list(
+            await asyncio.gather(
+                *(self.acomplete(system_prompt, p, json_mode) for p in user_prompts)
+            )
+        )
+
+    def complete(self, system_prompt: str, user_prompt: str, json_mode: bool = False) -> str:
+        """同步推理（在后台事件循环上执行，落败的对冲请求同样会被取消）"""
+        return run_sync(self.acomplete(system_prompt, user_prompt, json_mode))
+
+    def complete_batch(
+        self, system_prompt: str, user_prompts: list[str], json_mode: bool = False
+    ) -> list[str]:
+        """同步批量推理"""
+        log.info(f"[LLMRouter] 开始批量推理 {len(user_prompts)} 条")
+        results = run_sync(self.acomplete_batch(system_prompt, user_prompts, json_mode))
+        log.info(f"[LLMRouter] 完成 {sum(1 for r in results if r)}/{len(user_prompts)} 成功")
+        return results
+
+    def stats(self) -> dict:
+        """对冲 / 重试统计与各 provider 延迟分位数"""
+        latency = {}
+        for provider in self.providers:
+            histogram = get_histogram(provider.name)
+            latency[provider.name] = {
+                "samples": histogram.samples,
+                "p50": histogram.percentile(50),
+                "p95": histogram.percentile(95),
+                "p99": histogram.percentile(99),
+            }
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "retries": self.retries,
+            "failovers": self.failovers,
+            "latency": latency,
+        }
@@ -0,0 +1,127 @@
+"""
+Single-flight 请求合并 - 相同的在途请求只发出一次上游调用
+
+同一 key（provider / 模型 / 提示词 / json_mode）已有请求在途时，后来者不再调用上游，
+而是等待并共享首个请求（leader）的结果或异常。等待基于 concurrent.futures.Future，
+同步调用（线程）与异步调用（任意事件循环）之间同样可以合并。
+
+异步 leader 的上游调用作为独立任务执行：leader 被取消时若仍有其他等待者，
+调用继续完成并把结果交给它们；没有等待者时才真正取消。
+
+Usage:
+    flight = SingleFlight()
+    text = flight.do(key, lambda: router.complete(system_prompt, user_prompt))
+    text = await flight.ado(key, lambda: router.acomplete(system_prompt, user_prompt))
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    future: Future = field(default_factory=Future)
+    waiters: int = 0               # 除 leader 外正在等待的调用数
+
+
+class SingleFlight:
+    """按 key 合并并发的相同请求（线程与事件循环间共享）"""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+        # 统计
+        self.leaders = 0               # 实际发出的上游调用
+        self.saved = 0                 # 合并掉的调用
+
+    def _join(self, key: str) -> tuple[_Call, bool]:
+        """返回 (在途调用, 是否为 leader)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.saved += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.leaders += 1
+            return call, True
+
+    def _leave(self, call: _Call) -> None:
+        with self._lock:
+            call.waiters -= 1
+
+    def _finish_locked(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finish(self, key: str, call: _Call) -> None:
+        with self._lock:
+            self._finish_locked(key, call)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """同步执行：key 相同的在途请求共享一次 fn() 的结果或异常"""
+        call, leader = self._join(key)
+        if not leader:
+            log.debug(f"[SingleFlight] 合并请求 {key[:12]}")
+            try:
+                return call.future.result()
+            finally:
+                self._leave(call)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call)
+            call.future.set_exception(e)
+            raise
+        self._finish(key, call)
+        call.future.set_result(result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """异步执行：key 相同的在途请求共享一次 fn() 的结果或异常"""
+        call, leader = self._join(key)
+        if not leader:
+            log.debug(f"[SingleFlight] 合并请求 {key[:12]}")
+            try:
+                # shield：等待者被取消时不取消共享的 future
+                return await asyncio.shield(asyncio.wrap_future(call.future))
+            finally:
+                self._leave(call)
+
+        task = asyncio.ensure_future(fn())
+
+        def settle(task: asyncio.Task) -> None:
+            self._finish(key, call)
+            if task.cancelled():
+                call.future.cancel()
+            elif task.exception() is not None:
+                call.future.set_exception(task.exception())
+            else:
+                call.future.set_result(task.result())
+
+        task.add_done_callback(settle)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                orphaned = call.waiters == 0
+                if orphaned:
+                    # 新的请求不再加入即将取消的调用
+                    self._finish_locked(key, call)
+            if orphaned:
+                task.cancel()
+            raise
+
+    def stats(self) -> dict:
+        """上游调用数 / 合并掉的调用数 / 当前在途 key 数"""
+        with self._lock:
+            return {"calls": self.leaders, "saved": self.saved, "inflight": len(self._calls)}
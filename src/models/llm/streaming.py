@@ -0,0 +1,111 @@
+"""
+流式输出工具 - SSE 事件解码与 <think> 推理块过滤
+
+两者都是增量状态机：逐行 / 逐分片输入，标签或事件跨分片截断时先缓冲，
+不需要等待完整响应。
+
+Usage:
+    think = ThinkFilter()
+    for data in iter_sse(resp.iter_lines()):
+        text = think.feed(json.loads(data)["choices"][0]["delta"].get("content", ""))
+        if text:
+            yield text
+    yield think.flush()
+"""
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+
+class SSEDecoder:
+    """server-sent events 解码：按行输入，返回完整事件的 data 字段"""
+
+    def __init__(self) -> None:
+        self._data: list[str] = []
+
+    def feed(self, line: str) -> list[str]:
+        """输入一行（不含换行符），空行表示事件结束"""
+        if not line:
+            return self.flush()
+        if line.startswith(":"):  # 注释 / 心跳
+            return []
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return []
+
+    def flush(self) -> list[str]:
+        """取出缓冲中的事件（流结束时调用，兼容最后一个事件后没有空行的服务端）"""
+        if not self._data:
+            return []
+        event = "\n".join(self._data)
+        self._data = []
+        return [event]
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[str]:
+    """逐行读取 SSE 流，产出每个事件的 data"""
+    decoder = SSEDecoder()
+    for line in lines:
+        yield from decoder.feed(line)
+    yield from decoder.flush()
+
+
+async def aiter_sse(lines: AsyncIterable[str]) -> AsyncIterator[str]:
+    """iter_sse 的异步版本"""
+    decoder = SSEDecoder()
+    async for line in lines:
+        for event in decoder.feed(line):
+            yield event
+    for event in decoder.flush():
+        yield event
+
+
+class ThinkFilter:
+    """增量过滤 <think>...</think> 推理块，并去掉可见输出开头的空白"""
+
+    OPEN = "<think>"
+    CLOSE = "</think>"
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    @staticmethod
+    def _partial_tag(text: str, tag: str) -> int:
+        """text 结尾可能是 tag 前缀的最大长度（需要留到下一个分片再判断）"""
+        for size in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:size]):
+                return size
+        return 0
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    def feed(self, chunk: str) -> str:
+        """输入一个分片，返回可以输出的文本"""
+        self._buffer += chunk
+        out = []
+        while self._buffer:
+            tag = self.CLOSE if self._inside else self.OPEN
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._inside:
+                    out.append(self._emit(self._buffer[:index]))
+                self._buffer = self._buffer[index + len(tag):]
+                self._inside = not self._inside
+                continue
+            keep = self._partial_tag(self._buffer, tag)
+            if not self._inside:
+                out.append(self._emit(self._buffer[:len(self._buffer) - keep]))
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return "".join(out)
+
+    def flush(self) -> str:
+        """流结束：输出残留文本（未闭合的推理块丢弃）"""
+        rest = "" if self._inside else self._emit(self._buffer)
+        self._buffer = ""
+        return rest
@@ -0,0 +1,409 @@
+"""
+本地桩 LLM 服务 - 压测 / CI 用，不产生费用、不需要网络
+
+同一个 base_url（如 http://127.0.0.1:8765/v1）同时实现两种接口：
+- OpenAI chat completions：POST {base}/chat/completions，支持 stream 与 response_format=json_object
+- MiniMax chat_completion_v2：POST {base}/chat_completion_v2，限流以 base_resp 1002 返回
+
+响应时间 = 首 token 延迟（按分布采样）+ 提示词 token / prefill_tps + 输出 token / tps，
+流式响应按 tps 逐片输出。429 可按概率随机注入，也可按 RPM 配额产生（均带 Retry-After）。
+
+响应内容先匹配 canned 规则文件（[{"match": "正则", "response": 文本或 JSON}]，匹配最后一条用户消息），
+否则按提示词生成：含 [id=N] 的打包解析请求返回以 id 为键的对象，PPT 规划 / 蓝图请求返回对应结构，
+其余要求 JSON 的请求返回文章解析结果，普通请求返回填充文本。
+
+Usage:
+    uv run main.py llm stub --port 8765 --latency lognormal:0.8,0.5 --tps 40 --rate-limit 0.05
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 uv run main.py rss parse
+
+    server = start_stub(StubConfig(port=0, latency="const:0.1"))   # 后台线程
+    llm = LLMManager("deepseek", cache=False, base_url=server.base_url)
+    server.shutdown()
+"""
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlsplit
+
+from .rate_limit import TokenBucket
+from .tokens import estimate_tokens
+
+log = logging.getLogger(__name__)
+
+# 流式输出每个分片的 token 数
+STREAM_CHUNK_TOKENS = 4
+
+_ANALYSIS = {
+    "summary": "这是桩服务生成的文章摘要，用于压测与集成测试。",
+    "keywords": ["人工智能", "大模型", "测试"],
+    "category": "科技",
+    "sentiment": "neutral",
+}
+
+_SLIDES = {
+    "title": "桩服务生成的演示文稿",
+    "slides": [
+        {
+            "id": i,
+            "title": f"第 {i} 页",
+            "layout": "stack",
+            "key_points": "一句话核心信息",
+            "bullet_points": ["要点一", "要点二", "要点三"],
+            "speaker_notes": "这是桩服务生成的演讲者备注。",
+        }
+        for i in range(1, 6)
+    ],
+}
+
+_BLUEPRINT = {
+    "design_concept": "桩服务生成的设计蓝图",
+    "slide_title": {
+        "text": "标题",
+        "position": {"left": 0.5, "top": 0.5, "width": 9.0, "height": 1.0, "font_size": 32},
+    },
+    "content_elements": [
+        {
+            "text": "核心要点",
+            "position": {"left": 1.0, "top": 2.0, "width": 4.0, "height": 1.5, "font_size": 18},
+        }
+    ],
+    "image_elements": [],
+}
+
+_FILLER = "今天人工智能领域继续快速发展，多家公司发布了新的模型与产品，行业关注推理成本与应用落地。"
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """解析延迟分布（秒）
+
+    const:0.5 / uniform:0.2,1.0 / exp:0.5（均值）/ lognormal:0.8,0.5（中位数, sigma）/
+    pareto:0.3,2.5（最小值, alpha，长尾）
+    """
+    name, _, args = spec.partition(":")
+    try:
+        params = [float(x) for x in args.split(",") if x.strip()]
+        if name == "const":
+            (value,) = params
+            return lambda rng: value
+        if name == "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        if name == "exp":
+            (mean,) = params
+            return lambda rng: rng.expovariate(1 / mean)
+        if name == "lognormal":
+            median, sigma = params
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+        if name == "pareto":
+            scale, alpha = params
+            return lambda rng: scale * rng.paretovariate(alpha)
+    except ValueError as e:
+        raise ValueError(f"延迟分布参数错误: {spec}") from e
+    raise ValueError(f"未知的延迟分布: {spec}（可选 const / uniform / exp / lognormal / pareto）")
+
+
+@dataclass
+class StubConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765                   # 0 表示自动分配
+    latency: str = "lognormal:0.5,0.4"  # 首 token 延迟分布（秒）
+    tps: float = 50.0                  # 输出速度（token/s），0 表示瞬时
+    prefill_tps: float = 5000.0        # 提示词处理速度（token/s），0 表示忽略
+    completion_tokens: int = 200       # 填充文本的平均输出长度（token）
+    think_tokens: int = 0              # 在输出前附加的 <think> 推理块长度（token）
+    rate_limit: float = 0.0            # 随机返回 429 的概率
+    rpm: int = 0                       # 每分钟请求配额，超出返回 429，0 表示不限
+    retry_after: float = 1.0           # 随机 429 携带的 Retry-After（秒）
+    canned: str | None = None          # canned 响应规则文件（JSON）
+    seed: int | None = None
+
+
+@dataclass
+class StubReply:
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    ttft: float                        # 首 token 前的等待（秒）
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """桩 LLM 服务（每个请求一个线程）"""
+
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig):
+        super().__init__((config.host, config.port), _Handler)
+        self.config = config
+        self.latency = parse_distribution(config.latency)
+        self.rng = random.Random(config.seed)
+        self.rules = self._load_rules(config.canned)
+        self.bucket = TokenBucket(config.rpm) if config.rpm > 0 else None
+        self._lock = threading.Lock()
+
+        # 统计
+        self.requests = 0
+        self.throttled = 0
+        self.streamed = 0
+        self.inflight = 0
+        self.max_inflight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_port}/v1"
+
+    @staticmethod
+    def _load_rules(path: str | None) -> list[tuple[re.Pattern, str]]:
+        if not path:
+            return []
+        rules = []
+        for rule in json.loads(Path(path).read_text(encoding="utf-8")):
+            response = rule["response"]
+            if not isinstance(response, str):
+                response = json.dumps(response, ensure_ascii=False)
+            rules.append((re.compile(rule["match"]), response))
+        return rules
+
+    # ============ 调度 ============
+
+    def enter(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+
+    def leave(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    def admit(self) -> float | None:
+        """是否放行；限流时返回 Retry-After（秒）"""
+        with self._lock:
+            if self.bucket is not None:
+                wait = self.bucket.wait_time(1, time.monotonic())
+                if wait > 0:
+                    self.throttled += 1
+                    return wait
+                self.bucket.take(1)
+            if self.config.rate_limit and self.rng.random() < self.config.rate_limit:
+                self.throttled += 1
+                return self.config.retry_after
+        return None
+
+    # ============ 响应内容 ============
+
+    def _generate(self, prompt: str, user: str, json_mode: bool) -> str:
+        ids = re.findall(r"\[id=(\d+)\]", user)
+        if ids:
+            return json.dumps({i: _ANALYSIS for i in ids}, ensure_ascii=False)
+        if "slide_title" in prompt:
+            return json.dumps(_BLUEPRINT, ensure_ascii=False)
+        if '"slides"' in prompt:
+            return json.dumps(_SLIDES, ensure_ascii=False)
+        if json_mode or "JSON" in prompt:
+            return json.dumps(_ANALYSIS, ensure_ascii=False)
+        return self._filler(self.config.completion_tokens * self.rng.uniform(0.5, 1.5))
+
+    @staticmethod
+    def _filler(tokens: float) -> str:
+        per_sentence = estimate_tokens(_FILLER)
+        return _FILLER * max(int(tokens / per_sentence), 1)
+
+    def reply(self, messages: list[dict], json_mode: bool) -> StubReply:
+        contents = [
+            m.get("content") if isinstance(m.get("content"), str) else json.dumps(m.get("content"))
+            for m in messages
+        ]
+        user = next(
+            (c for m, c in zip(reversed(messages), reversed(contents)) if m.get("role") == "user"),
+            "",
+        )
+        prompt = "\n".join(contents)
+
+        text = next((response for pattern, response in self.rules if pattern.search(user)), None)
+        if text is None:
+            text = self._generate(prompt, user, json_mode)
+        if self.config.think_tokens:
+            text = f"<think>{self._filler(self.config.think_tokens)}</think>\n\n{text}"
+
+        prompt_tokens = estimate_tokens(prompt)
+        with self._lock:
+            ttft = self.latency(self.rng)
+        if self.config.prefill_tps:
+            ttft += prompt_tokens / self.config.prefill_tps
+        return StubReply(text, prompt_tokens, estimate_tokens(text), ttft)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "streamed": self.streamed,
+                "inflight": self.inflight,
+                "max_inflight": self.max_inflight,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    disable_nagle_algorithm = True  # 流式分片小，避免与延迟 ACK 叠加出 40ms 停顿
+    server: StubLLMServer
+
+    def log_message(self, format, *args):
+        log.debug(f"[StubLLMServer] {format % args}")
+
+    def _send_json(self, status: int, data: dict, headers: dict | None = None) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path.endswith("/stats"):
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path.endswith("/chat/completions"):
+            flavor = "openai"
+        elif path.endswith("/chat_completion_v2"):
+            flavor = "minimax"
+        else:
+            self._send_json(404, {"error": {"message": f"unknown endpoint {path}"}})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.server.enter()
+        try:
+            self._complete(flavor, body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端取消（如对冲落败）时连接被提前关闭
+            self.close_connection = True
+        finally:
+            self.server.leave()
+
+    def _complete(self, flavor: str, body: dict) -> None:
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            headers = {"Retry-After": f"{retry_after:.3f}"}
+            if flavor == "openai":
+                error = {"message": "Rate limit reached (stub)", "type": "rate_limit_exceeded"}
+                self._send_json(429, {"error": error}, headers)
+            else:
+                base_resp = {"status_code": 1002, "status_msg": "rate limit exceeded (stub)"}
+                self._send_json(200, {"base_resp": base_resp}, headers)
+            return
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        reply = self.server.reply(body.get("messages") or [], json_mode)
+        model = body.get("model", "stub")
+        usage = {
+            "prompt_tokens": reply.prompt_tokens,
+            "completion_tokens": reply.completion_tokens,
+            "total_tokens": reply.prompt_tokens + reply.completion_tokens,
+        }
+
+        if body.get("stream"):
+            self._stream(flavor, model, reply, usage)
+            return
+
+        tps = self.server.config.tps
+        time.sleep(reply.ttft + (reply.completion_tokens / tps if tps else 0))
+        data = {
+            "id": f"chatcmpl-stub-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply.text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+        if flavor == "minimax":
+            data["base_resp"] = {"status_code": 0, "status_msg": "success"}
+        self._send_json(200, data)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_event(self, data: dict | str) -> None:
+        if not isinstance(data, str):
+            data = json.dumps(data, ensure_ascii=False)
+        self._write_chunk(f"data: {data}\n\n".encode())
+
+    def _stream(self, flavor: str, model: str, reply: StubReply, usage: dict) -> None:
+        with self.server._lock:
+            self.server.streamed += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        tps = self.server.config.tps
+        pieces = max(math.ceil(reply.completion_tokens / STREAM_CHUNK_TOKENS), 1)
+        size = math.ceil(len(reply.text) / pieces)
+        chunk_id = f"chatcmpl-stub-{self.server.requests}"
+
+        time.sleep(reply.ttft)
+        for start in range(0, len(reply.text), size):
+            self._write_event({
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": reply.text[start:start + size]},
+                    "finish_reason": None,
+                }],
+            })
+            if tps:
+                time.sleep(STREAM_CHUNK_TOKENS / tps)
+
+        if flavor == "openai":
+            self._write_event({
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            })
+            self._write_event("[DONE]")
+        else:
+            # MiniMax 以汇总完整消息的事件结束
+            self._write_event({
+                "id": chunk_id,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply.text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+                "base_resp": {"status_code": 0, "status_msg": "success"},
+            })
+        self._write_chunk(b"")
+
+
+def start_stub(config: StubConfig | None = None) -> StubLLMServer:
+    """在后台线程启动桩服务，返回服务对象（server.base_url / server.stats() / server.shutdown()）"""
+    server = StubLLMServer(config or StubConfig())
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    log.info(f"[StubLLMServer] 已启动: {server.base_url}")
+    return server
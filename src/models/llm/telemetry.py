@@ -0,0 +1,236 @@
+"""
+LLM 调用遥测 - 延迟 / token / 费用账本
+
+- 每次上游调用（含 429 重试、对冲、失败与取消）和每次缓存命中追加一条 JSON 记录（JSONL），
+  账本超过 max_size_mb 时按 path.1 … path.N 轮转，只追加不修改
+- 调用方用 caller_tag 标记所属阶段（parse / report / ppt_plan / blueprint），
+  标记存放在 contextvar 中，随调用进入路由的后台事件循环与线程池
+- 接口未返回用量（流式输出等）时按分词计数估算，记录中 estimated 为 true
+- summarize 按阶段 / provider 汇总延迟分位数、吞吐与费用（brief llm stats）
+
+Usage:
+    with caller_tag("parse"):
+        llm.complete("", prompt)
+
+    records = read_records("data/llm_telemetry.jsonl", since=time.time() - 86400)
+    rows = summarize(records, by=("caller", "provider"), prices=config.prices)
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping
+
+from src.config import LLMPriceConfig, LLMTelemetryConfig
+
+log = logging.getLogger(__name__)
+
+
+# ============ 用量与阶段标记 ============
+
+@dataclass
+class Usage:
+    """单次调用的 token 用量"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+    @classmethod
+    def from_counts(cls, prompt: int | None, completion: int | None, total: int | None = None):
+        """接口返回的用量；全部缺失时返回 None"""
+        if prompt is None and completion is None and total is None:
+            return None
+        prompt, completion = prompt or 0, completion or 0
+        return cls(prompt, completion, total or prompt + completion)
+
+
+_caller: ContextVar[str] = ContextVar("llm_caller", default="")
+
+
+@contextmanager
+def caller_tag(tag: str):
+    """标记代码块内 LLM 调用所属的阶段"""
+    token = _caller.set(tag)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def current_caller() -> str:
+    return _caller.get()
+
+
+# ============ 账本 ============
+
+@dataclass
+class CallRecord:
+    """一次 LLM 调用"""
+    ts: float
+    provider: str
+    model: str
+    caller: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    ttft: float | None = None      # 首个分片的到达时间（仅流式）
+    cache_hit: bool = False
+    error: str = ""                # 异常类名，成功为空
+    stream: bool = False
+    estimated: bool = False        # token 数为估算值
+
+
+class Ledger:
+    """只追加的 JSONL 账本，按大小轮转（线程安全）"""
+
+    def __init__(self, path: str, max_bytes: int = 20 * 1024 * 1024, backups: int = 5):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def append(self, record: CallRecord) -> None:
+        """追加一条记录；写入失败只记日志，不影响调用方"""
+        line = json.dumps(asdict(record), ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+                if self.max_bytes and self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                log.warning(f"[Ledger] 写入 {self.path} 失败: {e}")
+
+    def files(self) -> list[Path]:
+        """账本文件（从旧到新）"""
+        rotated = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)]
+        return [p for p in [*rotated, self.path] if p.exists()]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# 同一账本文件在进程内共享一个写入句柄
+_ledgers: dict[str, Ledger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(config: LLMTelemetryConfig) -> Ledger:
+    with _ledgers_lock:
+        if config.path not in _ledgers:
+            _ledgers[config.path] = Ledger(
+                config.path,
+                max_bytes=config.max_size_mb * 1024 * 1024,
+                backups=config.backups,
+            )
+        return _ledgers[config.path]
+
+
+def read_records(path: str, backups: int = 5, since: float | None = None) -> Iterator[dict]:
+    """按时间顺序读取账本（含轮转文件），跳过损坏的行"""
+    for file in Ledger(path, backups=backups).files():
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since is None or record.get("ts", 0) >= since:
+                    yield record
+
+
+# ============ 汇总 ============
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * q / 100), len(values) - 1)]
+
+
+def price_for(model: str, prices: Mapping[str, LLMPriceConfig]) -> LLMPriceConfig | None:
+    """按模型名前缀（最长匹配）查找单价"""
+    name = model.lower()
+    for prefix in sorted(prices, key=len, reverse=True):
+        if name.startswith(prefix.lower()):
+            return prices[prefix]
+    return None
+
+
+def summarize(
+    records: Iterable[dict],
+    by: tuple[str, ...] = ("caller", "provider"),
+    prices: Mapping[str, LLMPriceConfig] | None = None,
+) -> list[dict]:
+    """按 by 中的字段分组汇总
+
+    每组给出调用数、错误数、缓存命中数、成功调用的延迟 P50 / P95、流式 TTFT P50、
+    token 用量、输出吞吐（token/s）与费用（单价见 llm.telemetry.prices）
+    """
+    groups: dict[tuple, dict] = {}
+    for record in records:
+        key = tuple(record.get(field) or "-" for field in by)
+        group = groups.setdefault(key, {
+            "calls": 0, "errors": 0, "cache_hits": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0,
+            "latencies": [], "ttfts": [], "busy": 0.0,
+        })
+        group["calls"] += 1
+        if record.get("cache_hit"):
+            group["cache_hits"] += 1
+            continue
+        if record.get("error"):
+            group["errors"] += 1
+            continue
+        prompt = record.get("prompt_tokens", 0)
+        completion = record.get("completion_tokens", 0)
+        group["prompt_tokens"] += prompt
+        group["completion_tokens"] += completion
+        group["latencies"].append(record.get("latency", 0.0))
+        group["busy"] += record.get("latency", 0.0)
+        if record.get("ttft") is not None:
+            group["ttfts"].append(record["ttft"])
+        price = price_for(record.get("model", ""), prices or {})
+        if price is not None:
+            group["cost"] += (prompt * price.input + completion * price.output) / 1_000_000
+
+    rows = []
+    for key, group in sorted(groups.items()):
+        rows.append({
+            **dict(zip(by, key)),
+            "calls": group["calls"],
+            "errors": group["errors"],
+            "cache_hits": group["cache_hits"],
+            "p50": _percentile(group["latencies"], 50),
+            "p95": _percentile(group["latencies"], 95),
+            "ttft_p50": _percentile(group["ttfts"], 50),
+            "prompt_tokens": group["prompt_tokens"],
+            "completion_tokens": group["completion_tokens"],
+            "tokens_per_second": (
+                group["completion_tokens"] / group["busy"] if group["busy"] else None
+            ),
+            "cost": group["cost"],
+        })
+    return rows
@@ -0,0 +1,199 @@
+"""
+Token 计数与提示词预算分配
+
+- TokenCounter：按 provider 模型计数 / 截断。配置了 tokenizer（HF 仓库名或 tokenizer.json 路径）
+  时使用精确分词器，否则按各家文档给出的字符 / token 比例估算（中文与英文分别计）
+- PromptBudget：在模型上下文窗口内，扣除固定模板与预留输出后，按优先级给各段分配 token：
+  高优先级（标题）先满足，同一优先级的多段（如多篇文章的摘要）按水位均分，
+  截断发生在 token 边界上，整体尽量填满而不超出
+
+Usage:
+    budget = llm.budget(output_tokens=2048)
+    fitted = budget.fit(
+        [Section("title", title, 0), Section("summary", summary, 1), Section("body", body, 2)],
+        SYSTEM_PROMPT,
+        PROMPT_TEMPLATE,  # 固定部分，先从预算中扣除
+    )
+    prompt = PROMPT_TEMPLATE.format(**fitted)
+"""
+import logging
+import re
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+# 估算比例：(每个中日韩字符的 token 数, 每个其他字符的 token 数)，按模型名前缀匹配
+_RATIOS = {
+    "deepseek": (0.6, 0.3),
+    "qwen": (0.7, 0.25),
+    "minimax": (0.65, 0.25),
+    "abab": (0.65, 0.25),
+}
+_DEFAULT_RATIO = (0.75, 0.3)
+
+# 上下文窗口（token），按模型名前缀匹配；可用 llm.providers.<name>.context_window 覆盖
+CONTEXT_WINDOWS = {
+    "deepseek-chat": 65536,
+    "deepseek-reasoner": 65536,
+    "qwen-turbo": 131072,
+    "qwen-plus": 131072,
+    "qwen-max": 32768,
+    "minimax-m2": 204800,
+    "minimax-m1": 1000000,
+    "abab6.5s": 245760,
+    "abab6.5": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# 估算计数的安全余量（精确分词器不需要）
+ESTIMATE_MARGIN = 1.05
+
+
+def _match(model: str, table: dict, default):
+    name = model.lower()
+    for prefix in sorted(table, key=len, reverse=True):
+        if name.startswith(prefix):
+            return table[prefix]
+    return default
+
+
+def context_window(model: str) -> int:
+    """模型的上下文窗口（token）"""
+    return _match(model, CONTEXT_WINDOWS, DEFAULT_CONTEXT_WINDOW)
+
+
+def estimate_tokens(*texts: str, model: str = "") -> int:
+    """按字符比例估算 token 数（不加载分词器）"""
+    cjk_ratio, other_ratio = _match(model, _RATIOS, _DEFAULT_RATIO)
+    total = 0.0
+    for text in texts:
+        cjk = len(_CJK.findall(text))
+        total += cjk * cjk_ratio + (len(text) - cjk) * other_ratio
+    return int(total) + 1
+
+
+class TokenCounter:
+    """模型 token 计数器"""
+
+    def __init__(self, model: str = "", tokenizer: str = ""):
+        """
+        Args:
+            model: 模型名（决定估算比例）
+            tokenizer: HF 仓库名或 tokenizer.json 路径，空表示按比例估算
+        """
+        self.model = model
+        self.tokenizer_name = tokenizer
+        self._tokenizer = None
+        if tokenizer:
+            try:
+                from tokenizers import Tokenizer
+
+                if tokenizer.endswith(".json"):
+                    self._tokenizer = Tokenizer.from_file(tokenizer)
+                else:
+                    self._tokenizer = Tokenizer.from_pretrained(tokenizer)
+            except Exception as e:
+                log.warning(f"[TokenCounter] 分词器 {tokenizer} 加载失败: {e}，改用估算")
+
+    @property
+    def exact(self) -> bool:
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        """text 的 token 数（估算时含安全余量，宁多勿少）"""
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return int(estimate_tokens(text, model=self.model) * ESTIMATE_MARGIN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """截断到不超过 max_tokens 个 token（在 token / 字符边界上）"""
+        if max_tokens <= 0:
+            return ""
+        if self._tokenizer is not None:
+            encoding = self._tokenizer.encode(text, add_special_tokens=False)
+            if len(encoding.ids) <= max_tokens:
+                return text
+            return text[:encoding.offsets[max_tokens - 1][1]]
+
+        if self.count(text) <= max_tokens:
+            return text
+        cjk_ratio, other_ratio = _match(self.model, _RATIOS, _DEFAULT_RATIO)
+        limit = max_tokens / ESTIMATE_MARGIN - 1
+        used = 0.0
+        for i, ch in enumerate(text):
+            used += cjk_ratio if _CJK.match(ch) else other_ratio
+            if used > limit:
+                return text[:i]
+        return text
+
+
+@dataclass
+class Section:
+    """提示词中的一段可截断内容"""
+    key: str
+    text: str
+    priority: int = 0  # 越小越优先
+
+
+class PromptBudget:
+    """提示词 token 预算"""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        context_window: int,
+        output_tokens: int = 1024,
+        max_input_tokens: int | None = None,
+    ):
+        """
+        Args:
+            counter: token 计数器
+            context_window: 模型上下文窗口
+            output_tokens: 为输出预留的 token
+            max_input_tokens: 输入上限（低于上下文窗口时生效，用于控制成本）
+        """
+        self.counter = counter
+        self.context_window = context_window
+        self.output_tokens = output_tokens
+        self.max_input_tokens = max_input_tokens
+
+    def available(self, *fixed: str) -> int:
+        """扣除固定文本（系统提示词、模板）与预留输出后可分配的 token"""
+        limit = self.context_window - self.output_tokens
+        if self.max_input_tokens is not None:
+            limit = min(limit, self.max_input_tokens)
+        return max(limit - sum(self.counter.count(text) for text in fixed), 0)
+
+    def allocate(self, sections: list[Section], budget: int) -> dict[str, str]:
+        """按优先级分配 budget，同一优先级按水位均分；返回 key → 截断后的文本"""
+        result = {section.key: "" for section in sections}
+        needs = {section.key: self.counter.count(section.text) for section in sections}
+
+        for priority in sorted({s.priority for s in sections}):
+            tier = sorted(
+                (s for s in sections if s.priority == priority), key=lambda s: needs[s.key]
+            )
+            # 水位均分：需求小的段先拿满，余量平分给剩余的段
+            for i, section in enumerate(tier):
+                share = budget // (len(tier) - i)
+                grant = min(needs[section.key], share)
+                if grant >= needs[section.key]:
+                    result[section.key] = section.text
+                else:
+                    result[section.key] = self.counter.truncate(section.text, grant)
+                budget -= self.counter.count(result[section.key])
+            if budget <= 0:
+                break
+        return result
+
+    def fit(self, sections: list[Section], *fixed: str) -> dict[str, str]:
+        """在 available(*fixed) 的预算内分配各段"""
+        fitted = self.allocate(sections, self.available(*fixed))
+        dropped = sum(1 for s in sections if len(fitted[s.key]) < len(s.text))
+        if dropped:
+            log.debug(f"[PromptBudget] {dropped}/{len(sections)} 段被截断")
+        return fitted
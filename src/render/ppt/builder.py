@@ -14,6 +14,8 @@ from pptx import Presentation
 from pptx.util import Inches, Pt
 
 from src.agents import get_llm
+from src.models.llm import LLMManager
+from src.models.llm.telemetry import caller_tag
 from .base import PPTBuilder, BuilderRegistry
 
 logger = logging.getLogger(__name__)
@@ -55,8 +57,10 @@ class DirectPPBuilder(PPTBuilder):
         style: str | None = None,
     ) -> None:
         self.data = data
-        self.llm = get_llm()
         self.provider = provider
+        # 全局 LLM 实例的 provider 与指定的不同时，为本构建器单独创建
+        shared = get_llm()
+        self.llm = shared if shared.engine == provider else LLMManager(provider)
         self.style = style or self.DEFAULT_STYLE
         self.presentation = Presentation()
         self._blank_layout = self._get_blank_layout()
@@ -74,7 +78,8 @@ class DirectPPBuilder(PPTBuilder):
 
     def _get_blueprint(self, script: str) -> dict[str, Any]:
         prompt = self.PROMPT_TEMPLATE.format(style=self.style, script=script)
-        resp = self.llm.generate(prompt, provider=self.provider)
+        with caller_tag("blueprint"):
+            resp = self.llm.complete("", prompt)
         resp = resp.strip().replace("```json", "").replace("```", "").strip()
         try:
             return json.loads(resp)
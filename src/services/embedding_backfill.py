@@ -0,0 +1,297 @@
+"""
+多进程嵌入回填 - 更换嵌入模型后全量重建向量库
+
+- 主进程按 ID 键集分页流式读取文章，展开为待编码文本后分发给编码进程池
+- 每个编码进程独立加载模型并固定线程数（进程数 × 线程数 ≈ CPU 核数，避免超卖）
+- 编码结果写入共享内存块，主进程只接收块名与形状，零拷贝读取后写入向量库
+- 结果按批次顺序提交；每提交一批即写检查点（最后一篇文章 ID），
+  中断后重跑从检查点之后继续；检查点绑定模型、推理后端与分段参数，任一变化即从头开始，
+  回填完成后删除
+- 写入同时记录 vector_index_state，回填完成后 rag sync 视为已同步
+- 与 rag sync 使用同一保留期（retention_days），超出保留期的文章不回填
+
+Usage:
+    from src.services.embedding_backfill import EmbeddingBackfill
+
+    stats = EmbeddingBackfill(db, store, workers=4, threads_per_worker=2).run()
+"""
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.storage.db import Article, Database
+from src.storage.logger import logger
+from src.storage.vector_store import VectorStore
+
+_THREAD_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+@dataclass
+class BackfillProgress:
+    """回填进度"""
+    articles: int
+    total: int
+    vectors: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """文章/秒"""
+        return self.articles / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float:
+        """预计剩余秒数"""
+        return (self.total - self.articles) / self.rate if self.rate > 0 else float("inf")
+
+
+def _encode_worker(
+    model_name: str,
+    runtime: str,
+    onnx_dir: str,
+    threads: int,
+    encode_batch_size: int,
+    tasks: mp.Queue,
+    results: mp.Queue,
+) -> None:
+    """编码进程：固定线程数后加载模型，结果通过共享内存返回"""
+    for name in _THREAD_ENV:
+        os.environ[name] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    if runtime == "torch":
+        import torch
+
+        torch.set_num_threads(threads)
+
+    from src.storage.vector_store import get_embedder
+
+    model = get_embedder(model_name, runtime, onnx_dir)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        batch_no, texts = task
+        try:
+            vectors = np.asarray(
+                model.encode(texts, batch_size=encode_batch_size), dtype=np.float32
+            )
+            shm = shared_memory.SharedMemory(create=True, size=max(vectors.nbytes, 1))
+            # 共享内存块归主进程所有（读取后由主进程 unlink），编码进程不再跟踪，
+            # 否则 3.13 之前 resource_tracker 会在退出时告警并重复 unlink
+            resource_tracker.unregister(shm._name, "shared_memory")
+            np.ndarray(vectors.shape, dtype=np.float32, buffer=shm.buf)[:] = vectors
+            results.put((batch_no, shm.name, vectors.shape, None))
+            shm.close()
+        except Exception as e:
+            results.put((batch_no, None, None, f"{type(e).__name__}: {e}"))
+
+
+class EmbeddingBackfill:
+    """多进程全量嵌入回填"""
+
+    def __init__(
+        self,
+        db: Database,
+        store: VectorStore,
+        workers: int = 4,
+        threads_per_worker: Optional[int] = None,
+        batch_size: int = 256,
+        encode_batch_size: int = 64,
+        checkpoint_path: Optional[str] = None,
+        progress: Optional[Callable[[BackfillProgress], None]] = None,
+        retention_days: int = 0,
+    ):
+        """
+        Args:
+            db: 数据库
+            store: 目标向量库
+            workers: 编码进程数
+            threads_per_worker: 每个编码进程的线程数，默认 CPU 核数 / workers
+            batch_size: 每批文章数（提交与检查点粒度）
+            encode_batch_size: 模型单次前向的批大小
+            checkpoint_path: 检查点文件，默认 <vector_db.path>/backfill.json
+            progress: 每提交一批后的进度回调
+            retention_days: 保留天数（按发布时间），0 表示不限
+        """
+        self.db = db
+        self.store = store
+        self.workers = max(workers, 1)
+        self.threads = threads_per_worker or max((os.cpu_count() or 1) // self.workers, 1)
+        self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
+        self.checkpoint_path = Path(checkpoint_path or Path(store.config.path) / "backfill.json")
+        self.progress = progress
+        self.retention_days = retention_days
+        self.model_name = store.config.embedding_model
+        self.index_params = store.index_params()
+
+    # ============ 检查点 ============
+
+    def load_checkpoint(self) -> int:
+        """读取检查点：相同索引参数下最后已提交的文章 ID，无检查点或参数已变化返回 0"""
+        if not self.checkpoint_path.exists():
+            return 0
+        data = json.loads(self.checkpoint_path.read_text())
+        if data.get("index") != self.index_params:
+            logger.info("[Backfill] 模型 / 推理后端 / 分段参数已变化，忽略检查点")
+            return 0
+        return int(data.get("last_id", 0))
+
+    def _save_checkpoint(self, last_id: int) -> None:
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"index": self.index_params, "last_id": last_id, "updated_at": time.time()}
+            )
+        )
+        tmp.replace(self.checkpoint_path)
+
+    def reset(self) -> None:
+        """删除检查点，下次从头开始"""
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    # ============ 执行 ============
+
+    def run(self) -> BackfillProgress:
+        """执行回填，返回最终进度"""
+        after_id = self.load_checkpoint()
+        cutoff = None
+        if self.retention_days > 0:
+            cutoff = datetime.now() - timedelta(days=self.retention_days)
+        total = self.db.count_articles(after_id=after_id, published_after=cutoff)
+        if after_id:
+            logger.info(f"[Backfill] 从检查点继续: article_id > {after_id}")
+        logger.info(
+            f"[Backfill] 待回填 {total} 篇，{self.workers} 进程 × {self.threads} 线程，"
+            f"模型 {self.model_name}"
+        )
+
+        ctx = mp.get_context("spawn")
+        tasks = ctx.Queue()
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=_encode_worker,
+                args=(
+                    self.model_name,
+                    self.store.config.embedding_runtime,
+                    self.store.config.onnx_dir,
+                    self.threads,
+                    self.encode_batch_size,
+                    tasks,
+                    results,
+                ),
+                name=f"embed-worker-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for proc in procs:
+            proc.start()
+
+        start = time.monotonic()
+        state = BackfillProgress(articles=0, total=total, vectors=0, elapsed=0.0)
+        # 已分发未提交的批次：batch_no → (文章, ids, texts, metadatas)
+        inflight: dict[int, tuple[list[Article], list[str], list[str], list[dict]]] = {}
+        finished: dict[int, tuple[str, tuple]] = {}
+        next_batch = next_commit = 0
+        max_inflight = self.workers * 2
+
+        def commit_ready() -> None:
+            nonlocal next_commit
+            while next_commit in finished:
+                shm_name, shape = finished.pop(next_commit)
+                articles, ids, texts, metadatas = inflight.pop(next_commit)
+                shm = shared_memory.SharedMemory(name=shm_name)
+                try:
+                    vectors = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+                    self.store.write_records(articles, ids, texts, vectors, metadatas)
+                    del vectors
+                finally:
+                    shm.close()
+                    shm.unlink()
+
+                self.db.save_vector_index_state(
+                    {a.id: self.store.content_hash(a) for a in articles}
+                )
+                self._save_checkpoint(articles[-1].id)
+                next_commit += 1
+
+                state.articles += len(articles)
+                state.vectors += len(ids)
+                state.elapsed = time.monotonic() - start
+                if self.progress:
+                    self.progress(state)
+
+        def collect_one() -> None:
+            while True:
+                try:
+                    batch_no, shm_name, shape, error = results.get(timeout=1.0)
+                    break
+                except queue.Empty:
+                    dead = [p.name for p in procs if not p.is_alive()]
+                    if dead:
+                        raise RuntimeError(f"编码进程异常退出: {', '.join(dead)}")
+            if error:
+                raise RuntimeError(f"批次 {batch_no} 编码失败: {error}")
+            finished[batch_no] = (shm_name, shape)
+            commit_ready()
+
+        try:
+            for page in self.db.iter_articles(batch_size=self.batch_size, after_id=after_id):
+                if cutoff is not None:
+                    # 超出保留期的文章不回填（与 rag sync 一致）
+                    page = [a for a in page if a.published_at >= cutoff]
+                    if not page:
+                        continue
+                while len(inflight) >= max_inflight:
+                    collect_one()
+                ids, texts, metadatas = self.store.article_records(page)
+                inflight[next_batch] = (page, ids, texts, metadatas)
+                tasks.put((next_batch, texts))
+                next_batch += 1
+
+            while inflight:
+                collect_one()
+        finally:
+            for _ in procs:
+                tasks.put(None)
+            for proc in procs:
+                proc.join(timeout=10)
+                if proc.is_alive():
+                    proc.terminate()
+            # 释放已返回但未提交的共享内存块（含中断后仍在结果队列中的）
+            while True:
+                try:
+                    batch_no, shm_name, shape, _ = results.get(timeout=0.1)
+                except queue.Empty:
+                    break
+                if shm_name:
+                    finished[batch_no] = (shm_name, shape)
+            for shm_name, _ in finished.values():
+                try:
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    shm.close()
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+        # 全部提交后检查点不再需要，下次回填从头开始
+        self.reset()
+        state.elapsed = time.monotonic() - start
+        logger.info(
+            f"[Backfill] 完成: {state.articles} 篇 / {state.vectors} 条向量，"
+            f"{state.elapsed:.1f}s，{state.rate:.1f} 篇/秒"
+        )
+        return state
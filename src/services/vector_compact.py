@@ -0,0 +1,150 @@
+"""
+向量库压缩服务 - 孤儿清理、保留期清理、索引重建
+
+1. 对账：分页扫描向量库元数据，与 articles 表比对，
+   article_id 已不存在的向量（孤儿）与超出保留期的向量批量删除，并清除对应索引水位
+2. 压缩：本次删除了向量或后端报告有未回收空间时，调用后端 compact() 回收空间并重建索引
+   （Chroma 的压缩会复制整个集合，无可回收空间时跳过），
+   build_index() 在数据量足够时训练近似索引（numpy 后端的 IVF）
+3. 报告：压缩前后的存储大小与查询延迟（以库内向量为查询，不依赖嵌入模型）
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+from src.storage.db import Database
+from src.storage.logger import logger
+from src.storage.vector_store import VectorStore, epoch_seconds
+
+
+@dataclass
+class CompactStats:
+    """压缩统计"""
+    scanned: int = 0
+    orphans: int = 0
+    expired: int = 0
+    count_before: int = 0
+    count_after: int = 0
+    size_before: int = 0
+    size_after: int = 0
+    compacted: bool = False
+    latency_before: List[float] = field(default_factory=list)
+    latency_after: List[float] = field(default_factory=list)
+
+    @staticmethod
+    def percentile(samples: List[float], q: float) -> float:
+        """延迟分位数（毫秒）"""
+        return float(np.percentile(samples, q) * 1000) if samples else 0.0
+
+
+class VectorCompactJob:
+    """向量库对账与压缩"""
+
+    def __init__(
+        self,
+        db: Database,
+        store: VectorStore,
+        retention_days: int = 0,
+        batch_size: int = 1000,
+        probe_queries: int = 20,
+    ):
+        """
+        Args:
+            db: 数据库
+            store: 向量库
+            retention_days: 保留天数（按发布时间），0 表示不按时间清理
+            batch_size: 扫描与删除的批大小
+            probe_queries: 测量查询延迟的查询数
+        """
+        self.db = db
+        self.store = store
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.probe_queries = probe_queries
+
+    def _probe_latency(self, probes: list) -> List[float]:
+        """以库内向量为查询，测量单条查询延迟"""
+        latencies = []
+        for embedding in probes:
+            start = time.perf_counter()
+            self.store.backend.query(query_embeddings=[embedding], n_results=10)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def _sample_probes(self) -> list:
+        page = self.store.backend.get(limit=self.probe_queries, include=["embeddings"])
+        return [list(map(float, e)) for e in page.get("embeddings", [])]
+
+    def _is_expired(self, metadata: dict, cutoff: Optional[int]) -> bool:
+        if cutoff is None:
+            return False
+        if "published_ts" in metadata:
+            return metadata["published_ts"] < cutoff
+        if "published_at" in metadata:
+            return epoch_seconds(datetime.fromisoformat(metadata["published_at"])) < cutoff
+        return False
+
+    def run(self, dry_run: bool = False) -> CompactStats:
+        """执行对账与压缩；dry_run 只统计不修改"""
+        backend = self.store.backend
+        stats = CompactStats(count_before=backend.count(), size_before=backend.size_bytes())
+        probes = self._sample_probes()
+        stats.latency_before = self._probe_latency(probes)
+
+        article_ids = self.db.get_article_ids()
+        cutoff = None
+        if self.retention_days > 0:
+            cutoff = epoch_seconds(datetime.now() - timedelta(days=self.retention_days))
+
+        doomed_ids: list[str] = []
+        doomed_articles: set[int] = set()
+        offset = 0
+        while True:
+            page = backend.get(include=["metadatas"], limit=self.batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+            stats.scanned += len(page["ids"])
+
+            for vector_id, metadata in zip(page["ids"], page["metadatas"]):
+                article_id = metadata.get("article_id")
+                if article_id not in article_ids:
+                    stats.orphans += 1
+                elif self._is_expired(metadata, cutoff):
+                    stats.expired += 1
+                else:
+                    continue
+                doomed_ids.append(vector_id)
+                if article_id is not None:
+                    doomed_articles.add(article_id)
+
+        if dry_run:
+            stats.count_after, stats.size_after = stats.count_before, stats.size_before
+            stats.latency_after = stats.latency_before
+            return stats
+
+        # 扫描完成后再删除，避免删除影响 offset 分页
+        for i in range(0, len(doomed_ids), self.batch_size):
+            backend.delete(ids=doomed_ids[i:i + self.batch_size])
+        doomed = sorted(doomed_articles)
+        for i in range(0, len(doomed), self.batch_size):
+            self.db.delete_vector_index_state(doomed[i:i + self.batch_size])
+        logger.info(
+            f"[VectorCompact] 删除 {len(doomed_ids)} 条向量 "
+            f"(孤儿 {stats.orphans}, 过期 {stats.expired})"
+        )
+
+        if doomed_ids or backend.needs_compaction():
+            backend.compact()
+            stats.compacted = True
+        else:
+            logger.info("[VectorCompact] 没有可回收的向量，跳过压缩")
+        backend.build_index()
+
+        stats.count_after = backend.count()
+        stats.size_after = backend.size_bytes()
+        stats.latency_after = self._probe_latency(probes)
+        return stats
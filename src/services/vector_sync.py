@@ -0,0 +1,97 @@
+"""
+向量索引增量同步服务
+
+以 vector_index_state 表（article_id + 内容哈希）为水位：
+- 新文章 / 内容变化的文章：批量嵌入后 upsert 到向量库
+- 已从 articles 表删除的文章，以及超出保留期的文章：从向量库删除
+- 未变化的文章：只做一次哈希比对，不触发嵌入
+
+每批写入向量库后立即提交水位，中断后重跑从未完成的部分继续，结果幂等。
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from src.storage.db import Article, Database
+from src.storage.logger import logger
+from src.storage.vector_store import VectorStore
+
+
+@dataclass
+class SyncStats:
+    """同步统计"""
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+class VectorSyncJob:
+    """SQLite → 向量库增量同步"""
+
+    def __init__(
+        self,
+        db: Database,
+        store: VectorStore,
+        batch_size: int = 512,
+        encode_batch_size: int = 64,
+        retention_days: int = 0,
+    ):
+        self.db = db
+        self.store = store
+        self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
+        self.retention_days = retention_days
+
+    def run(self) -> SyncStats:
+        """执行一次同步"""
+        stats = SyncStats()
+        indexed = self.db.get_vector_index_state()
+        seen: set[int] = set()
+        pending: list[tuple[Article, str]] = []
+        cutoff = (
+            datetime.now() - timedelta(days=self.retention_days) if self.retention_days > 0 else None
+        )
+
+        for page in self.db.iter_articles(batch_size=self.batch_size):
+            for article in page:
+                if cutoff is not None and article.published_at < cutoff:
+                    # 超出保留期：不索引，已索引的按删除处理
+                    continue
+                seen.add(article.id)
+                content_hash = self.store.content_hash(article)
+                previous = indexed.get(article.id)
+                if previous == content_hash:
+                    stats.unchanged += 1
+                    continue
+                if previous is None:
+                    stats.added += 1
+                else:
+                    stats.updated += 1
+                pending.append((article, content_hash))
+
+            while len(pending) >= self.batch_size:
+                self._flush(pending[:self.batch_size])
+                pending = pending[self.batch_size:]
+
+        if pending:
+            self._flush(pending)
+
+        removed = [article_id for article_id in indexed if article_id not in seen]
+        for i in range(0, len(removed), self.batch_size):
+            chunk = removed[i:i + self.batch_size]
+            self.store.delete_articles(chunk)
+            self.db.delete_vector_index_state(chunk)
+        stats.deleted = len(removed)
+
+        logger.info(
+            f"[VectorSync] 新增 {stats.added}, 更新 {stats.updated}, "
+            f"删除 {stats.deleted}, 未变化 {stats.unchanged}"
+        )
+        return stats
+
+    def _flush(self, batch: list[tuple[Article, str]]) -> None:
+        """嵌入并写入一批文章，随后提交水位"""
+        articles = [article for article, _ in batch]
+        self.store.add_articles(articles, batch_size=self.encode_batch_size)
+        self.db.save_vector_index_state({article.id: h for article, h in batch})
+        logger.debug(f"[VectorSync] 已索引 {len(batch)} 篇文章")
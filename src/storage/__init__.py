@@ -1,8 +1,9 @@
 """Storage modules for database and logging"""
+from src.storage.async_db import AsyncDatabase
 from src.storage.db import Database
 from src.storage.logger import setup_logger as _setup_logger
 
-__all__ = ["Database", "get_db"]
+__all__ = ["AsyncDatabase", "Database", "get_db"]
 
 
 def get_db() -> Database:
@@ -0,0 +1,236 @@
+"""
+异步数据库访问层 - 供 asyncio 流水线使用
+
+设计：
+- 读操作：asyncio.to_thread 在线程池中执行同步查询，不阻塞事件循环
+- 写操作：投递到队列，由单个专用写线程批量取出，在同一事务中执行，
+  整批只 commit 一次（WAL 模式下即一次 fsync），多个协程共享一次提交
+
+Usage:
+    from src.storage.async_db import AsyncDatabase
+
+    async with AsyncDatabase("data/sqlite/rss.db") as adb:
+        await asyncio.gather(*(adb.upsert_article(a) for a in articles))
+        unparsed = await adb.get_unparsed_articles(limit=50)
+"""
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+
+from sqlmodel import Session
+
+from src.storage.db import Article, ArticleAnalysis, Database, Report
+from src.storage.logger import logger
+
+
+@dataclass
+class _WriteOp:
+    """写队列中的单个写操作"""
+    fn: Callable[[Session], Any]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+
+
+_STOP = object()
+
+
+class AsyncDatabase:
+    """异步数据库管理 - 专用写线程 + 分组提交"""
+
+    def __init__(
+        self,
+        db: Database | str,
+        max_batch: int = 256,
+        max_delay: float = 0.005,
+    ):
+        """
+        Args:
+            db: 已有的 Database 实例，或数据库文件路径
+            max_batch: 单次提交最多包含的写操作数
+            max_delay: 拿到第一个写操作后，等待更多写操作合并的最长时间（秒）
+        """
+        self.db = db if isinstance(db, Database) else Database(db)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # 统计：提交次数 / 写操作数，用于观察分组提交效果
+        self.commits = 0
+        self.writes = 0
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # ============ 写线程 ============
+
+    def _ensure_writer(self) -> None:
+        """按需启动写线程"""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="async-db-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """写线程主循环：取一批写操作，单事务执行，一次提交"""
+        while True:
+            op = self._queue.get()
+            if op is _STOP:
+                return
+
+            batch = [op]
+            stop = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: list[_WriteOp]) -> None:
+        """执行一批写操作；整批失败时逐条重试，隔离出错的操作"""
+        try:
+            with Session(self.db.engine, expire_on_commit=False) as session:
+                try:
+                    results = [op.fn(session) for op in batch]
+                    session.commit()
+                except Exception:
+                    # 显式回滚：本批已 flush 的新对象恢复为 transient，重试时重新 INSERT；
+                    # 仅关闭 session 会使其变为 detached，重试时被当作已存在的行而静默丢失
+                    session.rollback()
+                    raise
+            self.commits += 1
+            self.writes += len(batch)
+            for op, result in zip(batch, results):
+                self._resolve(op, result=result)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0], error=e)
+                return
+            logger.warning(f"[AsyncDatabase] 批量提交失败，逐条重试 {len(batch)} 个写操作: {e}")
+
+        for op in batch:
+            self._run_batch([op])
+
+    @staticmethod
+    def _resolve(op: _WriteOp, result: Any = None, error: BaseException | None = None) -> None:
+        """在事件循环线程中设置 future 结果"""
+
+        def _set() -> None:
+            if op.future.done():
+                return
+            if error is not None:
+                op.future.set_exception(error)
+            else:
+                op.future.set_result(result)
+
+        try:
+            op.loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            # 事件循环已关闭，调用方不再等待结果
+            pass
+
+    async def _write(self, fn: Callable[[Session], Any]) -> Any:
+        """投递写操作并等待其所在批次提交"""
+        self._ensure_writer()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_WriteOp(fn=fn, future=future, loop=loop))
+        return await future
+
+    async def _read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """在线程池中执行同步读操作"""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def close(self) -> None:
+        """等待已排队的写操作完成后停止写线程"""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        await asyncio.to_thread(writer.join)
+        self._writer = None
+
+    # ============ Article 操作 ============
+
+    async def upsert_article(self, article: Article) -> int | None:
+        """插入或更新文章"""
+        return await self._write(lambda s: Database._merge_article(s, article))
+
+    async def upsert_articles(self, articles: List[Article]) -> List[int | None]:
+        """批量插入或更新文章"""
+        return await self._write(
+            lambda s: [Database._merge_article(s, a) for a in articles]
+        )
+
+    async def get_article_by_id(self, article_id: int) -> Optional[Article]:
+        """根据 ID 获取文章"""
+        return await self._read(self.db.get_article_by_id, article_id)
+
+    async def get_articles(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Article]:
+        """获取指定日期范围的文章"""
+        return await self._read(self.db.get_articles, start_date, end_date, limit)
+
+    async def get_articles_by_date(self, start: str, end: str | None = None) -> List[Article]:
+        """获取指定日期范围的文章（字符串格式 YYYY-MM-DD）"""
+        return await self._read(self.db.get_articles_by_date, start, end)
+
+    async def get_unparsed_articles(self, limit: int = 100) -> List[Article]:
+        """获取未解析的文章"""
+        return await self._read(self.db.get_unparsed_articles, limit)
+
+    # ============ ArticleAnalysis 操作 ============
+
+    async def save_analysis(self, analysis: ArticleAnalysis) -> int:
+        """保存或更新解析结果"""
+        return await self._write(lambda s: Database._merge_analysis(s, analysis))
+
+    async def get_analysis_by_article_id(self, article_id: int) -> Optional[ArticleAnalysis]:
+        """根据文章 ID 获取解析结果"""
+        return await self._read(self.db.get_analysis_by_article_id, article_id)
+
+    async def get_parsed_articles(
+        self, limit: int = 100
+    ) -> List[tuple[Article, ArticleAnalysis]]:
+        """获取已解析的文章（返回文章和解析结果）"""
+        return await self._read(self.db.get_parsed_articles, limit)
+
+    # ============ Report 操作 ============
+
+    async def save_report(self, report_type: str, date_range: str, content: str) -> int:
+        """保存报告"""
+        return await self._write(
+            lambda s: Database._insert_report(s, report_type, date_range, content)
+        )
+
+    async def get_reports(
+        self, report_type: Optional[str] = None, limit: int = 10
+    ) -> List[Report]:
+        """获取报告列表"""
+        return await self._read(self.db.get_reports, report_type, limit)
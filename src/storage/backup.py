@@ -0,0 +1,273 @@
+"""
+SQLite 在线备份模块 - 基于 SQLite Online Backup API
+
+特性：
+- 分步复制：每步复制 step_pages 页，步间休眠让出 I/O 给写入方
+- 一致性快照：备份期间在源连接上持有读事务，WAL 模式下写入不被阻塞，
+  备份也不会因源库被修改而从头重来
+- 压缩输出：gzip
+- 增量快照：按页哈希与上一快照比对，只保存变化的页
+
+快照目录结构：
+    snapshot-20260101-080000.full.gz       完整数据库（gzip）
+    snapshot-20260101-090000.delta.gz      变化页记录：[页号 uint32][页数据] ...
+    snapshot-*.json                        清单（类型、父快照、页大小、页数）
+    snapshot-*.pagehash                    每页 16 字节 blake2b 哈希，用于下次比对
+
+Usage:
+    from src.storage.backup import SQLiteBackup
+
+    backup = SQLiteBackup("data/sqlite/rss.db", "data/backups")
+    backup.backup()                     # 完整快照
+    backup.backup(incremental=True)     # 增量快照
+    backup.restore("restored.db")       # 恢复到最新快照
+"""
+import gzip
+import hashlib
+import json
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.storage.logger import logger
+
+DEFAULT_STEP_PAGES = 1024
+DEFAULT_SLEEP = 0.005
+DEFAULT_COMPRESS_LEVEL = 6
+
+_HASH_SIZE = 16
+_PAGE_NO = struct.Struct("<I")
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class BackupResult:
+    """备份结果"""
+    name: str
+    kind: str                # full / delta
+    path: Path
+    page_count: int
+    pages_written: int
+    bytes_written: int
+    elapsed: float
+
+
+class SQLiteBackup:
+    """SQLite 在线备份 / 增量快照 / 恢复"""
+
+    def __init__(
+        self,
+        db_path: str,
+        backup_dir: str,
+        step_pages: int = DEFAULT_STEP_PAGES,
+        sleep: float = DEFAULT_SLEEP,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    ):
+        self.db_path = Path(db_path)
+        self.backup_dir = Path(backup_dir)
+        self.step_pages = step_pages
+        self.sleep = sleep
+        self.compress_level = compress_level
+
+    # ============ 备份 ============
+
+    def backup(
+        self,
+        incremental: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BackupResult:
+        """执行一次快照
+
+        Args:
+            incremental: 是否只保存相对上一快照变化的页（无历史快照时自动做完整快照）
+            progress: 进度回调 (已复制页数, 总页数)
+        """
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"数据库不存在: {self.db_path}")
+
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        parent = self._latest_manifest() if incremental else None
+        if incremental and parent is None:
+            logger.info("[backup] 没有历史快照，执行完整快照")
+
+        start = time.monotonic()
+        name = f"snapshot-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as tmp:
+            copy_path = Path(tmp) / "copy.db"
+            page_size = self._online_copy(copy_path, progress)
+            hashes = self._page_hashes(copy_path, page_size)
+            page_count = len(hashes) // _HASH_SIZE
+
+            if parent is None:
+                kind = "full"
+                out_path = self.backup_dir / f"{name}.full.gz"
+                self._compress_file(copy_path, out_path)
+                pages_written = page_count
+            else:
+                kind = "delta"
+                if parent["page_size"] != page_size:
+                    raise RuntimeError("页大小已变化，无法做增量快照，请先执行完整快照")
+                out_path = self.backup_dir / f"{name}.delta.gz"
+                parent_hashes = (self.backup_dir / f"{parent['name']}.pagehash").read_bytes()
+                pages_written = self._write_delta(
+                    copy_path, out_path, page_size, hashes, parent_hashes
+                )
+
+        (self.backup_dir / f"{name}.pagehash").write_bytes(hashes)
+        manifest = {
+            "name": name,
+            "kind": kind,
+            "parent": parent["name"] if parent else None,
+            "page_size": page_size,
+            "page_count": page_count,
+            "pages_written": pages_written,
+            "created_at": datetime.now().isoformat(),
+        }
+        (self.backup_dir / f"{name}.json").write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+        result = BackupResult(
+            name=name,
+            kind=kind,
+            path=out_path,
+            page_count=page_count,
+            pages_written=pages_written,
+            bytes_written=out_path.stat().st_size,
+            elapsed=time.monotonic() - start,
+        )
+        logger.info(
+            f"[backup] {kind} 快照完成: {name}, {pages_written}/{page_count} 页, "
+            f"{result.bytes_written} 字节, {result.elapsed:.2f}s"
+        )
+        return result
+
+    def _online_copy(
+        self, dest: Path, progress: Optional[Callable[[int, int], None]]
+    ) -> int:
+        """使用 Online Backup API 分步复制到 dest，返回页大小"""
+        src = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        dst = sqlite3.connect(str(dest))
+        try:
+            # 持有读事务：所有步骤读取同一 WAL 快照，写入方照常提交
+            src.execute("BEGIN")
+            src.execute("SELECT count(*) FROM sqlite_master").fetchone()
+
+            def on_step(status: int, remaining: int, total: int) -> None:
+                if progress:
+                    progress(total - remaining, total)
+                if remaining and self.sleep > 0:
+                    time.sleep(self.sleep)
+
+            src.backup(dst, pages=self.step_pages, progress=on_step)
+            src.execute("COMMIT")
+            return dst.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            dst.close()
+            src.close()
+
+    @staticmethod
+    def _page_hashes(path: Path, page_size: int) -> bytes:
+        """计算每页的哈希，按页号顺序拼接"""
+        hashes = bytearray()
+        with open(path, "rb") as f:
+            while page := f.read(page_size):
+                hashes += hashlib.blake2b(page, digest_size=_HASH_SIZE).digest()
+        return bytes(hashes)
+
+    def _compress_file(self, src: Path, dest: Path) -> None:
+        """gzip 压缩整个文件"""
+        with open(src, "rb") as fin, gzip.open(dest, "wb", self.compress_level) as fout:
+            shutil.copyfileobj(fin, fout, _CHUNK_SIZE)
+
+    def _write_delta(
+        self,
+        copy_path: Path,
+        out_path: Path,
+        page_size: int,
+        hashes: bytes,
+        parent_hashes: bytes,
+    ) -> int:
+        """只写入哈希与父快照不同的页，返回写入页数"""
+        written = 0
+        with open(copy_path, "rb") as fin, gzip.open(out_path, "wb", self.compress_level) as fout:
+            for page_no in range(len(hashes) // _HASH_SIZE):
+                offset = page_no * _HASH_SIZE
+                digest = hashes[offset:offset + _HASH_SIZE]
+                if parent_hashes[offset:offset + _HASH_SIZE] == digest:
+                    continue
+                fin.seek(page_no * page_size)
+                fout.write(_PAGE_NO.pack(page_no))
+                fout.write(fin.read(page_size))
+                written += 1
+        return written
+
+    # ============ 快照管理 ============
+
+    def list_snapshots(self) -> list[dict]:
+        """列出所有快照清单（按时间排序）"""
+        if not self.backup_dir.exists():
+            return []
+        manifests = [
+            json.loads(p.read_text(encoding="utf-8"))
+            for p in self.backup_dir.glob("snapshot-*.json")
+        ]
+        return sorted(manifests, key=lambda m: m["name"])
+
+    def _latest_manifest(self) -> Optional[dict]:
+        snapshots = self.list_snapshots()
+        return snapshots[-1] if snapshots else None
+
+    def _chain(self, name: str) -> list[dict]:
+        """从指定快照回溯到完整快照，返回从旧到新的快照链"""
+        by_name = {m["name"]: m for m in self.list_snapshots()}
+        chain = []
+        current: Optional[str] = name
+        while current:
+            manifest = by_name.get(current)
+            if manifest is None:
+                raise FileNotFoundError(f"快照不存在或快照链断裂: {current}")
+            chain.append(manifest)
+            current = manifest["parent"]
+        return list(reversed(chain))
+
+    # ============ 恢复 ============
+
+    def restore(self, target: str, snapshot: Optional[str] = None) -> Path:
+        """将快照（默认最新）恢复为 target 数据库文件"""
+        if snapshot is None:
+            latest = self._latest_manifest()
+            if latest is None:
+                raise FileNotFoundError(f"{self.backup_dir} 中没有快照")
+            snapshot = latest["name"]
+
+        target_path = Path(target)
+        if target_path.exists():
+            raise FileExistsError(f"目标文件已存在: {target_path}")
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+
+        chain = self._chain(snapshot)
+        base, deltas = chain[0], chain[1:]
+        with gzip.open(self.backup_dir / f"{base['name']}.full.gz", "rb") as fin, \
+                open(target_path, "wb") as fout:
+            shutil.copyfileobj(fin, fout, _CHUNK_SIZE)
+
+        with open(target_path, "r+b") as fout:
+            for manifest in deltas:
+                page_size = manifest["page_size"]
+                with gzip.open(self.backup_dir / f"{manifest['name']}.delta.gz", "rb") as fin:
+                    while header := fin.read(_PAGE_NO.size):
+                        (page_no,) = _PAGE_NO.unpack(header)
+                        fout.seek(page_no * page_size)
+                        fout.write(fin.read(page_size))
+                fout.truncate(manifest["page_count"] * page_size)
+
+        logger.info(f"[backup] 已恢复快照 {snapshot} -> {target_path} ({len(chain)} 个快照)")
+        return target_path
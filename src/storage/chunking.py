@@ -0,0 +1,130 @@
+"""
+正文分段 - 将长文切成适合嵌入的片段
+
+- 按句切分：中文句末标点（。！？；…）、英文句末标点后接空白、换行
+- 贪心拼句：片段不超过 chunk_size 字符，相邻片段重叠最多 overlap 字符的整句
+- 超长句按字符窗口硬切（同样带重叠）
+- 正文可能含 HTML（RSS content 字段未清洗），切分前先去标签
+
+Usage:
+    from src.storage.chunking import chunk_text
+
+    chunks = chunk_text(article.content, chunk_size=400, overlap=80, max_chunks=8)
+"""
+import html
+import re
+from typing import List
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v　]+")
+# 句末：中文标点（可跟引号/括号）直接断开；英文标点需后接空白，避免切开 3.14 / e.g.
+_SENTENCE_RE = re.compile(
+    r"(?<=[。！？；…])[”’」』）)]*\s*"
+    r"|(?<=[.!?;])[\"')\]]*\s+"
+    r"|\n+"
+)
+
+
+def clean_text(text: str) -> str:
+    """去除 HTML 标签与实体，压缩空白（保留换行作为段落边界）"""
+    text = html.unescape(_TAG_RE.sub("\n", text))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中英文句末标点与换行切句"""
+    sentences = []
+    pos = 0
+    for match in _SENTENCE_RE.finditer(text):
+        # 句末的闭合引号/括号归属前一句
+        end = match.start() + len(match.group().rstrip())
+        sentence = text[pos:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        pos = match.end()
+    tail = text[pos:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _hard_split(sentence: str, chunk_size: int, overlap: int) -> List[str]:
+    """超长句按字符窗口切分，最后一个窗口总是覆盖到句尾"""
+    step = max(chunk_size - overlap, 1)
+    pieces = []
+    for start in range(0, len(sentence), step):
+        pieces.append(sentence[start:start + chunk_size])
+        if start + chunk_size >= len(sentence):
+            break
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int = 400,
+    overlap: int = 80,
+    max_chunks: int = 0,
+) -> List[str]:
+    """将文本切分为带重叠的片段
+
+    Args:
+        text: 原文（可含 HTML）
+        chunk_size: 片段最大字符数
+        overlap: 相邻片段重叠的最大字符数（以整句为单位）
+        max_chunks: 最多返回的片段数，0 表示不限制（保留靠前的片段）
+
+    Returns:
+        片段列表；空文本返回空列表
+
+    Raises:
+        ValueError: chunk_size 不为正数，或 overlap 不在 [0, chunk_size) 内
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size 必须为正数: {chunk_size}")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError(
+            f"overlap 必须在 [0, chunk_size) 内: overlap={overlap}, chunk_size={chunk_size}"
+        )
+
+    sentences: List[str] = []
+    for sentence in split_sentences(clean_text(text)):
+        if len(sentence) > chunk_size:
+            sentences.extend(_hard_split(sentence, chunk_size, overlap))
+        else:
+            sentences.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    fresh = 0  # current 中尚未出现在上一片段里的句子数
+    for sentence in sentences:
+        if fresh and length + len(sentence) > chunk_size:
+            chunks.append(_join(current))
+            if max_chunks and len(chunks) >= max_chunks:
+                return chunks
+
+            # 从上一片段末尾回取整句作为重叠
+            carried: List[str] = []
+            carried_len = 0
+            for prev in reversed(current):
+                if carried_len + len(prev) > min(overlap, chunk_size - len(sentence)):
+                    break
+                carried.insert(0, prev)
+                carried_len += len(prev)
+            current, length, fresh = carried, carried_len, 0
+
+        current.append(sentence)
+        length += len(sentence)
+        fresh += 1
+
+    if fresh:
+        chunks.append(_join(current))
+    return chunks
+
+
+def _join(sentences: List[str]) -> str:
+    """以中日韩文字为主时句子直接拼接，否则以空格连接"""
+    sample = "".join(sentences)[:200]
+    cjk = sum(1 for ch in sample if "\u4e00" <= ch <= "\u9fff" or "\u3040" <= ch <= "\u30ff")
+    separator = "" if cjk * 2 > len(sample.replace(" ", "")) else " "
+    return separator.join(sentences)
@@ -3,9 +3,9 @@ SQLite 数据库操作模块 - 使用 SQLModel ORM
 """
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+from sqlmodel import Field, Session, SQLModel, create_engine, delete, func, select
 from sqlmodel.sql.expression import desc
 
 
@@ -60,6 +60,15 @@ class Report(SQLModel, table=True):
     created_at: str
 
 
+class VectorIndexState(SQLModel, table=True):
+    """向量索引水位（每篇文章已索引内容的哈希）"""
+    __tablename__ = "vector_index_state"
+
+    article_id: int = Field(primary_key=True)
+    content_hash: str
+    indexed_at: str
+
+
 # ============ 数据库管理 ============
 
 class Database:
@@ -76,6 +85,7 @@ class Database:
         )
         self._init_db()
         self._enable_wal()
+        self._init_fts()
 
     def _init_db(self):
         """初始化数据库表"""
@@ -88,38 +98,108 @@ class Database:
             conn.execute(text("PRAGMA journal_mode=WAL"))
             conn.execute(text("PRAGMA busy_timeout=30000"))
 
+    def _init_fts(self):
+        """初始化文章全文索引（FTS5，外部内容表 + 触发器自动同步）
+
+        优先使用 trigram 分词器，中文实体名（产品名、公司名）可按子串匹配；
+        SQLite 版本过旧不支持时退回 unicode61。只在新建索引时为已有文章全量建索引，
+        之后由触发器增量同步；索引损坏时用 rebuild_fts()（brief db rebuild-fts）重建。
+        """
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='articles_fts'")
+            ).first()
+            if exists:
+                return
+
+            for tokenizer in ("trigram", "unicode61"):
+                try:
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE articles_fts USING fts5("
+                        "title, summary, content, content='articles', content_rowid='id', "
+                        f"tokenize='{tokenizer}')"
+                    ))
+                    break
+                except Exception:
+                    if tokenizer == "unicode61":
+                        raise
+
+            conn.execute(text("""
+                CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                    INSERT INTO articles_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END"""))
+            conn.execute(text("""
+                CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                END"""))
+            conn.execute(text("""
+                CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+                    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                    INSERT INTO articles_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END"""))
+            # 新建的索引为空：为已有文章建立索引（仅此一次）
+            conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+
+    def rebuild_fts(self) -> None:
+        """按 articles 表全量重建全文索引（大库耗时较长，仅用于修复）"""
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+
     def _session(self) -> Session:
-        """获取数据库 session"""
-        return Session(self.engine)
+        """获取数据库 session
+
+        提交后不过期对象属性，写入方法返回后调用方仍可直接读取已保存的对象。
+        """
+        return Session(self.engine, expire_on_commit=False)
 
     # ============ Article 操作 ============
 
     def upsert_article(self, article: Article) -> int | None:
         """插入或更新文章"""
         with self._session() as session:
-            # 检查是否存在
-            existing = session.exec(
-                select(Article).where(Article.url == article.url)
-            ).first()
+            article_id = self._merge_article(session, article)
+            session.commit()
+            return article_id
 
-            if existing:
-                # 更新
-                existing.feed_name = article.feed_name
-                existing.title = article.title
-                existing.summary = article.summary
-                existing.content = article.content
-                existing.published_at = article.published_at
-                existing.fetched_at = article.fetched_at
-                existing.tags = article.tags
-                session.add(existing)
-                session.commit()
-                return existing.id
-            else:
-                # 插入
-                session.add(article)
-                session.commit()
-                session.refresh(article)
-                return article.id
+    def upsert_articles(self, articles: List[Article]) -> List[int | None]:
+        """批量插入或更新文章（单个事务）"""
+        with self._session() as session:
+            ids = [self._merge_article(session, article) for article in articles]
+            session.commit()
+            return ids
+
+    @staticmethod
+    def _merge_article(session: Session, article: Article) -> int | None:
+        """在给定 session 中插入或更新文章（不提交）"""
+        # 检查是否存在
+        existing = session.exec(
+            select(Article).where(Article.url == article.url)
+        ).first()
+
+        if existing:
+            # 更新
+            existing.feed_name = article.feed_name
+            existing.title = article.title
+            existing.summary = article.summary
+            existing.content = article.content
+            existing.published_at = article.published_at
+            existing.fetched_at = article.fetched_at
+            existing.tags = article.tags
+            session.add(existing)
+            return existing.id
+
+        # 插入
+        session.add(article)
+        session.flush()
+        return article.id
 
     def get_article_by_id(self, article_id: int) -> Optional[Article]:
         """根据 ID 获取文章"""
@@ -150,6 +230,37 @@ class Database:
         end_date = datetime.strptime(end, "%Y-%m-%d") if end else start_date
         return self.get_articles(start_date=start_date, end_date=end_date, limit=100)
 
+    def iter_articles(self, batch_size: int = 1000, after_id: int = 0) -> Iterator[List[Article]]:
+        """按 ID 键集分页遍历全部文章，每页一个独立 session"""
+        last_id = after_id
+        while True:
+            with self._session() as session:
+                page = list(
+                    session.exec(
+                        select(Article)
+                        .where(Article.id > last_id)
+                        .order_by(Article.id)
+                        .limit(batch_size)
+                    ).all()
+                )
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+
+    def get_article_ids(self) -> set[int]:
+        """获取全部文章 ID"""
+        with self._session() as session:
+            return set(session.exec(select(Article.id)).all())
+
+    def count_articles(self, after_id: int = 0, published_after: Optional[datetime] = None) -> int:
+        """统计 ID 大于 after_id（且发布时间不早于 published_after）的文章数"""
+        with self._session() as session:
+            statement = select(func.count()).select_from(Article).where(Article.id > after_id)
+            if published_after is not None:
+                statement = statement.where(Article.published_at >= published_after)
+            return session.exec(statement).one()
+
     def get_unparsed_articles(self, limit: int = 100) -> List[Article]:
         """获取未解析的文章（不在 article_analysis 表中）"""
         with self._session() as session:
@@ -164,31 +275,110 @@ class Database:
             )
             return list(session.exec(query).all())
 
+    def search_keyword(
+        self,
+        query: str,
+        limit: int = 20,
+        feed_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[dict]:
+        """BM25 关键词检索（标题 > 摘要 > 正文加权），按相关度排序
+
+        trigram 分词要求词长 >= 3：长词走 FTS（任一命中），短词走 LIKE 子串匹配（任一命中），
+        两类词同时出现时两个条件都需满足。
+        """
+        from sqlalchemy import text
+
+        terms = [t for t in query.split() if t]
+        long_terms = [t for t in terms if len(t) >= 3]
+        short_terms = [t for t in terms if len(t) < 3]
+        if not terms:
+            return []
+
+        params: dict = {"limit": limit}
+        filters = []
+        if feed_name:
+            filters.append("a.feed_name = :feed_name")
+            params["feed_name"] = feed_name
+        if start_date:
+            filters.append("a.published_at >= :start_date")
+            params["start_date"] = start_date.strftime("%Y-%m-%d %H:%M:%S.%f")
+        if end_date:
+            filters.append("a.published_at <= :end_date")
+            params["end_date"] = end_date.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+        likes = []
+        for i, term in enumerate(short_terms):
+            params[f"like{i}"] = f"%{term}%"
+            likes.append(f"(a.title LIKE :like{i} OR a.summary LIKE :like{i})")
+        if likes:
+            filters.append(f"({' OR '.join(likes)})")
+
+        if long_terms:
+            params["match"] = " OR ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+            sql = (
+                "SELECT a.id, a.feed_name, a.title, a.url, a.published_at, "
+                "bm25(articles_fts, 10.0, 5.0, 1.0) AS score "
+                "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                "WHERE articles_fts MATCH :match"
+            )
+            order = "score"
+        else:
+            sql = (
+                "SELECT a.id, a.feed_name, a.title, a.url, a.published_at, 0.0 AS score "
+                "FROM articles a WHERE 1"
+            )
+            order = "a.published_at DESC"
+
+        for f in filters:
+            sql += f" AND {f}"
+        sql += f" ORDER BY {order} LIMIT :limit"
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(sql), params).all()
+        return [
+            {
+                "article_id": row[0],
+                "feed_name": row[1],
+                "title": row[2],
+                "url": row[3],
+                "published_at": row[4],
+                "score": row[5],
+            }
+            for row in rows
+        ]
+
     # ============ ArticleAnalysis 操作 ============
 
     def save_analysis(self, analysis: ArticleAnalysis) -> int:
         """保存或更新解析结果"""
         with self._session() as session:
-            existing = session.exec(
-                select(ArticleAnalysis).where(
-                    ArticleAnalysis.article_id == analysis.article_id
-                )
-            ).first()
+            analysis_id = self._merge_analysis(session, analysis)
+            session.commit()
+            return analysis_id
+
+    @staticmethod
+    def _merge_analysis(session: Session, analysis: ArticleAnalysis) -> int:
+        """在给定 session 中保存或更新解析结果（不提交）"""
+        existing = session.exec(
+            select(ArticleAnalysis).where(
+                ArticleAnalysis.article_id == analysis.article_id
+            )
+        ).first()
+
+        if existing:
+            existing.summary_llm = analysis.summary_llm
+            existing.keywords = analysis.keywords
+            existing.category = analysis.category
+            existing.sentiment = analysis.sentiment
+            existing.parsed_at = analysis.parsed_at
+            session.add(existing)
+            return existing.id
 
-            if existing:
-                existing.summary_llm = analysis.summary_llm
-                existing.keywords = analysis.keywords
-                existing.category = analysis.category
-                existing.sentiment = analysis.sentiment
-                existing.parsed_at = analysis.parsed_at
-                session.add(existing)
-                session.commit()
-                return existing.id
-            else:
-                session.add(analysis)
-                session.commit()
-                session.refresh(analysis)
-                return analysis.id
+        session.add(analysis)
+        session.flush()
+        return analysis.id
 
     def get_analysis_by_article_id(self, article_id: int) -> Optional[ArticleAnalysis]:
         """根据文章 ID 获取解析结果"""
@@ -222,21 +412,61 @@ class Database:
             session.commit()
             return len(count)
 
+    # ============ VectorIndexState 操作 ============
+
+    def get_vector_index_state(self) -> Dict[int, str]:
+        """获取全部已索引文章的内容哈希 {article_id: content_hash}"""
+        with self._session() as session:
+            rows = session.exec(
+                select(VectorIndexState.article_id, VectorIndexState.content_hash)
+            ).all()
+            return {article_id: content_hash for article_id, content_hash in rows}
+
+    def save_vector_index_state(self, hashes: Dict[int, str]) -> None:
+        """批量记录已索引文章的内容哈希"""
+        now = datetime.now().isoformat()
+        with self._session() as session:
+            for article_id, content_hash in hashes.items():
+                session.merge(
+                    VectorIndexState(
+                        article_id=article_id, content_hash=content_hash, indexed_at=now
+                    )
+                )
+            session.commit()
+
+    def delete_vector_index_state(self, article_ids: List[int]) -> None:
+        """批量删除索引水位"""
+        if not article_ids:
+            return
+        with self._session() as session:
+            session.exec(
+                delete(VectorIndexState).where(VectorIndexState.article_id.in_(article_ids))
+            )
+            session.commit()
+
     # ============ Report 操作 ============
 
     def save_report(self, report_type: str, date_range: str, content: str) -> int:
         """保存报告"""
         with self._session() as session:
-            report = Report(
-                report_type=report_type,
-                date_range=date_range,
-                content=content,
-                created_at=datetime.now().isoformat(),
-            )
-            session.add(report)
+            report_id = self._insert_report(session, report_type, date_range, content)
             session.commit()
-            session.refresh(report)
-            return report.id
+            return report_id
+
+    @staticmethod
+    def _insert_report(
+        session: Session, report_type: str, date_range: str, content: str
+    ) -> int:
+        """在给定 session 中插入报告（不提交）"""
+        report = Report(
+            report_type=report_type,
+            date_range=date_range,
+            content=content,
+            created_at=datetime.now().isoformat(),
+        )
+        session.add(report)
+        session.flush()
+        return report.id
 
     def get_reports(
         self, report_type: Optional[str] = None, limit: int = 10
@@ -0,0 +1,186 @@
+"""
+嵌入向量持久化缓存 - 以 hash(模型名, 文本) 为键
+
+存储：
+    vectors.bin   定长行矩阵（float16 / float32），通过 np.memmap 只读映射，查找零拷贝
+    index.db      SQLite 偏移索引：key(16 字节 blake2b) → 行号，以及 dim / dtype 元信息
+
+写入时先取得 SQLite 写锁再追加向量行，多个进程可以安全地共用同一个缓存目录。
+重建向量库时，已嵌入过的文本直接从缓存读取，整体变为 I/O 密集而非模型密集。
+
+Usage:
+    from src.storage.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache("data/embed_cache")
+    keys = [cache.key("all-MiniLM-L6-v2", t) for t in texts]
+    found = cache.get_many(keys)            # {key: vector}
+    cache.put_many(missing_keys, vectors)
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+_KEY_SIZE = 16
+_SQL_CHUNK = 500
+
+
+class EmbeddingCache:
+    """基于内存映射矩阵的嵌入缓存"""
+
+    def __init__(self, path: str, dtype: str = "float16"):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.path / "vectors.bin"
+        self.vectors_path.touch(exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            str(self.path / "index.db"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key BLOB PRIMARY KEY, row INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self._load_meta()
+
+        self._lock = threading.Lock()
+        self._mmap: Optional[np.memmap] = None
+        self._mapped_rows = 0
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+
+    def _load_meta(self) -> None:
+        """读取已有缓存的 dim / dtype（可能由其他进程首次写入）"""
+        meta = dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+        if "dim" in meta:
+            self.dim = int(meta["dim"])
+            self.dtype = np.dtype(meta["dtype"])
+
+    @staticmethod
+    def key(model_name: str, text: str) -> bytes:
+        """缓存键：hash(模型名, 文本)"""
+        h = hashlib.blake2b(digest_size=_KEY_SIZE)
+        h.update(model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        return h.digest()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    # ============ 读取 ============
+
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def _matrix(self, min_rows: int) -> np.memmap:
+        """返回覆盖至少 min_rows 行的只读映射，文件增长后重新映射"""
+        if self._mmap is None or self._mapped_rows < min_rows:
+            rows = self.vectors_path.stat().st_size // self._row_bytes()
+            self._mmap = np.memmap(
+                self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim)
+            )
+            self._mapped_rows = rows
+        return self._mmap
+
+    def lookup(self, keys: list[bytes]) -> dict[bytes, int]:
+        """批量查询键对应的行号"""
+        rows: dict[bytes, int] = {}
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.update(
+                self._conn.execute(
+                    f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+        return rows
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """单条查询，返回内存映射上的只读视图（零拷贝）"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """批量查询，返回 {key: 向量视图}，未命中的键不出现在结果中"""
+        if self.dim is None:
+            self._load_meta()
+        if self.dim is None or not keys:
+            self.misses += len(keys)
+            return {}
+
+        rows = self.lookup(keys)
+        self.hits += len(rows)
+        self.misses += len(keys) - len(rows)
+        if not rows:
+            return {}
+
+        with self._lock:
+            matrix = self._matrix(max(rows.values()) + 1)
+        return {key: matrix[row] for key, row in rows.items()}
+
+    # ============ 写入 ============
+
+    def put_many(self, keys: list[bytes], vectors: np.ndarray) -> None:
+        """追加写入向量（已存在的键跳过）"""
+        if not keys:
+            return
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError("keys 与 vectors 行数不一致")
+
+        with self._lock:
+            # 先取得写锁，保证多进程追加时行号与文件偏移一致
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._load_meta()
+                if self.dim is None:
+                    self._conn.executemany(
+                        "INSERT INTO meta (name, value) VALUES (?, ?)",
+                        [("dim", str(vectors.shape[1])), ("dtype", self.dtype.name)],
+                    )
+                    self.dim = int(vectors.shape[1])
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"向量维度不匹配: {vectors.shape[1]} != {self.dim}")
+
+                existing = self.lookup(list(keys))
+                new_keys, new_rows, seen = [], [], set()
+                for i, key in enumerate(keys):
+                    if key in existing or key in seen:
+                        continue
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_rows.append(i)
+
+                if new_keys:
+                    data = np.ascontiguousarray(vectors[new_rows], dtype=self.dtype)
+                    with open(self.vectors_path, "r+b") as f:
+                        # 对齐到整行：丢弃上次中断时可能残留的半行
+                        start = self.vectors_path.stat().st_size // self._row_bytes()
+                        f.seek(start * self._row_bytes())
+                        f.truncate()
+                        f.write(data.tobytes())
+                    self._conn.executemany(
+                        "INSERT INTO entries (key, row) VALUES (?, ?)",
+                        [(key, start + i) for i, key in enumerate(new_keys)],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        self._mmap = None
+        self._conn.close()
@@ -0,0 +1,188 @@
+"""
+嵌入模型服务 - 通过本地 Unix socket 共享一个常驻的 SentenceTransformer
+
+多个 CLI 进程 / worker 连接同一个服务，只需加载一次模型，避免每个进程各自冷启动。
+
+协议（每个请求一个连接）：
+    请求:  [4 字节长度][JSON {"texts": [...], "batch_size": 32, "normalize": false}]
+    响应:  [4 字节长度][JSON {"shape": [n, dim]} 或 {"error": "..."}][float32 原始字节]
+
+Usage:
+    # 启动服务
+    uv run main.py rag serve-embedder --socket /tmp/brief-embed.sock
+
+    # 客户端（接口与 SentenceTransformer.encode 一致）
+    from src.storage.embedding_server import RemoteEmbedder
+
+    embedder = RemoteEmbedder("/tmp/brief-embed.sock")
+    vectors = embedder.encode(["文本1", "文本2"])
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.storage.logger import logger
+
+_LEN = struct.Struct("!I")
+
+
+def _send_msg(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    data = json.dumps(header).encode("utf-8")
+    sock.sendall(_LEN.pack(len(data)) + data + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(min(size - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("连接已关闭")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_header(sock: socket.socket) -> dict:
+    (size,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+# ============ 服务端 ============
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    """处理单个编码请求"""
+
+    def handle(self) -> None:
+        server: "EmbeddingServer" = self.server.embedding_server  # type: ignore[attr-defined]
+        try:
+            request = _recv_header(self.request)
+            if request.get("ping"):
+                _send_msg(self.request, {"model": server.model_name})
+                return
+            vectors = server.encode(
+                request["texts"],
+                batch_size=request.get("batch_size", 32),
+                normalize=request.get("normalize", False),
+            )
+            _send_msg(self.request, {"shape": list(vectors.shape)}, vectors.tobytes())
+        except Exception as e:
+            logger.error(f"[EmbeddingServer] 请求处理失败: {e}")
+            try:
+                _send_msg(self.request, {"error": str(e)})
+            except OSError:
+                pass
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class EmbeddingServer:
+    """常驻嵌入模型服务"""
+
+    def __init__(
+        self,
+        model_name: str,
+        socket_path: str,
+        runtime: str = "torch",
+        onnx_dir: str = "data/onnx",
+    ):
+        self.model_name = model_name
+        self.runtime = runtime
+        self.onnx_dir = onnx_dir
+        self.socket_path = Path(socket_path)
+        self._model: Any = None
+        # 串行化推理，避免多个请求同时抢占 CPU 线程
+        self._lock = threading.Lock()
+
+    def encode(self, texts: list[str], batch_size: int = 32, normalize: bool = False) -> np.ndarray:
+        from src.storage.vector_store import get_embedder
+
+        if self._model is None:
+            self._model = get_embedder(self.model_name, self.runtime, self.onnx_dir)
+        with self._lock:
+            vectors = self._model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=normalize,
+                convert_to_numpy=True,
+            )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def serve_forever(self) -> None:
+        """加载模型并开始监听（阻塞）"""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        # 预热，首个请求不再承担冷启动
+        self.encode(["warmup"])
+
+        with _ThreadingUnixServer(str(self.socket_path), _EncodeHandler) as server:
+            server.embedding_server = self  # type: ignore[attr-defined]
+            logger.info(
+                f"[EmbeddingServer] 已启动: model={self.model_name} ({self.runtime}), "
+                f"socket={self.socket_path}"
+            )
+            try:
+                server.serve_forever()
+            finally:
+                if self.socket_path.exists():
+                    os.unlink(self.socket_path)
+
+
+# ============ 客户端 ============
+
+class RemoteEmbedder:
+    """嵌入服务客户端，encode 接口与 SentenceTransformer 保持一致"""
+
+    def __init__(self, socket_path: str, timeout: float = 120.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def ping(self) -> bool:
+        """服务是否可用"""
+        try:
+            with self._connect() as sock:
+                sock.settimeout(2.0)
+                _send_msg(sock, {"ping": True})
+                _recv_header(sock)
+            return True
+        except OSError:
+            return False
+
+    def encode(
+        self,
+        sentences: str | list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        with self._connect() as sock:
+            _send_msg(
+                sock,
+                {"texts": texts, "batch_size": batch_size, "normalize": normalize_embeddings},
+            )
+            header = _recv_header(sock)
+            if "error" in header:
+                raise RuntimeError(f"嵌入服务错误: {header['error']}")
+            shape = tuple(header["shape"])
+            payload = _recv_exact(sock, int(np.prod(shape)) * 4)
+
+        vectors = np.frombuffer(payload, dtype=np.float32).reshape(shape)
+        return vectors[0] if single else vectors
@@ -0,0 +1,328 @@
+"""
+列式导出模块 - 将 Article + ArticleAnalysis 导出为分区 Parquet
+
+特性：
+- 键集分页：按 Article.id 递增分页读取，每页一个短读事务，不长时间占用数据库
+- 内存有界：按分区缓冲行，分区攒满一个行组才写出；总缓冲超限时只写出最大的分区
+- 分区：month=YYYY-MM/feed=<订阅源>/part-<运行ID>.parquet（Hive 风格）
+- 增量：记录导出水位（文章抓取时间 / 解析时间的最大值）及水位时刻已导出的文章，
+  下次导出变化时间 >= 水位的行（同一时刻变化的行不会漏导，已导出的不重复）；
+  水位覆盖全部文章，因此增量导出不能与日期范围同时使用
+- 合并：同一文章再次变化时会在新的 part 文件中追加新版本；compact() 按分区合并 part 文件，
+  每篇文章只保留最新版本（运行 ID 按时间排序，后写入的为新版本）
+
+依赖 pyarrow（可选依赖）：
+    uv sync --extra export
+
+Usage:
+    from src.storage.export import ParquetExporter
+
+    exporter = ParquetExporter(db, "data/export")
+    stats = exporter.export(start_date=..., end_date=...)     # 按发布时间范围全量导出
+    stats = exporter.export(incremental=True)                 # 增量导出
+    exporter.compact()
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlmodel import or_, select
+
+from src.storage.db import Article, ArticleAnalysis, Database
+from src.storage.logger import logger
+
+WATERMARK_FILE = "_watermark.json"
+
+_COLUMNS = [
+    ("article_id", Article.id),
+    ("feed_name", Article.feed_name),
+    ("title", Article.title),
+    ("url", Article.url),
+    ("summary", Article.summary),
+    ("content", Article.content),
+    ("tags", Article.tags),
+    ("published_at", Article.published_at),
+    ("fetched_at", Article.fetched_at),
+    ("summary_llm", ArticleAnalysis.summary_llm),
+    ("keywords", ArticleAnalysis.keywords),
+    ("category", ArticleAnalysis.category),
+    ("sentiment", ArticleAnalysis.sentiment),
+    ("parsed_at", ArticleAnalysis.parsed_at),
+]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet 导出需要 pyarrow，请执行: uv sync --extra export") from e
+    return pa, pq
+
+
+def _schema(pa, include_content: bool):
+    fields = [
+        pa.field("article_id", pa.int64()),
+        pa.field("feed_name", pa.string()),
+        pa.field("title", pa.string()),
+        pa.field("url", pa.string()),
+        pa.field("summary", pa.string()),
+        pa.field("content", pa.string()),
+        pa.field("tags", pa.string()),
+        pa.field("published_at", pa.timestamp("us")),
+        pa.field("fetched_at", pa.timestamp("us")),
+        pa.field("summary_llm", pa.string()),
+        pa.field("keywords", pa.string()),
+        pa.field("category", pa.string()),
+        pa.field("sentiment", pa.string()),
+        pa.field("parsed_at", pa.string()),
+    ]
+    if not include_content:
+        fields = [f for f in fields if f.name != "content"]
+    return pa.schema(fields)
+
+
+def _safe_segment(value: str) -> str:
+    """分区目录名中去掉路径分隔符等非法字符"""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", value).strip("_") or "unknown"
+
+
+@dataclass
+class ExportStats:
+    """导出统计"""
+    rows: int = 0
+    files: list[Path] = field(default_factory=list)
+    watermark: Optional[str] = None
+
+
+@dataclass
+class CompactStats:
+    """合并统计"""
+    partitions: int = 0
+    files_removed: int = 0
+    rows_removed: int = 0
+
+
+class ParquetExporter:
+    """Article + ArticleAnalysis 分区 Parquet 导出器"""
+
+    def __init__(
+        self,
+        db: Database,
+        output_dir: str,
+        page_size: int = 5000,
+        row_group_size: int = 50000,
+        include_content: bool = True,
+        max_buffered_rows: Optional[int] = None,
+    ):
+        """
+        Args:
+            row_group_size: 每个分区攒满多少行写出一个行组
+            max_buffered_rows: 所有分区合计的缓冲上限，超出时写出最大的分区（默认 2 个行组）
+        """
+        self.db = db
+        self.output_dir = Path(output_dir)
+        self.page_size = page_size
+        self.row_group_size = row_group_size
+        self.include_content = include_content
+        self.max_buffered_rows = max_buffered_rows or 2 * row_group_size
+
+    # ============ 水位 ============
+
+    def _load_state(self) -> dict:
+        path = self.output_dir / WATERMARK_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def load_watermark(self) -> Optional[str]:
+        """读取上次导出的水位（ISO 时间字符串）"""
+        return self._load_state().get("changed_at")
+
+    def _save_watermark(self, watermark: str, ids: set[int]) -> None:
+        path = self.output_dir / WATERMARK_FILE
+        state = {
+            "changed_at": watermark,
+            "ids": sorted(ids),  # 变化时间恰为水位、已导出的文章
+            "exported_at": datetime.now().isoformat(),
+        }
+        path.write_text(json.dumps(state), encoding="utf-8")
+
+    # ============ 读取 ============
+
+    def _iter_pages(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        since: Optional[str],
+    ):
+        """键集分页读取联表行，每页一个独立 session"""
+        columns = [
+            col for name, col in _COLUMNS if self.include_content or name != "content"
+        ]
+        last_id = 0
+        while True:
+            query = (
+                select(*columns)
+                .outerjoin(ArticleAnalysis, Article.id == ArticleAnalysis.article_id)
+                .where(Article.id > last_id)
+            )
+            if start_date:
+                query = query.where(Article.published_at >= start_date)
+            if end_date:
+                query = query.where(Article.published_at < end_date)
+            if since:
+                # 含等于：与水位同一时刻变化、上次尚未导出的行不能漏掉
+                query = query.where(
+                    or_(
+                        Article.fetched_at >= datetime.fromisoformat(since),
+                        ArticleAnalysis.parsed_at >= since,
+                    )
+                )
+            query = query.order_by(Article.id).limit(self.page_size)
+
+            with self.db._session() as session:
+                rows = session.exec(query).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    # ============ 导出 ============
+
+    def export(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        incremental: bool = False,
+    ) -> ExportStats:
+        """导出到分区 Parquet
+
+        Args:
+            start_date: 发布时间下界（含）
+            end_date: 发布时间上界（不含）
+            incremental: 只导出水位之后变化的行，并推进水位（不能与日期范围同时使用）
+
+        Raises:
+            ValueError: 增量导出同时指定了日期范围
+        """
+        if incremental and (start_date or end_date):
+            # 窗口外更早变化的行会落在推进后的水位之前，之后的增量导出再也不会导出
+            raise ValueError("增量导出不能与日期范围同时使用")
+        pa, pq = _require_pyarrow()
+        schema = _schema(pa, self.include_content)
+        names = schema.names
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state() if incremental else {}
+        since = state.get("changed_at")
+        exported_at_since = set(state.get("ids", []))
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        stats = ExportStats(watermark=since)
+        watermark_ids = set(exported_at_since)
+
+        writers: dict[tuple[str, str], Any] = {}
+        buffers: dict[tuple[str, str], list[dict]] = {}
+        buffered = 0
+
+        def flush(key: tuple[str, str]) -> None:
+            nonlocal buffered
+            rows = buffers.pop(key, None)
+            if not rows:
+                return
+            buffered -= len(rows)
+            if key not in writers:
+                month, feed = key
+                part_dir = self.output_dir / f"month={month}" / f"feed={_safe_segment(feed)}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                path = part_dir / f"part-{run_id}.parquet"
+                writers[key] = pq.ParquetWriter(path, schema, compression="zstd")
+                stats.files.append(path)
+            batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+            writers[key].write_batch(batch)
+
+        try:
+            for rows in self._iter_pages(start_date, end_date, since):
+                for row in rows:
+                    record = dict(zip(names, row))
+                    changed = max(
+                        record["fetched_at"].isoformat(), record["parsed_at"] or ""
+                    )
+                    if changed == since and record["article_id"] in exported_at_since:
+                        continue  # 上次已导出且之后未再变化
+
+                    key = (record["published_at"].strftime("%Y-%m"), record["feed_name"])
+                    buffers.setdefault(key, []).append(record)
+                    buffered += 1
+                    stats.rows += 1
+                    if len(buffers[key]) >= self.row_group_size:
+                        flush(key)
+
+                    if stats.watermark is None or changed > stats.watermark:
+                        stats.watermark = changed
+                        watermark_ids = set()
+                    if changed == stats.watermark:
+                        watermark_ids.add(record["article_id"])
+
+                # 分区很多时控制总缓冲行数：只写出最大的分区，其余继续攒满行组
+                while buffered > self.max_buffered_rows:
+                    flush(max(buffers, key=lambda k: len(buffers[k])))
+
+            for key in list(buffers):
+                flush(key)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        if incremental and stats.watermark:
+            self._save_watermark(stats.watermark, watermark_ids)
+
+        logger.info(
+            f"[export] 导出 {stats.rows} 行到 {len(stats.files)} 个文件, 水位: {stats.watermark}"
+        )
+        return stats
+
+    # ============ 合并 ============
+
+    def compact(self) -> CompactStats:
+        """按分区合并 part 文件，每篇文章只保留最新版本
+
+        分区内的 part 文件按文件名（运行 ID 时间戳）排序，后者覆盖前者。
+        合并结果先写临时文件再改名，之后才删除旧文件；中途中断最多留下重复版本，
+        重新执行即可。
+        """
+        pa, pq = _require_pyarrow()
+        stats = CompactStats()
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+        for part_dir in sorted(self.output_dir.glob("month=*/feed=*")):
+            parts = sorted(part_dir.glob("part-*.parquet"))
+            if len(parts) < 2:
+                continue
+
+            table = pa.concat_tables(
+                [pq.read_table(p) for p in parts], promote_options="default"
+            )
+            ids = table.column("article_id").to_pylist()
+            latest = {article_id: i for i, article_id in enumerate(ids)}
+            keep = sorted(latest.values(), key=lambda i: ids[i])
+            table = table.take(keep)
+
+            tmp = part_dir / f".part-{run_id}.parquet.tmp"
+            pq.write_table(table, tmp, compression="zstd", row_group_size=self.row_group_size)
+            tmp.rename(part_dir / f"part-{run_id}.parquet")
+            for path in parts:
+                path.unlink()
+
+            stats.partitions += 1
+            stats.files_removed += len(parts)
+            stats.rows_removed += len(ids) - len(keep)
+
+        logger.info(
+            f"[export] 合并 {stats.partitions} 个分区, 删除 {stats.files_removed} 个文件, "
+            f"去除 {stats.rows_removed} 行旧版本"
+        )
+        return stats
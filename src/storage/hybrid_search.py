@@ -0,0 +1,152 @@
+"""
+混合检索 - BM25 关键词 + 向量语义，倒数排名融合（RRF）
+
+纯向量检索对产品名、公司名等精确实体匹配较弱；关键词检索恰好互补。
+两路查询并行执行，按 article_id 去重后用 RRF 融合：
+
+    score(d) = Σ 1 / (k + rank_i(d))
+
+延迟预算：超过预算仍未返回的一路被放弃，直接使用已完成一路的结果。
+
+Usage:
+    from src.storage.hybrid_search import HybridRetriever
+
+    retriever = HybridRetriever(db, vector_store)
+    results = retriever.search("DeepSeek 融资", n_results=10)
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import List, Optional
+
+from src.storage.db import Database
+from src.storage.logger import logger
+from src.storage.vector_store import VectorStore
+
+# 两路检索共用的线程池（每次检索 2 个任务）
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+class HybridRetriever:
+    """BM25 + 向量混合检索器"""
+
+    def __init__(
+        self,
+        db: Database,
+        store: VectorStore,
+        rrf_k: int = 60,
+        latency_budget: float = 0.5,
+        candidates: int = 30,
+    ):
+        """
+        Args:
+            db: 数据库（提供 FTS5 关键词检索）
+            store: 向量库
+            rrf_k: RRF 平滑常数
+            latency_budget: 延迟预算（秒），超时后只用已返回的一路
+            candidates: 每一路召回的候选数
+        """
+        self.db = db
+        self.store = store
+        self.rrf_k = rrf_k
+        self.latency_budget = latency_budget
+        self.candidates = candidates
+
+    def _vector_hits(
+        self,
+        query: str,
+        feed_name: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> List[dict]:
+        results = self.store.search(
+            query,
+            n_results=self.candidates,
+            feed_name=feed_name,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return [
+            {
+                "article_id": r["metadata"]["article_id"],
+                "feed_name": r["metadata"].get("feed_name"),
+                "title": r["metadata"].get("title"),
+                "url": r["metadata"].get("url"),
+                "published_at": r["metadata"].get("published_at"),
+                "distance": r["distance"],
+            }
+            for r in results
+        ]
+
+    def _keyword_hits(
+        self,
+        query: str,
+        feed_name: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> List[dict]:
+        return self.db.search_keyword(
+            query,
+            limit=self.candidates,
+            feed_name=feed_name,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 10,
+        feed_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[dict]:
+        """混合检索，返回按 RRF 分数排序、按 article_id 去重的结果
+
+        每条结果包含 article_id / title / url / feed_name / published_at / score，
+        以及 sources（命中的检索路）和各路排名 vector_rank / keyword_rank。
+        """
+        futures = {
+            _executor.submit(self._vector_hits, query, feed_name, start_date, end_date): "vector",
+            _executor.submit(self._keyword_hits, query, feed_name, start_date, end_date): "keyword",
+        }
+
+        done, pending = wait(futures, timeout=self.latency_budget)
+        if not done:
+            # 两路都超出预算：等最先返回的一路
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        for future in pending:
+            future.cancel()
+            logger.debug(f"[HybridRetriever] {futures[future]} 检索超出延迟预算，已跳过")
+
+        fused: dict[int, dict] = {}
+        for future in done:
+            source = futures[future]
+            try:
+                hits = future.result()
+            except Exception as e:
+                logger.warning(f"[HybridRetriever] {source} 检索失败: {e}")
+                continue
+
+            rank = 0
+            for hit in hits:
+                article_id = hit["article_id"]
+                entry = fused.get(article_id)
+                if entry is not None and f"{source}_rank" in entry:
+                    # 同一路内重复命中（如多个片段）只计最靠前的一次
+                    continue
+                rank += 1
+                if entry is None:
+                    entry = fused[article_id] = {
+                        "article_id": article_id,
+                        "feed_name": hit.get("feed_name"),
+                        "title": hit.get("title"),
+                        "url": hit.get("url"),
+                        "published_at": hit.get("published_at"),
+                        "score": 0.0,
+                        "sources": [],
+                    }
+                entry["score"] += 1.0 / (self.rrf_k + rank)
+                entry["sources"].append(source)
+                entry[f"{source}_rank"] = rank
+
+        return sorted(fused.values(), key=lambda e: -e["score"])[:n_results]
@@ -0,0 +1,205 @@
+"""
+ONNX Runtime 嵌入推理 - CPU 上替代 PyTorch fp32 的 SentenceTransformer
+
+首次使用时从 SentenceTransformer 导出 Transformer 主干为 ONNX，可选动态 int8 量化，
+产物缓存在 <onnx_dir>/<模型名>[-int8]/：
+    model.onnx       推理图（输出 last_hidden_state）
+    tokenizer.json   快速分词器
+    meta.json        池化方式 / 是否归一化 / 最大序列长度 / 输入名
+
+池化与归一化在 NumPy 中完成，与原模型的 Pooling / Normalize 模块一致。
+encode 接口与 SentenceTransformer.encode 相同，可直接替换。
+
+依赖（可选）：uv sync --extra onnx
+
+Usage:
+    from src.storage.onnx_embedder import OnnxEmbedder
+
+    embedder = OnnxEmbedder("all-MiniLM-L6-v2", quantize=True)
+    vectors = embedder.encode(["文本一", "文本二"], batch_size=64)
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+from src.storage.logger import logger
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime as ort
+    except ImportError as e:
+        raise RuntimeError("ONNX 嵌入推理需要 onnxruntime，请执行: uv sync --extra onnx") from e
+    return ort
+
+
+def export_onnx(model_name: str, out_dir: Path, quantize: bool = True) -> None:
+    """从 SentenceTransformer 导出 ONNX 模型（需要 torch / sentence-transformers / onnx）"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0]
+    modules = {type(m).__name__: m for m in st}
+
+    pooling = "mean"
+    if "Pooling" in modules:
+        pooling = modules["Pooling"].get_pooling_mode_str()
+        if pooling not in ("mean", "cls", "max"):
+            raise ValueError(f"不支持的池化方式: {pooling}")
+
+    class _Backbone(torch.nn.Module):
+        """只输出 last_hidden_state，便于导出"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(*inputs, return_dict=True).last_hidden_state
+
+    tokenizer = st.tokenizer
+    dummy = tokenizer(["hello world", "导出 ONNX"], padding=True, return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "seq"} for name in input_names + ["last_hidden_state"]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = Path(tmp) / "model.fp32.onnx"
+        with torch.no_grad():
+            torch.onnx.export(
+                _Backbone(transformer.auto_model.eval()),
+                tuple(dummy[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(str(fp32_path), str(out_dir / "model.onnx"), weight_type=QuantType.QInt8)
+        else:
+            shutil.copy(fp32_path, out_dir / "model.onnx")
+
+        tokenizer.save_pretrained(tmp)
+        shutil.copy(Path(tmp) / "tokenizer.json", out_dir / "tokenizer.json")
+
+    meta = {
+        "model": model_name,
+        "pooling": pooling,
+        "normalize": "Normalize" in modules,
+        "max_seq_length": st.max_seq_length,
+        "inputs": input_names,
+        "pad_token_id": tokenizer.pad_token_id or 0,
+        "quantized": quantize,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    logger.info(f"[OnnxEmbedder] 已导出: {out_dir} (pooling={pooling}, int8={quantize})")
+
+
+class OnnxEmbedder:
+    """ONNX Runtime 嵌入模型，encode 接口与 SentenceTransformer 一致"""
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = "data/onnx",
+        quantize: bool = True,
+        threads: Optional[int] = None,
+    ):
+        """
+        Args:
+            model_name: SentenceTransformer 模型名
+            cache_dir: 导出产物目录
+            quantize: 是否使用动态 int8 量化
+            threads: 推理线程数，默认读取 OMP_NUM_THREADS，未设置时由 ONNX Runtime 决定
+        """
+        ort = _require_onnxruntime()
+        from tokenizers import Tokenizer
+
+        suffix = "-int8" if quantize else ""
+        self.dir = Path(cache_dir) / f"{model_name.replace('/', '__')}{suffix}"
+        if not (self.dir / "meta.json").exists():
+            export_onnx(model_name, self.dir, quantize=quantize)
+
+        self.meta = json.loads((self.dir / "meta.json").read_text())
+        self.max_seq_length = self.meta["max_seq_length"]
+
+        self.tokenizer = Tokenizer.from_file(str(self.dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.meta["pad_token_id"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.environ.get("OMP_NUM_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(self.dir / "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        pooling = self.meta["pooling"]
+        if pooling == "cls":
+            return hidden[:, 0]
+        mask = mask[:, :, None].astype(np.float32)
+        if pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        (hidden,) = self.session.run(
+            ["last_hidden_state"], {name: feeds[name] for name in self.meta["inputs"]}
+        )
+        return self._pool(hidden, feeds["attention_mask"])
+
+    def encode(
+        self,
+        sentences: str | List[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """编码文本；单条字符串返回一维向量，列表返回二维矩阵"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        # 按长度排序后分批，减少 padding
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            vectors[idx] = self._encode_batch([texts[i] for i in idx])
+
+        if normalize_embeddings or self.meta["normalize"]:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.clip(norms, 1e-12, None)
+        return vectors[0] if single else vectors
+
+    @property
+    def dimension(self) -> int:
+        """向量维度（由 ONNX 输出形状或一次试编码得到）"""
+        if not hasattr(self, "_dimension"):
+            dim = self.session.get_outputs()[0].shape[-1]
+            self._dimension = dim if isinstance(dim, int) else self._encode_batch(["x"]).shape[1]
+        return self._dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
@@ -0,0 +1,25 @@
+"""
+向量存储后端
+
+通过 vector_db.backend 选择：
+    chroma  - ChromaDB 持久化（默认）
+    numpy   - 进程内 NumPy 内存映射矩阵，支持精确 / IVF / int8 量化检索
+"""
+from src.config import VectorDBConfig
+from .base import BackendRegistry, VectorBackend
+from .chroma import ChromaBackend
+from .numpy_backend import NumpyBackend
+
+
+def create_backend(config: VectorDBConfig) -> VectorBackend:
+    """按配置创建向量后端"""
+    return BackendRegistry.get(config.backend)(config)
+
+
+__all__ = [
+    "BackendRegistry",
+    "ChromaBackend",
+    "NumpyBackend",
+    "VectorBackend",
+    "create_backend",
+]
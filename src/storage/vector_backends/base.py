@@ -0,0 +1,106 @@
+"""
+向量存储后端基类与注册机制
+
+后端接口沿用 Chroma collection 的调用方式与返回结构（ids / documents /
+metadatas / distances 的嵌套列表，where 过滤语法），VectorStore 与具体后端解耦。
+distances 越小越相似。
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from src.config import VectorDBConfig
+
+
+class VectorBackend(ABC):
+    """向量存储后端抽象基类"""
+
+    @abstractmethod
+    def __init__(self, config: VectorDBConfig) -> None:
+        pass
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        """插入或覆盖"""
+
+    @abstractmethod
+    def update(self, ids: list[str], metadatas: list[dict]) -> None:
+        """只更新元数据"""
+
+    @abstractmethod
+    def delete(self, ids: Optional[list[str]] = None, where: Optional[dict] = None) -> None:
+        """按 ID 或过滤条件删除"""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int,
+        where: Optional[dict] = None,
+    ) -> dict[str, Any]:
+        """批量近邻查询，每个查询返回最多 n_results 条"""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[list[str]] = None,
+        where: Optional[dict] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """按 ID / 过滤条件读取（不做相似度排序）"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """向量条数"""
+
+    def compact(self) -> None:
+        """回收已删除向量占用的空间并重建索引（默认无操作）"""
+
+    def needs_compaction(self) -> bool:
+        """是否有已删除但尚未回收的向量（无法廉价判断的后端返回 False）"""
+        return False
+
+    def build_index(self) -> None:
+        """训练或补建近似索引（默认无操作）；由维护任务调用，不在查询路径上执行"""
+
+    def size_bytes(self) -> int:
+        """存储占用字节数"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放资源"""
+
+
+class BackendRegistry:
+    """向量后端注册表"""
+
+    __backends: dict[str, type[VectorBackend]] = {}
+
+    @classmethod
+    def register(cls, name: str):
+        """注册后端"""
+
+        def decorator(backend_cls: type[VectorBackend]) -> type[VectorBackend]:
+            cls.__backends[name] = backend_cls
+            return backend_cls
+
+        return decorator
+
+    @classmethod
+    def get(cls, name: str) -> type[VectorBackend]:
+        """获取后端类"""
+        if name not in cls.__backends:
+            raise ValueError(f"Unknown vector backend: {name}. Available: {list(cls.__backends.keys())}")
+        return cls.__backends[name]
+
+    @classmethod
+    def list(cls) -> list[str]:
+        """列出所有可用后端"""
+        return list(cls.__backends.keys())
@@ -0,0 +1,120 @@
+"""
+ChromaDB 向量后端
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Optional
+
+from src.config import VectorDBConfig
+from src.storage.logger import logger
+from .base import BackendRegistry, VectorBackend
+
+_COPY_BATCH = 1000
+
+
+@BackendRegistry.register("chroma")
+class ChromaBackend(VectorBackend):
+    """ChromaDB 持久化后端"""
+
+    def __init__(self, config: VectorDBConfig) -> None:
+        import chromadb
+        from chromadb.config import Settings
+
+        self.path = Path(config.path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.client = chromadb.PersistentClient(
+            path=str(self.path),
+            settings=Settings(anonymized_telemetry=False),
+        )
+        self._recover_compaction(config.collection)
+        self.collection = self.client.get_or_create_collection(
+            name=config.collection,
+            metadata={"description": "RSS Articles Vector Store"},
+        )
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.upsert(
+            ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+        )
+
+    def update(self, ids, metadatas) -> None:
+        self.collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids: Optional[list[str]] = None, where: Optional[dict] = None) -> None:
+        self.collection.delete(ids=ids, where=where)
+
+    def query(self, query_embeddings, n_results, where=None) -> dict[str, Any]:
+        return self.collection.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where
+        )
+
+    def get(self, ids=None, where=None, limit=None, offset=0, include=None) -> dict[str, Any]:
+        return self.collection.get(
+            ids=ids,
+            where=where,
+            limit=limit,
+            offset=offset,
+            include=include or ["metadatas", "documents"],
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    # ============ 压缩 ============
+
+    def _collection_names(self) -> list[str]:
+        # 不同 chromadb 版本 list_collections 返回名称或 Collection 对象
+        return [getattr(c, "name", c) for c in self.client.list_collections()]
+
+    def _recover_compaction(self, name: str) -> None:
+        """上次压缩在删除旧集合后中断：把临时集合改回原名"""
+        names = self._collection_names()
+        tmp_name = f"{name}__compact"
+        if tmp_name in names and name not in names:
+            logger.warning(f"[ChromaBackend] 恢复中断的压缩: {tmp_name} → {name}")
+            self.client.get_collection(tmp_name).modify(name=name)
+
+    def compact(self) -> None:
+        """复制存活向量到新集合（重建 HNSW 索引），替换旧集合后 VACUUM SQLite"""
+        name = self.collection.name
+        tmp_name = f"{name}__compact"
+        if tmp_name in self._collection_names():
+            self.client.delete_collection(tmp_name)
+        target = self.client.create_collection(name=tmp_name, metadata=self.collection.metadata)
+
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=_COPY_BATCH,
+                offset=offset,
+            )
+            if not len(page["ids"]):
+                break
+            target.add(
+                ids=page["ids"],
+                embeddings=page["embeddings"],
+                documents=page["documents"],
+                metadatas=page["metadatas"],
+            )
+            offset += len(page["ids"])
+
+        self.client.delete_collection(name)
+        target.modify(name=name)
+        self.collection = target
+
+        db_file = self.path / "chroma.sqlite3"
+        if db_file.exists():
+            try:
+                with closing(sqlite3.connect(str(db_file), timeout=30)) as conn:
+                    conn.execute("VACUUM")
+            except sqlite3.Error as e:
+                logger.warning(f"[ChromaBackend] VACUUM 失败: {e}")
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.path.rglob("*") if p.is_file())
+
+    def close(self) -> None:
+        self.client.close()
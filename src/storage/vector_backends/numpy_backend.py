@@ -0,0 +1,634 @@
+"""
+NumPy 进程内向量后端 - 无额外依赖，启动快
+
+存储（目录 <vector_db.path>/<collection>/）：
+    vectors*.f32    归一化后的 float32 向量矩阵，np.memmap 映射（压缩后换新文件名）
+    vectors.i8      可选 int8 量化副本（每行对称缩放），常驻内存用于粗排
+    scales.f32      int8 每行缩放因子
+    ivf.npz         可选 IVF 粗量化器（聚类中心）
+    ivf_assign.i32  IVF 每行所属簇
+    meta.db         SQLite：行号 ↔ ID、文档、元数据 JSON、删除标记
+
+定长行文件（向量、量化副本、簇分配）写入时只改写变化的行、在末尾追加新行。
+
+检索：
+- 精确 top-k：分块向量化点积（余弦相似度，distance = 1 - cos）
+- IVF：只扫描与查询最近的 nprobe 个簇，亚线性
+- int8：先用量化副本粗排 k × rerank 个候选，再用 float32 精排
+- 元数据过滤：元数据按列预先展开为 NumPy 数组，where 条件直接计算成布尔掩码
+
+删除只打标记（墓碑），由 compact() 重写矩阵回收空间。
+IVF 由 build_index() / train_ivf() 训练（brief rag compact），查询时不训练。
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from src.config import VectorDBConfig
+from src.storage.logger import logger
+from .base import BackendRegistry, VectorBackend
+
+_CHUNK_ROWS = 65536
+_Q8_CHUNK_ROWS = 4096
+_SQL_CHUNK = 500
+_ITEMS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "row INTEGER PRIMARY KEY, id TEXT NOT NULL, document TEXT, "
+    "metadata TEXT, alive INTEGER NOT NULL DEFAULT 1)"
+)
+
+
+def _reserve(arr: np.ndarray, size: int, fill) -> np.ndarray:
+    """保证数组长度不小于 size，容量按倍增扩展（追加摊还 O(1)）"""
+    if size <= len(arr):
+        return arr
+    capacity = max(size, 2 * len(arr), 1024)
+    extra = np.full((capacity - len(arr), *arr.shape[1:]), fill, dtype=arr.dtype)
+    return np.concatenate([arr, extra])
+
+
+def _write_rows(path: Path, rows: list[int], data: np.ndarray) -> None:
+    """把 data 各行写入定长行文件中对应的行号（连续行合并为一次写入）"""
+    if not len(rows):
+        return
+    order = np.argsort(rows, kind="stable")
+    rows = np.asarray(rows)[order]
+    data = np.ascontiguousarray(data[order])
+    row_bytes = data.nbytes // len(data)
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        start = 0
+        for end in range(1, len(rows) + 1):
+            if end == len(rows) or rows[end] != rows[end - 1] + 1:
+                f.seek(int(rows[start]) * row_bytes)
+                f.write(data[start:end].tobytes())
+                start = end
+
+
+class _MetadataColumns:
+    """元数据列式索引：数值列 float64（缺失为 NaN），字符串列为 int32 编码（缺失为 -1）"""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.numeric: dict[str, np.ndarray] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        self.vocab: dict[str, dict[str, int]] = {}
+
+    def reserve(self, size: int) -> None:
+        """保证各列至少覆盖 size 行（新行为缺失值）"""
+        if size <= self.size:
+            return
+        for key, arr in self.numeric.items():
+            self.numeric[key] = _reserve(arr, size, np.nan)
+        for key, arr in self.codes.items():
+            self.codes[key] = _reserve(arr, size, -1)
+        self.size = size
+
+    def _capacity(self) -> int:
+        for arr in list(self.numeric.values()) + list(self.codes.values()):
+            return len(arr)
+        return max(self.size, 1024)
+
+    def set(self, row: int, metadata: dict) -> None:
+        self.reserve(row + 1)
+        for arr in self.numeric.values():
+            arr[row] = np.nan
+        for arr in self.codes.values():
+            arr[row] = -1
+        for key, value in metadata.items():
+            if isinstance(value, (bool, int, float)):
+                if key not in self.numeric:
+                    self.numeric[key] = np.full(self._capacity(), np.nan)
+                self.numeric[key][row] = float(value)
+            elif isinstance(value, str):
+                if key not in self.codes:
+                    self.codes[key] = np.full(self._capacity(), -1, dtype=np.int32)
+                    self.vocab[key] = {}
+                vocab = self.vocab[key]
+                code = vocab.setdefault(value, len(vocab))
+                self.codes[key][row] = code
+
+    def mask(self, where: dict, n: int) -> np.ndarray:
+        """将 Chroma 风格的 where 条件计算为长度 n 的布尔掩码"""
+        if "$and" in where:
+            result = np.ones(n, dtype=bool)
+            for cond in where["$and"]:
+                result &= self.mask(cond, n)
+            return result
+        if "$or" in where:
+            result = np.zeros(n, dtype=bool)
+            for cond in where["$or"]:
+                result |= self.mask(cond, n)
+            return result
+
+        result = np.ones(n, dtype=bool)
+        for key, cond in where.items():
+            if not isinstance(cond, dict):
+                cond = {"$eq": cond}
+            for op, value in cond.items():
+                result &= self._compare(key, op, value, n)
+        return result
+
+    def _compare(self, key: str, op: str, value: Any, n: int) -> np.ndarray:
+        values = value if op in ("$in", "$nin") else [value]
+        if all(isinstance(v, str) for v in values):
+            codes = self.codes.get(key)
+            if codes is None:
+                col = np.full(n, -1, dtype=np.int32)
+            else:
+                col = codes[:n]
+            vocab = self.vocab.get(key, {})
+            targets = [vocab.get(v, -2) for v in values]
+            if op == "$eq":
+                return col == targets[0]
+            if op == "$ne":
+                return col != targets[0]
+            if op == "$in":
+                return np.isin(col, targets)
+            if op == "$nin":
+                return ~np.isin(col, targets)
+            raise ValueError(f"字符串字段不支持操作符: {op}")
+
+        numeric = self.numeric.get(key)
+        col = numeric[:n] if numeric is not None else np.full(n, np.nan)
+        with np.errstate(invalid="ignore"):
+            if op == "$eq":
+                return col == value
+            if op == "$ne":
+                return col != value
+            if op == "$gt":
+                return col > value
+            if op == "$gte":
+                return col >= value
+            if op == "$lt":
+                return col < value
+            if op == "$lte":
+                return col <= value
+            if op == "$in":
+                return np.isin(col, values)
+            if op == "$nin":
+                return ~np.isin(col, values)
+        raise ValueError(f"不支持的操作符: {op}")
+
+
+@BackendRegistry.register("numpy")
+class NumpyBackend(VectorBackend):
+    """内存映射 NumPy 矩阵 + 可选 int8 量化 + 可选 IVF"""
+
+    def __init__(self, config: VectorDBConfig) -> None:
+        self.dir = Path(config.path) / config.collection
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.quantize = config.numpy_quantize
+        self.nlist = config.numpy_ivf_nlist
+        self.nprobe = config.numpy_ivf_nprobe
+        self.rerank = config.numpy_rerank
+
+        self._conn = sqlite3.connect(str(self.dir / "meta.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_ITEMS_SCHEMA.format(table="items"))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_id ON items(id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+        meta = dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+        self.dim: Optional[int] = int(meta["dim"]) if "dim" in meta else None
+
+        # 向量文件名记录在 meta 中，压缩时与行号重排在同一事务内切换
+        self.vectors_path = self.dir / meta.get("vectors_file", "vectors.f32")
+        self.vectors_path.touch(exist_ok=True)
+
+        self._load()
+
+    # ============ 加载 ============
+
+    def _load(self) -> None:
+        """从 meta.db 重建内存索引（ID 映射、存活掩码、元数据列）"""
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self._columns = _MetadataColumns()
+        alive: list[bool] = []
+
+        for row, item_id, metadata, is_alive in self._conn.execute(
+            "SELECT row, id, metadata, alive FROM items ORDER BY row"
+        ):
+            self._ids.append(item_id)
+            alive.append(bool(is_alive))
+            if is_alive:
+                self._row_of[item_id] = row
+                self._columns.set(row, json.loads(metadata or "{}"))
+        # 末尾的已删除行没有写入元数据，列长度需覆盖全部行，否则按行号过滤时长度不一致
+        self._columns.reserve(self.rows)
+
+        self._alive_buf = np.array(alive, dtype=bool)
+        self._map_vectors()
+        self._load_quantized()
+        self._load_ivf()
+
+    @property
+    def rows(self) -> int:
+        return len(self._ids)
+
+    @property
+    def _alive(self) -> np.ndarray:
+        return self._alive_buf[: self.rows]
+
+    def _map_vectors(self) -> None:
+        if self.dim is None or self.rows == 0:
+            self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+            return
+        self._vectors = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim)
+        )
+
+    def _load_quantized(self) -> None:
+        self._q8: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        if not self.quantize or self.dim is None:
+            return
+        q_path, s_path = self.dir / "vectors.i8", self.dir / "scales.f32"
+        if q_path.exists() and s_path.exists():
+            q8 = np.fromfile(q_path, dtype=np.int8).reshape(-1, self.dim)
+            scales = np.fromfile(s_path, dtype=np.float32)
+            if len(q8) == self.rows and len(scales) == self.rows:
+                self._q8, self._scales = q8, scales
+                return
+        # 量化副本缺失或与主矩阵不一致：重新生成
+        self._q8, self._scales = self._quantize(np.asarray(self._vectors))
+        self._q8.tofile(q_path)
+        self._scales.tofile(s_path)
+
+    def _load_ivf(self) -> None:
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._lists: Optional[list[np.ndarray]] = None
+        path, assign_path = self.dir / "ivf.npz", self.dir / "ivf_assign.i32"
+        if self.nlist <= 0 or not path.exists():
+            return
+        self._centroids = np.load(path)["centroids"]
+        assign = np.fromfile(assign_path, dtype=np.int32) if assign_path.exists() else None
+        if assign is None or len(assign) != self.rows:
+            # 写入中断导致簇分配缺失：按现有聚类中心重新分配（不重新训练）
+            logger.warning("[NumpyBackend] IVF 簇分配与向量行数不一致，重新分配")
+            assign = self._assign_clusters(self._centroids)
+            assign.tofile(assign_path)
+        self._assign = assign
+
+    def _assign_clusters(self, centroids: np.ndarray) -> np.ndarray:
+        assign = np.empty(self.rows, dtype=np.int32)
+        for start in range(0, self.rows, _CHUNK_ROWS):
+            block = np.asarray(self._vectors[start:start + _CHUNK_ROWS])
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assign
+
+    def _build_lists(self) -> None:
+        assign = self._assign[: self.rows]
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    # ============ 写入 ============
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    @staticmethod
+    def _quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """每行对称 int8 量化"""
+        scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0)
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        q8 = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return q8, scales
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (str(self.dim),)
+            )
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"向量维度不匹配: {vectors.shape[1]} != {self.dim}")
+
+        # 批内去重：同一 ID 以最后一次为准
+        latest = {item_id: i for i, item_id in enumerate(ids)}
+        order = sorted(latest.values())
+
+        updates = [(self._row_of[ids[i]], i) for i in order if ids[i] in self._row_of]
+        inserts = [i for i in order if ids[i] not in self._row_of]
+
+        if updates:
+            with open(self.vectors_path, "r+b") as f:
+                for row, i in updates:
+                    f.seek(row * self.dim * 4)
+                    f.write(vectors[i].tobytes())
+            self._conn.executemany(
+                "UPDATE items SET document = ?, metadata = ? WHERE row = ?",
+                [
+                    (documents[i], json.dumps(metadatas[i], ensure_ascii=False), row)
+                    for row, i in updates
+                ],
+            )
+
+        start = self.rows
+        if inserts:
+            with open(self.vectors_path, "r+b") as f:
+                f.seek(start * self.dim * 4)
+                f.truncate()
+                f.write(vectors[inserts].tobytes())
+            self._conn.executemany(
+                "INSERT INTO items (row, id, document, metadata, alive) VALUES (?, ?, ?, ?, 1)",
+                [
+                    (start + j, ids[i], documents[i], json.dumps(metadatas[i], ensure_ascii=False))
+                    for j, i in enumerate(inserts)
+                ],
+            )
+        self._conn.commit()
+
+        # 更新内存索引
+        for row, i in updates:
+            self._columns.set(row, metadatas[i])
+        for j, i in enumerate(inserts):
+            self._ids.append(ids[i])
+            self._row_of[ids[i]] = start + j
+            self._columns.set(start + j, metadatas[i])
+        self._alive_buf = _reserve(self._alive_buf, self.rows, False)
+        self._alive_buf[start:self.rows] = True
+        self._map_vectors()
+
+        changed_rows = [row for row, _ in updates] + [start + j for j in range(len(inserts))]
+        changed_idx = [i for _, i in updates] + inserts
+        self._update_quantized(changed_rows, vectors[changed_idx])
+        self._update_ivf(changed_rows, vectors[changed_idx])
+
+    def _update_quantized(self, rows: list[int], vectors: np.ndarray) -> None:
+        if not self.quantize:
+            return
+        q8, scales = self._quantize(vectors)
+        if self._q8 is None:
+            self._q8 = np.zeros((0, self.dim), dtype=np.int8)
+            self._scales = np.zeros(0, dtype=np.float32)
+        # 内存副本按倍增预留容量（只按行号访问，长度可大于 rows），文件只写变化的行
+        self._q8 = _reserve(self._q8, self.rows, 0)
+        self._scales = _reserve(self._scales, self.rows, 1.0)
+        self._q8[rows] = q8
+        self._scales[rows] = scales
+        _write_rows(self.dir / "vectors.i8", rows, q8)
+        _write_rows(self.dir / "scales.f32", rows, scales)
+
+    def _update_ivf(self, rows: list[int], vectors: np.ndarray) -> None:
+        if self._centroids is None:
+            return
+        assign = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+        self._assign = _reserve(self._assign, self.rows, 0)
+        self._assign[rows] = assign
+        self._lists = None  # 下次查询时重建倒排表
+        _write_rows(self.dir / "ivf_assign.i32", rows, assign)
+
+    def update(self, ids, metadatas) -> None:
+        pairs = [(self._row_of[i], m) for i, m in zip(ids, metadatas) if i in self._row_of]
+        self._conn.executemany(
+            "UPDATE items SET metadata = ? WHERE row = ?",
+            [(json.dumps(m, ensure_ascii=False), row) for row, m in pairs],
+        )
+        self._conn.commit()
+        for row, metadata in pairs:
+            self._columns.set(row, metadata)
+
+    def delete(self, ids: Optional[list[str]] = None, where: Optional[dict] = None) -> None:
+        rows = [self._row_of[i] for i in (ids or []) if i in self._row_of]
+        if where is not None:
+            rows += np.flatnonzero(self._candidate_mask(where)).tolist()
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        self._conn.executemany("UPDATE items SET alive = 0 WHERE row = ?", [(r,) for r in rows])
+        self._conn.commit()
+        for row in rows:
+            self._row_of.pop(self._ids[row], None)
+        self._alive[rows] = False
+
+    # ============ IVF 训练 ============
+
+    def train_ivf(self, nlist: Optional[int] = None, iterations: int = 10, sample: int = 100_000):
+        """k-means 训练 IVF 粗量化器（球面 k-means，余弦相似度）"""
+        nlist = nlist or self.nlist
+        alive_rows = np.flatnonzero(self._alive)
+        if nlist <= 0 or len(alive_rows) < nlist:
+            return
+
+        rng = np.random.default_rng(0)
+        picked = rng.choice(alive_rows, size=min(sample, len(alive_rows)), replace=False)
+        data = np.asarray(self._vectors[np.sort(picked)])
+        centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = data[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        assign = self._assign_clusters(centroids)
+
+        # 先移除旧聚类中心：中途中断时退化为精确检索，而不是中心与簇分配不匹配
+        ivf_path = self.dir / "ivf.npz"
+        ivf_path.unlink(missing_ok=True)
+        assign.tofile(self.dir / "ivf_assign.i32")
+        np.savez(ivf_path, centroids=centroids)
+
+        self._centroids, self._assign, self._lists = centroids, assign, None
+        logger.info(f"[NumpyBackend] IVF 训练完成: nlist={nlist}, rows={self.rows}")
+
+    def build_index(self) -> None:
+        """数据量足够（每簇约 39 个样本）且尚未训练时训练 IVF"""
+        if self._centroids is None and self.nlist > 0 and self.count() >= self.nlist * 39:
+            self.train_ivf()
+
+    # ============ 压缩 ============
+
+    def compact(self) -> None:
+        """回收已删除行：重写向量矩阵并重排行号，重建量化副本与 IVF"""
+        keep = np.flatnonzero(self._alive)
+        if len(keep) == self.rows:
+            return
+
+        # 1. 存活行写入新文件
+        new_path = self.dir / f"vectors.{int(time.time() * 1000)}.f32"
+        with open(new_path, "wb") as f:
+            for start in range(0, len(keep), _CHUNK_ROWS):
+                block = np.asarray(self._vectors[keep[start:start + _CHUNK_ROWS]])
+                f.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+
+        # 2. 单事务内重排行号并切换向量文件名，中断时保持旧状态
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute("DROP TABLE IF EXISTS items_new")
+            self._conn.execute(_ITEMS_SCHEMA.format(table="items_new"))
+            self._conn.execute(
+                "INSERT INTO items_new (row, id, document, metadata, alive) "
+                "SELECT ROW_NUMBER() OVER (ORDER BY row) - 1, id, document, metadata, 1 "
+                "FROM items WHERE alive = 1"
+            )
+            self._conn.execute("DROP TABLE items")
+            self._conn.execute("ALTER TABLE items_new RENAME TO items")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_id ON items(id)")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('vectors_file', ?)",
+                (new_path.name,),
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            new_path.unlink(missing_ok=True)
+            raise
+
+        # 3. 清理旧文件与派生索引后重新加载
+        old_path, self.vectors_path = self.vectors_path, new_path
+        self._vectors = None
+        old_path.unlink(missing_ok=True)
+        had_ivf = self._centroids is not None
+        for name in ("vectors.i8", "scales.f32", "ivf.npz", "ivf_assign.i32"):
+            (self.dir / name).unlink(missing_ok=True)
+
+        self._load()
+        if had_ivf:
+            self.train_ivf()
+        self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"[NumpyBackend] 压缩完成: {len(keep)} 行")
+
+    def needs_compaction(self) -> bool:
+        return self.count() < self.rows
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.dir.iterdir() if p.is_file())
+
+    # ============ 查询 ============
+
+    def _candidate_mask(self, where: Optional[dict]) -> np.ndarray:
+        mask = self._alive.copy()
+        if where:
+            mask &= self._columns.mask(where, self.rows)
+        return mask
+
+    def _candidate_rows(self, query: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """IVF 可用时只返回最近 nprobe 个簇内的候选行，否则返回全部候选行"""
+        if self._centroids is None:
+            return np.flatnonzero(mask)
+        if self._lists is None:
+            self._build_lists()
+        probes = np.argsort(-(self._centroids @ query))[: self.nprobe]
+        rows = np.concatenate([self._lists[p] for p in probes]) if len(probes) else np.array([])
+        rows = np.sort(rows.astype(np.int64))
+        return rows[mask[rows]]
+
+    @staticmethod
+    def _blocks(rows: np.ndarray, matrix: np.ndarray, chunk: int):
+        """按块遍历候选行，返回 (起始下标, 行号块, 矩阵行)；连续行直接切片，避免花式索引拷贝"""
+        for start in range(0, len(rows), chunk):
+            block = rows[start:start + chunk]
+            if block[-1] - block[0] + 1 == len(block):
+                yield start, block, matrix[block[0]:block[-1] + 1]
+            else:
+                yield start, block, matrix[block]
+
+    def _score(self, rows: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """对候选行打分，返回 top-k (行号, 相似度)"""
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+
+        if self._q8 is not None and len(rows) > k * self.rerank:
+            # int8 粗排：分小块转换为 float32，转换结果留在 CPU 缓存内
+            q_scale = max(np.abs(query).max() / 127.0, 1e-12)
+            q8 = np.rint(query / q_scale).astype(np.float32)
+            approx = np.empty(len(rows), dtype=np.float32)
+            for start, block, rows_view in self._blocks(rows, self._q8, _Q8_CHUNK_ROWS):
+                approx[start:start + len(block)] = (
+                    rows_view.astype(np.float32) @ q8
+                ) * self._scales[block]
+            keep = np.argpartition(-approx, k * self.rerank - 1)[: k * self.rerank]
+            rows = np.sort(rows[keep])
+
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start, block, vectors in self._blocks(rows, self._vectors, _CHUNK_ROWS):
+            scores[start:start + len(block)] = vectors @ query
+
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    def _fetch(self, rows: list[int]) -> dict[int, tuple[str, dict]]:
+        """批量读取文档与元数据"""
+        found: dict[int, tuple[str, dict]] = {}
+        for i in range(0, len(rows), _SQL_CHUNK):
+            chunk = rows[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for row, document, metadata in self._conn.execute(
+                f"SELECT row, document, metadata FROM items WHERE row IN ({placeholders})",
+                chunk,
+            ):
+                found[row] = (document, json.loads(metadata or "{}"))
+        return found
+
+    def query(self, query_embeddings, n_results, where=None) -> dict[str, Any]:
+        results: dict[str, list] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if self.dim is None or self.rows == 0:
+            for _ in query_embeddings:
+                for key in results:
+                    results[key].append([])
+            return results
+
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        mask = self._candidate_mask(where)
+        hits = [self._score(self._candidate_rows(q, mask), q, n_results) for q in queries]
+
+        fetched = self._fetch(sorted({int(r) for rows, _ in hits for r in rows}))
+        for rows, scores in hits:
+            results["ids"].append([self._ids[r] for r in rows])
+            results["documents"].append([fetched[int(r)][0] for r in rows])
+            results["metadatas"].append([fetched[int(r)][1] for r in rows])
+            results["distances"].append([float(1.0 - s) for s in scores])
+        return results
+
+    def get(self, ids=None, where=None, limit=None, offset=0, include=None) -> dict[str, Any]:
+        include = include or ["metadatas", "documents"]
+        mask = self._candidate_mask(where)
+        if ids is not None:
+            wanted = np.zeros(self.rows, dtype=bool)
+            wanted[[self._row_of[i] for i in ids if i in self._row_of]] = True
+            mask &= wanted
+
+        rows = np.flatnonzero(mask)[offset:]
+        if limit is not None:
+            rows = rows[:limit]
+        rows = rows.tolist()
+
+        result: dict[str, Any] = {"ids": [self._ids[r] for r in rows]}
+        if "metadatas" in include or "documents" in include:
+            fetched = self._fetch(rows)
+            if "metadatas" in include:
+                result["metadatas"] = [fetched[r][1] for r in rows]
+            if "documents" in include:
+                result["documents"] = [fetched[r][0] for r in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [np.asarray(self._vectors[r]).tolist() for r in rows]
+        return result
+
+    def count(self) -> int:
+        return int(self._alive.sum())
+
+    def close(self) -> None:
+        self._vectors = None
+        self._conn.close()
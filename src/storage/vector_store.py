@@ -1,141 +1,441 @@
 """
-向量数据库模块 - 基于 ChromaDB 的 RAG 存储
+向量数据库模块 - RAG 存储
+
+底层存储由 vector_db.backend 选择（chroma / numpy），见 src.storage.vector_backends。
 """
+import hashlib
+import json
+import threading
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, List, Optional
 
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from src.config import VectorDBConfig
+from src.storage.chunking import chunk_text
 from src.storage.db import Article
+from src.storage.logger import logger
+from src.storage.vector_backends import create_backend
+
+DateLike = str | datetime
+
+
+def epoch_seconds(dt: datetime) -> int:
+    """转换为 epoch 秒；无时区的时间按 UTC 处理，写入与查询保持一致"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _time_metadata(published_at: datetime) -> dict:
+    """数值型时间元数据，供 Chroma 范围过滤使用"""
+    return {
+        "published_ts": epoch_seconds(published_at),
+        "date_key": int(published_at.strftime("%Y%m%d")),
+    }
+
+
+# 进程内共享的嵌入模型（按模型名 + 推理后端缓存），多个 VectorStore 复用同一实例
+_embedders: dict[str, Any] = {}
+_embedders_lock = threading.Lock()
+
+EMBEDDING_RUNTIMES = ("torch", "onnx", "onnx-int8")
+
+
+def embedder_key(model_name: str, runtime: str = "torch") -> str:
+    """模型标识：不同推理后端的向量有细微差异，缓存时需区分"""
+    return model_name if runtime == "torch" else f"{model_name}@{runtime}"
+
+
+def get_embedder(model_name: str, runtime: str = "torch", onnx_dir: str = "data/onnx"):
+    """获取进程内共享的嵌入模型，首次调用时加载
+
+    Args:
+        model_name: SentenceTransformer 模型名
+        runtime: torch（PyTorch fp32）/ onnx / onnx-int8（ONNX Runtime，动态 int8 量化）
+        onnx_dir: ONNX 导出产物目录
+    """
+    if runtime not in EMBEDDING_RUNTIMES:
+        raise ValueError(
+            f"Unknown embedding runtime: {runtime}. Available: {list(EMBEDDING_RUNTIMES)}"
+        )
+
+    key = embedder_key(model_name, runtime)
+    with _embedders_lock:
+        if key not in _embedders:
+            logger.info(f"[VectorStore] 加载嵌入模型: {model_name} ({runtime})")
+            if runtime == "torch":
+                from sentence_transformers import SentenceTransformer
+
+                _embedders[key] = SentenceTransformer(model_name)
+            else:
+                from src.storage.onnx_embedder import OnnxEmbedder
+
+                _embedders[key] = OnnxEmbedder(
+                    model_name, cache_dir=onnx_dir, quantize=runtime == "onnx-int8"
+                )
+        return _embedders[key]
 
 
 class VectorStore:
-    """ChromaDB 向量存储"""
+    """向量存储"""
 
     def __init__(self, config: VectorDBConfig):
         self.config = config
         self.path = Path(config.path)
         self.path.mkdir(parents=True, exist_ok=True)
 
-        self.client = chromadb.PersistentClient(
-            path=str(self.path),
-            settings=Settings(anonymized_telemetry=False),
-        )
+        self.backend = create_backend(config)
 
-        self.collection = self.client.get_or_create_collection(
-            name=config.collection,
-            metadata={"description": "RSS Articles Vector Store"},
-        )
+        # 嵌入模型延迟到首次编码时加载
+        self._embedder = None
 
-        # 初始化嵌入模型
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        # 可选：持久化嵌入缓存，已嵌入过的文本不再重复编码
+        self.cache = None
+        if config.embedding_cache:
+            from src.storage.embedding_cache import EmbeddingCache
 
-    def add_article(self, article: Article):
-        """添加文章到向量库"""
-        text = f"{article.title}\n\n{article.summary}"
-        embedding = self.embedder.encode(text).tolist()
-
-        self.collection.add(
-            documents=[text],
-            embeddings=[embedding],
-            ids=[f"article_{article.id}"],
-            metadatas=[
-                {
-                    "article_id": article.id,
-                    "feed_name": article.feed_name,
-                    "title": article.title,
-                    "url": article.url,
-                    "published_at": article.published_at.isoformat(),
-                }
-            ],
+            self.cache = EmbeddingCache(config.embedding_cache, dtype=config.embedding_cache_dtype)
+
+    @property
+    def embedder(self):
+        """嵌入模型：优先使用嵌入服务，否则加载进程内共享模型"""
+        if self._embedder is None:
+            socket_path = self.config.embedding_socket
+            if socket_path:
+                from src.storage.embedding_server import RemoteEmbedder
+
+                remote = RemoteEmbedder(socket_path)
+                if remote.ping():
+                    self._embedder = remote
+                    return self._embedder
+                logger.warning(f"[VectorStore] 嵌入服务不可用: {socket_path}，使用本地模型")
+            self._embedder = get_embedder(
+                self.config.embedding_model,
+                self.config.embedding_runtime,
+                self.config.onnx_dir,
+            )
+        return self._embedder
+
+    def _encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """批量编码文档文本，命中缓存的文本直接读取，只对未命中的文本调用模型"""
+        if self.cache is None:
+            return self.embedder.encode(texts, batch_size=batch_size)
+
+        model_name = embedder_key(self.config.embedding_model, self.config.embedding_runtime)
+        keys = [self.cache.key(model_name, t) for t in texts]
+        cached = self.cache.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            encoded = self.embedder.encode([texts[i] for i in missing], batch_size=batch_size)
+            self.cache.put_many([keys[i] for i in missing], encoded)
+            for i, vector in zip(missing, encoded):
+                cached[keys[i]] = vector
+
+        return np.stack([cached[key] for key in keys]).astype(np.float32)
+
+    # ============ 写入 ============
+
+    @staticmethod
+    def _article_text(article: Article) -> str:
+        """用于嵌入的文章文本"""
+        return f"{article.title}\n\n{article.summary}"
+
+    @staticmethod
+    def _article_metadata(article: Article) -> dict:
+        return {
+            "article_id": article.id,
+            "feed_name": article.feed_name,
+            "title": article.title,
+            "url": article.url,
+            "published_at": article.published_at.isoformat(),
+            **_time_metadata(article.published_at),
+        }
+
+    def index_params(self) -> dict:
+        """决定向量内容的索引参数（模型与推理后端、分段参数），与 content_hash 的输入一致"""
+        params: dict = {
+            "model": embedder_key(self.config.embedding_model, self.config.embedding_runtime)
+        }
+        if self.config.max_chunks_per_article > 0:
+            params["chunks"] = [
+                self.config.max_chunks_per_article,
+                self.config.chunk_size,
+                self.config.chunk_overlap,
+            ]
+        return params
+
+    def content_hash(self, article: Article) -> str:
+        """文章索引内容的哈希（嵌入文本 + 源字段 + 模型名与推理后端），变化即需重新索引"""
+        h = hashlib.sha1()
+        model_name = embedder_key(self.config.embedding_model, self.config.embedding_runtime)
+        h.update(model_name.encode("utf-8"))
+        h.update(self._article_text(article).encode("utf-8"))
+        fields = [article.feed_name, article.title, article.url, article.published_at.isoformat()]
+        h.update(json.dumps(fields, ensure_ascii=False).encode("utf-8"))
+        if self.config.max_chunks_per_article > 0:
+            # 启用正文分段后，正文与分段参数变化也需重新索引
+            params = [
+                self.config.max_chunks_per_article,
+                self.config.chunk_size,
+                self.config.chunk_overlap,
+            ]
+            h.update(json.dumps(params).encode("utf-8"))
+            h.update(article.content.encode("utf-8"))
+        return h.hexdigest()
+
+    def _article_chunks(self, article: Article) -> List[str]:
+        """正文分段（未启用或无正文时为空），每段前缀标题以保留上下文"""
+        if self.config.max_chunks_per_article <= 0 or not article.content:
+            return []
+        chunks = chunk_text(
+            article.content,
+            chunk_size=self.config.chunk_size,
+            overlap=self.config.chunk_overlap,
+            max_chunks=self.config.max_chunks_per_article,
         )
+        return [f"{article.title}\n\n{chunk}" for chunk in chunks]
 
-    def add_articles(self, articles: List[Article]):
-        """批量添加文章"""
-        texts = [f"{a.title}\n\n{a.summary}" for a in articles]
-        embeddings = self.embedder.encode(texts).tolist()
-
-        ids = [f"article_{a.id}" for a in articles]
-        metadatas = [
-            {
-                "article_id": a.id,
-                "feed_name": a.feed_name,
-                "title": a.title,
-                "url": a.url,
-                "published_at": a.published_at.isoformat(),
-            }
-            for a in articles
-        ]
+    def add_article(self, article: Article):
+        """添加文章到向量库（已存在则覆盖）"""
+        self.add_articles([article])
 
-        self.collection.add(
+    def add_articles(self, articles: List[Article], batch_size: int = 64):
+        """批量添加文章（已存在则覆盖，可重复执行）
+
+        Args:
+            articles: 文章列表
+            batch_size: 嵌入模型单次前向的批大小
+        """
+        if not articles:
+            return
+
+        ids, texts, metadatas = self.article_records(articles)
+        # 所有文章与片段一起批量编码
+        embeddings = self._encode(texts, batch_size=batch_size)
+        self.write_records(articles, ids, texts, embeddings, metadatas)
+
+    def article_records(self, articles: List[Article]) -> tuple[List[str], List[str], List[dict]]:
+        """展开待写入的向量记录 (ids, texts, metadatas)
+
+        每篇文章一条标题 + 摘要记录；启用正文分段时另有若干片段记录，
+        片段 ID 为 article_<id>#chunk<n>，元数据与文章相同并带 chunk_index。
+        """
+        ids, texts, metadatas = [], [], []
+        for article in articles:
+            metadata = self._article_metadata(article)
+            ids.append(f"article_{article.id}")
+            texts.append(self._article_text(article))
+            metadatas.append(metadata)
+            for i, chunk in enumerate(self._article_chunks(article)):
+                ids.append(f"article_{article.id}#chunk{i}")
+                texts.append(chunk)
+                metadatas.append({**metadata, "chunk_index": i})
+        return ids, texts, metadatas
+
+    def write_records(
+        self,
+        articles: List[Article],
+        ids: List[str],
+        texts: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[dict],
+    ) -> None:
+        """写入已编码的记录（与 article_records 配合使用）"""
+        # 先清除旧片段：正文变短或关闭分段后，多出的旧片段不会被 upsert 覆盖
+        self.backend.delete(
+            where={
+                "$and": [
+                    {"article_id": {"$in": [a.id for a in articles]}},
+                    {"chunk_index": {"$gte": 0}},
+                ]
+            }
+        )
+        self.backend.upsert(
             documents=texts,
-            embeddings=embeddings,
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
             ids=ids,
             metadatas=metadatas,
         )
 
+    # ============ 检索 ============
+
+    @staticmethod
+    def _build_where(
+        feed_name: Optional[str] = None,
+        start_date: DateLike | None = None,
+        end_date: DateLike | None = None,
+    ) -> Optional[dict]:
+        """构造元数据过滤条件：日期窗口走数值字段，可与 feed_name 组合
+
+        纯日期字符串（YYYY-MM-DD）按天比较 date_key，两端均包含；
+        datetime 与带时间的 ISO 字符串（如 2024-05-01T08:00:00）按秒比较 published_ts。
+        """
+        conditions: list[dict] = []
+        if feed_name:
+            conditions.append({"feed_name": {"$eq": feed_name}})
+        for op, value in (("$gte", start_date), ("$lte", end_date)):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                try:
+                    day = date.fromisoformat(value)
+                except ValueError:
+                    value = datetime.fromisoformat(value)
+                else:
+                    conditions.append({"date_key": {op: int(day.strftime("%Y%m%d"))}})
+                    continue
+            conditions.append({"published_ts": {op: epoch_seconds(value)}})
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+
     def search(
-        self, query: str, n_results: int = 5, feed_name: Optional[str] = None
+        self,
+        query: str,
+        n_results: int = 5,
+        feed_name: Optional[str] = None,
+        start_date: DateLike | None = None,
+        end_date: DateLike | None = None,
     ) -> List[dict]:
-        """语义搜索"""
-        embedding = self.embedder.encode(query).tolist()
+        """语义搜索，可选按订阅源和日期窗口过滤
 
-        where = {}
-        if feed_name:
-            where["feed_name"] = feed_name
+        同一文章的多条命中（摘要 + 正文片段）按最相似的一条折叠，
+        返回结果的 document 为命中的片段文本。
+        """
+        embedding = self.embedder.encode(query).tolist()
 
-        results = self.collection.query(
+        results = self.backend.query(
             query_embeddings=[embedding],
-            n_results=n_results,
-            where=where,
+            n_results=self._candidates(n_results),
+            where=self._build_where(feed_name, start_date, end_date),
         )
 
-        return self._format_results(results)
+        return self._collapse(self._format_results(results), n_results)
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filters: Optional[dict] = None,
+        batch_size: int = 64,
+    ) -> List[List[dict]]:
+        """批量语义搜索：一次批量编码 + 一次向量库查询
+
+        Args:
+            queries: 查询文本列表
+            n_results: 每个查询返回的结果数
+            filters: 对所有查询生效的过滤条件，可含 feed_name / start_date / end_date
+            batch_size: 嵌入模型单次前向的批大小
+
+        Returns:
+            与 queries 一一对应的结果列表
+        """
+        if not queries:
+            return []
+
+        embeddings = self.embedder.encode(queries, batch_size=batch_size).tolist()
+        results = self.backend.query(
+            query_embeddings=embeddings,
+            n_results=self._candidates(n_results),
+            where=self._build_where(**(filters or {})),
+        )
+
+        return [
+            self._collapse(self._format_results(results, i), n_results)
+            for i in range(len(queries))
+        ]
+
+    def _candidates(self, n_results: int) -> int:
+        """折叠前的召回数：启用分段时多取候选，保证折叠后仍有 n_results 篇文章"""
+        return n_results * (1 + min(self.config.max_chunks_per_article, 3))
+
+    @staticmethod
+    def _collapse(hits: List[dict], n_results: int) -> List[dict]:
+        """按 article_id 折叠命中（max-sim：保留距离最小的一条）"""
+        best: dict[Any, dict] = {}
+        for hit in hits:
+            key = hit["metadata"].get("article_id", hit["id"])
+            if key not in best or hit["distance"] < best[key]["distance"]:
+                best[key] = hit
+        return sorted(best.values(), key=lambda h: h["distance"])[:n_results]
 
     def search_by_date(
-        self, query: str, start_date: str, end_date: str, n_results: int = 5
+        self,
+        query: str,
+        start_date: DateLike,
+        end_date: DateLike,
+        n_results: int = 5,
+        feed_name: Optional[str] = None,
     ) -> List[dict]:
         """按日期范围搜索"""
-        embedding = self.embedder.encode(query).tolist()
-
-        results = self.collection.query(
-            query_embeddings=[embedding],
+        return self.search(
+            query,
             n_results=n_results,
-            where={
-                "$and": [
-                    {"published_at": {"$gte": start_date}},
-                    {"published_at": {"$lte": end_date}},
-                ]
-            },
+            feed_name=feed_name,
+            start_date=start_date,
+            end_date=end_date,
         )
 
-        return self._format_results(results)
+    def migrate_time_metadata(self, batch_size: int = 1000) -> int:
+        """为旧数据补充 published_ts / date_key 数值元数据，返回更新条数"""
+        updated = 0
+        offset = 0
+        while True:
+            page = self.backend.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+
+            ids, metadatas = [], []
+            for vector_id, metadata in zip(page["ids"], page["metadatas"]):
+                if "published_ts" in metadata or "published_at" not in metadata:
+                    continue
+                published = datetime.fromisoformat(metadata["published_at"])
+                ids.append(vector_id)
+                metadatas.append({**metadata, **_time_metadata(published)})
+
+            if ids:
+                self.backend.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+
+        logger.info(f"[VectorStore] 时间元数据迁移完成: {updated} 条")
+        return updated
+
+    # ============ 管理 ============
 
     def delete_article(self, article_id: int):
-        """删除文章"""
-        self.collection.delete(ids=[f"article_{article_id}"])
+        """删除文章（含正文片段）"""
+        self.backend.delete(where={"article_id": {"$eq": article_id}})
+
+    def delete_articles(self, article_ids: List[int]):
+        """批量删除文章（含正文片段）"""
+        if article_ids:
+            self.backend.delete(where={"article_id": {"$in": list(article_ids)}})
 
     def count(self) -> int:
-        """获取文章数量"""
-        return self.collection.count()
+        """获取向量条数（含正文片段）"""
+        return self.backend.count()
 
-    def _format_results(self, results) -> List[dict]:
-        """格式化搜索结果"""
+    def _format_results(self, results, query_index: int = 0) -> List[dict]:
+        """格式化搜索结果（取第 query_index 个查询的结果）"""
         formatted = []
-        for i in range(len(results["ids"][0])):
+        for i in range(len(results["ids"][query_index])):
             formatted.append(
                 {
-                    "id": results["ids"][0][i],
-                    "document": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i],
+                    "id": results["ids"][query_index][i],
+                    "document": results["documents"][query_index][i],
+                    "metadata": results["metadatas"][query_index][i],
+                    "distance": results["distances"][query_index][i],
                 }
             )
         return formatted
 
     def close(self):
         """关闭连接"""
-        self.client.close()
+        self.backend.close()
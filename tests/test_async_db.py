@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.storage.async_db import AsyncDatabase
+from src.storage.db import Article, Database
+
+
+def make_article(i: int) -> Article:
+    return Article(
+        feed_name="hn",
+        title=f"文章 {i}",
+        url=f"https://example.com/{i}",
+        published_at=datetime(2024, 5, 1),
+        fetched_at=datetime(2024, 5, 1),
+    )
+
+
+def stored_urls(path) -> set[str]:
+    return {a.url for a in Database(str(path)).get_articles(limit=1000)}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "test.db"
+
+
+async def test_concurrent_writes_share_commits(db_path):
+    async with AsyncDatabase(str(db_path), max_delay=0.05) as adb:
+        ids = await asyncio.gather(*(adb.upsert_article(make_article(i)) for i in range(50)))
+
+    assert len(set(ids)) == 50
+    assert adb.writes == 50
+    assert adb.commits < 50
+    assert len(stored_urls(db_path)) == 50
+
+
+async def test_close_flushes_queued_writes(db_path):
+    adb = AsyncDatabase(str(db_path), max_delay=0.05)
+    tasks = [asyncio.ensure_future(adb.upsert_article(make_article(i))) for i in range(20)]
+    await asyncio.sleep(0)  # 写操作已入队，尚未提交
+
+    await adb.close()
+
+    assert all(task.done() for task in tasks)
+    assert len(stored_urls(db_path)) == 20
+
+
+async def test_failed_op_does_not_drop_rest_of_batch(db_path):
+    async with AsyncDatabase(str(db_path), max_delay=0.05) as adb:
+        results = await asyncio.gather(
+            adb.upsert_article(make_article(1)),
+            adb._write(lambda s: s.execute(text("INSERT INTO missing_table VALUES (1)"))),
+            adb.upsert_article(make_article(2)),
+            return_exceptions=True,
+        )
+
+    # 整批失败后逐条重试：出错的操作单独失败，其余照常提交
+    assert isinstance(results[1], OperationalError)
+    assert isinstance(results[0], int) and isinstance(results[2], int)
+    assert stored_urls(db_path) == {"https://example.com/1", "https://example.com/2"}
+    assert Database(str(db_path)).get_article_by_id(results[0]).url == "https://example.com/1"
+
+
+async def test_error_reaches_caller(db_path):
+    def fail(session):
+        raise ValueError("bad write")
+
+    async with AsyncDatabase(str(db_path)) as adb:
+        with pytest.raises(ValueError, match="bad write"):
+            await adb._write(fail)
+        # 写线程仍然可用
+        assert await adb.save_report("daily", "2024-05-01", "内容")
@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from src.storage.backup import SQLiteBackup
+
+
+def make_db(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, body TEXT)")
+    insert(conn, range(500))
+    return conn
+
+
+def insert(conn: sqlite3.Connection, ids) -> None:
+    conn.executemany("INSERT INTO items VALUES (?, ?)", [(i, f"item {i} " * 20) for i in ids])
+
+
+def dump(path) -> list[tuple]:
+    conn = sqlite3.connect(str(path))
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        return conn.execute("SELECT id, body FROM items ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def source(tmp_path):
+    conn = make_db(tmp_path / "source.db")
+    yield tmp_path / "source.db", conn
+    conn.close()
+
+
+def test_full_and_incremental_restore_round_trip(tmp_path, source):
+    db_path, conn = source
+    backup = SQLiteBackup(str(db_path), str(tmp_path / "backups"), step_pages=4, sleep=0)
+
+    full = backup.backup(incremental=True)  # 没有历史快照时自动做完整快照
+    assert full.kind == "full"
+    expected_full = dump(db_path)
+
+    insert(conn, range(500, 520))
+    conn.execute("UPDATE items SET body = 'changed' WHERE id = 3")
+    delta = backup.backup(incremental=True)
+    assert delta.kind == "delta"
+    assert 0 < delta.pages_written < delta.page_count
+    expected_delta = dump(db_path)
+
+    assert dump(backup.restore(str(tmp_path / "latest.db"))) == expected_delta
+    assert dump(backup.restore(str(tmp_path / "first.db"), full.name)) == expected_full
+
+
+def test_restore_after_database_shrinks(tmp_path, source):
+    db_path, conn = source
+    backup = SQLiteBackup(str(db_path), str(tmp_path / "backups"), sleep=0)
+    backup.backup()
+
+    conn.execute("DELETE FROM items WHERE id >= 50")
+    conn.execute("VACUUM")
+    shrunk = backup.backup(incremental=True)
+
+    restored = backup.restore(str(tmp_path / "restored.db"))
+    assert dump(restored) == dump(db_path)
+    # 增量恢复按最新快照的页数截断，不残留缩小前的尾部页
+    page_size = backup.list_snapshots()[-1]["page_size"]
+    assert restored.stat().st_size == shrunk.page_count * page_size
+
+
+def test_restore_refuses_existing_target(tmp_path, source):
+    db_path, _ = source
+    backup = SQLiteBackup(str(db_path), str(tmp_path / "backups"), sleep=0)
+    backup.backup()
+
+    target = tmp_path / "exists.db"
+    target.write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        backup.restore(str(target))
+
+
+def test_restore_without_snapshots(tmp_path, source):
+    db_path, _ = source
+    backup = SQLiteBackup(str(db_path), str(tmp_path / "backups"))
+    with pytest.raises(FileNotFoundError):
+        backup.restore(str(tmp_path / "restored.db"))
@@ -0,0 +1,64 @@
+import pytest
+
+from src.storage.chunking import _hard_split, chunk_text, clean_text, split_sentences
+
+
+def test_split_sentences_mixed_punctuation():
+    text = "第一句。第二句！“第三句？”Pi is 3.14 here. Next one\n换行"
+    assert split_sentences(text) == [
+        "第一句。",
+        "第二句！",
+        "“第三句？”",
+        "Pi is 3.14 here.",
+        "Next one",
+        "换行",
+    ]
+
+
+def test_clean_text_strips_html():
+    assert clean_text("<p>Hello&nbsp;<b>world</b></p>") == "Hello\xa0\nworld"
+
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("") == []
+    assert chunk_text("<p> </p>") == []
+
+
+def test_chunks_respect_size_and_overlap_whole_sentences():
+    sentences = [f"这是第{i}句话。" for i in range(30)]
+    chunks = chunk_text("".join(sentences), chunk_size=40, overlap=10)
+
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert chunks[0].startswith("这是第0句话。")
+    assert chunks[-1].endswith("这是第29句话。")
+    # 相邻片段以整句重叠
+    for prev, nxt in zip(chunks, chunks[1:]):
+        first = split_sentences(nxt)[0]
+        assert prev.endswith(first)
+
+
+def test_max_chunks_keeps_leading_chunks():
+    text = "".join(f"句子{i}。" for i in range(100))
+    full = chunk_text(text, chunk_size=30, overlap=0)
+    assert chunk_text(text, chunk_size=30, overlap=0, max_chunks=2) == full[:2]
+
+
+def test_long_sentence_is_hard_split_with_tail():
+    sentence = "字" * 23
+    pieces = _hard_split(sentence, 10, 3)
+    assert [len(p) for p in pieces] == [10, 10, 9]
+    assert pieces[-1] == sentence[14:]
+
+    chunks = chunk_text("a" * 25, chunk_size=10, overlap=2)
+    assert "".join(c[2:] if i else c for i, c in enumerate(chunks)) == "a" * 25
+
+
+def test_hard_split_never_drops_short_text():
+    assert _hard_split("abc", 2, 5) != []
+    assert "".join(_hard_split("abcdef", 4, 0)) == "abcdef"
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(10, 10), (10, 15), (0, 0), (10, -1)])
+def test_invalid_overlap_is_rejected(chunk_size, overlap):
+    with pytest.raises(ValueError):
+        chunk_text("一些正文。", chunk_size=chunk_size, overlap=overlap)
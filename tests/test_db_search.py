@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from src.storage.db import Article, Database
+
+
+def make_article(i: int, title: str, summary: str = "", feed: str = "hn") -> Article:
+    return Article(
+        feed_name=feed,
+        title=title,
+        url=f"https://example.com/{i}",
+        summary=summary,
+        published_at=datetime(2024, 5, i),
+        fetched_at=datetime(2024, 5, i),
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.upsert_articles([
+        make_article(1, "OpenAI 发布新模型", "GPT 推理能力提升"),
+        make_article(2, "OpenAI 融资", "估值上涨"),
+        make_article(3, "谷歌发布 Gemini", "AI 模型"),
+        make_article(4, "Anthropic 更新", "新模型", feed="other"),
+    ])
+    return db
+
+
+def titles(results: list[dict]) -> set[str]:
+    return {r["title"] for r in results}
+
+
+def test_long_terms_use_fts(db):
+    assert titles(db.search_keyword("OpenAI")) == {"OpenAI 发布新模型", "OpenAI 融资"}
+    assert titles(db.search_keyword("OpenAI Gemini")) == {
+        "OpenAI 发布新模型", "OpenAI 融资", "谷歌发布 Gemini"
+    }
+
+
+def test_short_terms_use_like(db):
+    assert titles(db.search_keyword("模型")) == {
+        "OpenAI 发布新模型", "谷歌发布 Gemini", "Anthropic 更新"
+    }
+
+
+def test_mixed_terms_require_both_conditions(db):
+    assert titles(db.search_keyword("OpenAI 模型")) == {"OpenAI 发布新模型"}
+
+
+def test_filters_apply(db):
+    assert titles(db.search_keyword("模型", feed_name="other")) == {"Anthropic 更新"}
+    assert titles(db.search_keyword("模型", start_date=datetime(2024, 5, 2))) == {
+        "谷歌发布 Gemini", "Anthropic 更新"
+    }
+
+
+def test_fts_is_not_rebuilt_on_reopen(tmp_path, db):
+    # 模拟索引缺失一篇文章：重新打开不全量重建，显式 rebuild_fts 才恢复
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO articles_fts(articles_fts, rowid, title, summary, content) "
+            "SELECT 'delete', id, title, summary, content FROM articles WHERE id = 3"
+        ))
+    reopened = Database(str(tmp_path / "test.db"))
+    assert reopened.search_keyword("Gemini") == []
+
+    reopened.rebuild_fts()
+    assert titles(reopened.search_keyword("Gemini")) == {"谷歌发布 Gemini"}
@@ -0,0 +1,43 @@
+import pytest
+
+from src.config import VectorDBConfig
+from src.services.embedding_backfill import EmbeddingBackfill
+from src.storage.db import Database
+from src.storage.vector_store import VectorStore
+
+
+def make_backfill(tmp_path, **overrides) -> EmbeddingBackfill:
+    config = VectorDBConfig(
+        path=str(tmp_path / "vectors"), collection="test", backend="numpy", **overrides
+    )
+    return EmbeddingBackfill(
+        Database(str(tmp_path / "test.db")),
+        VectorStore(config),
+        checkpoint_path=str(tmp_path / "backfill.json"),
+    )
+
+
+def test_checkpoint_resumes_with_same_index_params(tmp_path):
+    make_backfill(tmp_path)._save_checkpoint(42)
+    assert make_backfill(tmp_path).load_checkpoint() == 42
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"max_chunks_per_article": 2, "embedding_runtime": "onnx-int8"},
+        {"max_chunks_per_article": 4},
+        {"max_chunks_per_article": 2, "chunk_size": 200},
+    ],
+)
+def test_checkpoint_invalidated_by_index_params(tmp_path, overrides):
+    make_backfill(tmp_path, max_chunks_per_article=2)._save_checkpoint(42)
+    # 推理后端或分段参数变化后向量内容不同，需从头回填
+    assert make_backfill(tmp_path, **overrides).load_checkpoint() == 0
+
+
+def test_reset_removes_checkpoint(tmp_path):
+    backfill = make_backfill(tmp_path)
+    backfill._save_checkpoint(7)
+    backfill.reset()
+    assert backfill.load_checkpoint() == 0
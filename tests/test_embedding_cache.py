@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.storage.embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+def vectors_for(texts: list[str]) -> np.ndarray:
+    """每条文本一个确定的向量，便于校验读回的行是否对应"""
+    return np.array(
+        [np.full(DIM, int(t.split("-")[1]), dtype=np.float32) for t in texts], dtype=np.float32
+    )
+
+
+def keys_for(texts: list[str]) -> list[bytes]:
+    return [EmbeddingCache.key("model", t) for t in texts]
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    texts = [f"t-{i}" for i in range(10)]
+    cache.put_many(keys_for(texts), vectors_for(texts))
+
+    found = cache.get_many(keys_for(texts + ["t-99"]))
+
+    assert len(found) == 10
+    assert cache.misses == 1
+    for text, key in zip(texts, keys_for(texts)):
+        np.testing.assert_array_equal(found[key], vectors_for([text])[0])
+    cache.close()
+
+
+def test_put_many_skips_existing_and_duplicate_keys(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    texts = ["t-1", "t-2", "t-1"]
+    cache.put_many(keys_for(texts), vectors_for(texts))
+    cache.put_many(keys_for(["t-2", "t-3"]), vectors_for(["t-2", "t-3"]))
+
+    assert len(cache) == 3
+    assert (tmp_path / "vectors.bin").stat().st_size == 3 * DIM * 2
+    cache.close()
+
+
+def test_put_many_rejects_dimension_mismatch(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(keys_for(["t-1"]), vectors_for(["t-1"]))
+    with pytest.raises(ValueError):
+        cache.put_many([EmbeddingCache.key("model", "x")], np.zeros((1, DIM + 1)))
+    cache.close()
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_concurrent_put_many(tmp_path, shared):
+    """多线程（共用实例或各自实例，后者等同多进程共用目录）并发追加，行号与向量一一对应"""
+    caches = [EmbeddingCache(str(tmp_path))] * 8 if shared else [
+        EmbeddingCache(str(tmp_path)) for _ in range(8)
+    ]
+    # 相邻线程的文本有重叠，同一个键只会写入一次
+    batches = [[f"t-{i}" for i in range(n * 50, n * 50 + 80)] for n in range(8)]
+    errors = []
+
+    def worker(cache: EmbeddingCache, texts: list[str]) -> None:
+        try:
+            for i in range(0, len(texts), 10):
+                chunk = texts[i:i + 10]
+                cache.put_many(keys_for(chunk), vectors_for(chunk))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=args) for args in zip(caches, batches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    all_texts = sorted({t for batch in batches for t in batch})
+    reader = EmbeddingCache(str(tmp_path))
+    assert len(reader) == len(all_texts)
+    assert (tmp_path / "vectors.bin").stat().st_size == len(all_texts) * DIM * 2
+    found = reader.get_many(keys_for(all_texts))
+    for text, key in zip(all_texts, keys_for(all_texts)):
+        np.testing.assert_array_equal(found[key], vectors_for([text])[0])
+
+    reader.close()
+    for cache in set(caches):
+        cache.close()
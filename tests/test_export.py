@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.storage.db import Article, ArticleAnalysis, Database  # noqa: E402
+from src.storage.export import ParquetExporter  # noqa: E402
+
+FETCHED = datetime(2024, 5, 1, 12)
+
+
+def make_article(i: int, feed: str = "hn", fetched_at: datetime = FETCHED) -> Article:
+    return Article(
+        feed_name=feed,
+        title=f"title {i}",
+        url=f"https://example.com/{i}",
+        summary="summary",
+        published_at=datetime(2024, 5, 1),
+        fetched_at=fetched_at,
+    )
+
+
+def read_all(output_dir) -> list[dict]:
+    rows = []
+    for path in sorted(output_dir.glob("month=*/feed=*/part-*.parquet")):
+        rows.extend(pq.read_table(path).to_pylist())
+    return rows
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "test.db"))
+
+
+def test_incremental_export_skips_unchanged_rows(tmp_path, db):
+    db.upsert_articles([make_article(i) for i in range(3)])
+    exporter = ParquetExporter(db, str(tmp_path / "out"))
+
+    assert exporter.export(incremental=True).rows == 3
+    # 水位时刻的行已导出，未变化时不重复导出
+    assert exporter.export(incremental=True).rows == 0
+
+
+def test_incremental_export_rejects_date_window(tmp_path, db):
+    db.upsert_articles([make_article(1)])
+    exporter = ParquetExporter(db, str(tmp_path / "out"))
+
+    with pytest.raises(ValueError):
+        exporter.export(start_date=datetime(2024, 5, 1), incremental=True)
+    # 水位未被推进，之后的增量导出仍包含全部文章
+    assert exporter.load_watermark() is None
+    assert exporter.export(incremental=True).rows == 1
+
+
+def test_incremental_export_keeps_rows_sharing_the_watermark(tmp_path, db):
+    db.upsert_article(make_article(1))
+    exporter = ParquetExporter(db, str(tmp_path / "out"))
+    exporter.export(incremental=True)
+
+    # 新文章的抓取时间与水位相同，不能被严格大于的比较漏掉
+    db.upsert_article(make_article(2))
+    stats = exporter.export(incremental=True)
+    assert stats.rows == 1
+    assert {r["title"] for r in read_all(tmp_path / "out")} == {"title 1", "title 2"}
+
+
+def test_changed_rows_are_appended_and_compacted(tmp_path, db):
+    ids = db.upsert_articles([make_article(i) for i in range(3)])
+    out = tmp_path / "out"
+    exporter = ParquetExporter(db, str(out))
+    exporter.export(incremental=True)
+
+    db.save_analysis(ArticleAnalysis(
+        article_id=ids[0], summary_llm="v1", parsed_at=datetime(2024, 5, 2).isoformat()
+    ))
+    assert exporter.export(incremental=True).rows == 1
+    db.save_analysis(ArticleAnalysis(
+        article_id=ids[0], summary_llm="v2", parsed_at=datetime(2024, 5, 3).isoformat()
+    ))
+    assert exporter.export(incremental=True).rows == 1
+    assert len(read_all(out)) == 5
+
+    stats = exporter.compact()
+    assert stats.partitions == 1
+    assert stats.rows_removed == 2
+    rows = read_all(out)
+    assert [r["article_id"] for r in rows] == sorted(ids)
+    assert rows[0]["summary_llm"] == "v2"
+    assert len(list(out.glob("month=*/feed=*/*.parquet"))) == 1
+
+
+def test_row_groups_are_written_per_full_partition(tmp_path, db):
+    db.upsert_articles([make_article(i, feed="a" if i % 2 else "b") for i in range(50)])
+    exporter = ParquetExporter(
+        db, str(tmp_path / "out"), page_size=7, row_group_size=10, max_buffered_rows=20
+    )
+    stats = exporter.export()
+
+    assert stats.rows == 50
+    for path in stats.files:
+        meta = pq.ParquetFile(path).metadata
+        sizes = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+        assert sizes == [10, 10, 5]
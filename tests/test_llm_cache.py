@@ -0,0 +1,60 @@
+import sqlite3
+
+from src.models.llm.cache import LLMCache
+
+
+def total_by_scan(path) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def test_put_get_and_overwrite(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"))
+    key = LLMCache.key("deepseek", "deepseek-chat", "sys", "user")
+    assert cache.get(key) is None
+
+    cache.put(key, "first")
+    cache.put(key, "second answer")
+    assert cache.get(key) == "second answer"
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == len("second answer")
+
+
+def test_running_total_matches_table(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(path, max_bytes=10_000)
+    for i in range(200):
+        cache.put(f"k{i % 120}", "x" * (50 + i))
+    cache.clear()
+    cache.put("k", "abc")
+
+    assert cache.stats()["bytes"] == total_by_scan(path) == 3
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(path, max_bytes=1000)
+    for i in range(9):
+        cache.put(f"k{i}", "x" * 100)
+    cache.get("k0")
+    cache.put("k9", "x" * 200)
+
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    assert cache.stats()["bytes"] == total_by_scan(path) <= 1000
+
+
+def test_total_is_initialised_for_existing_databases(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE responses (key TEXT PRIMARY KEY, provider TEXT, model TEXT, "
+            "response TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO responses VALUES ('a', '', '', 'abcd', 4, 0, 0)")
+
+    cache = LLMCache(path, ttl=0)
+    assert cache.stats()["bytes"] == 4
+    cache.put("b", "xy")
+    assert cache.stats()["bytes"] == 6
@@ -0,0 +1,46 @@
+import pytest
+
+from src.config import LLMRouterConfig
+from src.models.llm.cache import LLMCache
+from src.models.llm.manager import DeepSeekProvider, LLMManager, ModelScopeProvider
+from src.models.llm.router import LLMRouter
+from src.models.llm.stub_server import StubConfig, start_stub
+
+
+@pytest.fixture
+def server():
+    server = start_stub(StubConfig(port=0, latency="const:0.01", tps=0, seed=0))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_llm(tmp_path, primary_url: str, backup_url: str) -> LLMManager:
+    llm = LLMManager("deepseek", cache=False, base_url=backup_url)
+    llm.ledger = None
+    llm.provider = DeepSeekProvider(api_key="stub", base_url=primary_url)
+    llm.router = LLMRouter(
+        [llm.provider, ModelScopeProvider(api_key="stub", base_url=backup_url)],
+        LLMRouterConfig(backoff_base=0, hedge=False),
+    )
+    llm.cache = LLMCache(str(tmp_path / "cache.db"))
+    return llm
+
+
+async def test_failover_answer_is_not_cached_under_primary_key(tmp_path, server):
+    # 主 provider 指向未监听的端口，由备用 provider 应答
+    llm = make_llm(tmp_path, "http://127.0.0.1:9/v1", server.base_url)
+
+    assert await llm.acomplete("system", "故障转移")
+    assert llm.router.failovers == 1
+    assert llm.cache.stats()["entries"] == 0
+
+
+def test_primary_answer_is_cached(tmp_path, server):
+    llm = make_llm(tmp_path, server.base_url, server.base_url)
+
+    text = llm.complete("system", "主 provider")
+
+    assert llm.cache.stats()["entries"] == 1
+    assert llm.complete("system", "主 provider") == text
+    assert server.stats()["requests"] == 1
@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+
+from src.config import VectorDBConfig
+from src.storage.vector_backends.numpy_backend import NumpyBackend, _reserve
+
+DIM = 32
+
+
+def make_config(path, **overrides) -> VectorDBConfig:
+    return VectorDBConfig(path=str(path), collection="test", backend="numpy", **overrides)
+
+
+def random_vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def upsert(backend: NumpyBackend, vectors: np.ndarray, offset: int = 0, **metadata) -> list[str]:
+    ids = [f"v{offset + i}" for i in range(len(vectors))]
+    backend.upsert(
+        ids,
+        vectors.tolist(),
+        [f"doc {i}" for i in ids],
+        [{"n": offset + i, "parity": "even" if (offset + i) % 2 == 0 else "odd", **metadata}
+         for i in range(len(vectors))],
+    )
+    return ids
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = NumpyBackend(make_config(tmp_path))
+    yield backend
+    backend.close()
+
+
+def test_upsert_and_query_returns_nearest(backend):
+    vectors = random_vectors(200)
+    upsert(backend, vectors)
+
+    result = backend.query(vectors[[5, 17]].tolist(), n_results=3)
+
+    assert [ids[0] for ids in result["ids"]] == ["v5", "v17"]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert result["documents"][0][0] == "doc v5"
+    assert result["metadatas"][1][0]["n"] == 17
+
+
+def test_upsert_existing_id_overwrites(backend):
+    vectors = random_vectors(50)
+    upsert(backend, vectors)
+
+    replacement = random_vectors(1, seed=1)
+    backend.upsert(["v3"], replacement.tolist(), ["new"], [{"n": -1}])
+
+    assert backend.count() == 50
+    result = backend.query(replacement.tolist(), n_results=1)
+    assert result["ids"][0] == ["v3"]
+    assert result["documents"][0] == ["new"]
+    assert backend.get(ids=["v3"])["metadatas"] == [{"n": -1}]
+
+
+def test_delete_by_id_and_where_then_compact(tmp_path):
+    backend = NumpyBackend(make_config(tmp_path))
+    vectors = random_vectors(100)
+    upsert(backend, vectors)
+
+    backend.delete(ids=["v0", "v1"])
+    backend.delete(where={"n": {"$gte": 90}})
+    assert backend.count() == 88
+    assert backend.query(vectors[[0]].tolist(), n_results=1)["ids"][0] != ["v0"]
+
+    backend.compact()
+    assert backend.rows == 88
+    assert backend.query(vectors[[50]].tolist(), n_results=1)["ids"][0] == ["v50"]
+    backend.close()
+
+    reopened = NumpyBackend(make_config(tmp_path))
+    assert reopened.count() == 88
+    assert reopened.query(vectors[[50]].tolist(), n_results=1)["ids"][0] == ["v50"]
+    reopened.close()
+
+
+def test_metadata_filters(backend):
+    vectors = random_vectors(100)
+    upsert(backend, vectors)
+
+    result = backend.query(
+        vectors[[10]].tolist(),
+        n_results=100,
+        where={"$and": [{"parity": "odd"}, {"n": {"$lt": 20}}]},
+    )
+    assert sorted(result["ids"][0]) == sorted(f"v{i}" for i in range(1, 20, 2))
+
+    got = backend.get(where={"parity": {"$in": ["even"]}, "n": {"$gte": 96}})
+    assert got["ids"] == ["v96", "v98"]
+    assert backend.get(where={"parity": "missing"})["ids"] == []
+
+
+def test_many_small_upserts_grow_columns_geometrically(backend):
+    vectors = random_vectors(3000)
+    for i in range(len(vectors)):
+        upsert(backend, vectors[i:i + 1], offset=i)
+
+    column = backend._columns.numeric["n"]
+    assert len(column) < 4 * backend.rows
+    assert backend.get(where={"n": {"$gte": 2998}})["ids"] == ["v2998", "v2999"]
+
+
+def test_reserve_doubles_capacity():
+    arr = np.zeros(1024)
+    grown = _reserve(arr, 1025, np.nan)
+    assert len(grown) == 2048
+    assert np.isnan(grown[1024:]).all()
+    assert _reserve(grown, 2000, np.nan) is grown
+
+
+def test_quantized_recall(tmp_path):
+    backend = NumpyBackend(make_config(tmp_path, numpy_quantize=True, numpy_rerank=4))
+    exact = NumpyBackend(make_config(tmp_path / "exact"))
+    vectors = random_vectors(2000)
+    upsert(backend, vectors[:1000])
+    upsert(backend, vectors[1000:], offset=1000)
+    upsert(exact, vectors)
+
+    queries = random_vectors(20, seed=2).tolist()
+    approx_ids = backend.query(queries, n_results=10)["ids"]
+    exact_ids = exact.query(queries, n_results=10)["ids"]
+    recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx_ids, exact_ids)])
+    assert recall >= 0.9
+
+    # 量化副本按行增量写入，重新打开时与主矩阵一致，无需重新生成
+    assert (tmp_path / "test" / "vectors.i8").stat().st_size == 2000 * DIM
+    backend.close()
+    reopened = NumpyBackend(make_config(tmp_path, numpy_quantize=True))
+    assert len(reopened._scales) == 2000
+    reopened.close()
+    exact.close()
+
+
+def test_ivf_is_trained_by_build_index_not_query(tmp_path):
+    config = make_config(tmp_path, numpy_ivf_nlist=4, numpy_ivf_nprobe=4)
+    backend = NumpyBackend(config)
+    vectors = random_vectors(400)
+    upsert(backend, vectors[:300])
+
+    backend.query(vectors[[0]].tolist(), n_results=5)
+    assert backend._centroids is None
+
+    backend.build_index()
+    assert backend._centroids is not None
+
+    # 训练后的新增行写入簇分配，nprobe 覆盖全部簇时结果与精确检索一致
+    upsert(backend, vectors[300:], offset=300)
+    assert backend.query(vectors[[350]].tolist(), n_results=1)["ids"][0] == ["v350"]
+    backend.close()
+
+    reopened = NumpyBackend(config)
+    assert reopened._centroids is not None
+    assert len(reopened._assign) == 400
+    assert reopened.query(vectors[[399]].tolist(), n_results=1)["ids"][0] == ["v399"]
+    reopened.close()
+
+
+def test_reopen_after_trailing_delete_supports_filters(tmp_path):
+    backend = NumpyBackend(make_config(tmp_path))
+    upsert(backend, random_vectors(3000))
+    backend.delete(where={"n": {"$gte": 2000}})
+    backend.close()
+
+    # 末尾 1000 行已删除，重新加载后元数据列仍需覆盖全部行
+    reopened = NumpyBackend(make_config(tmp_path))
+    assert reopened.get(where={"n": {"$gte": 1998}})["ids"] == ["v1998", "v1999"]
+    query = random_vectors(1, seed=3).tolist()
+    result = reopened.query(query, n_results=5, where={"parity": "odd"})
+    assert all(int(i[1:]) % 2 == 1 for i in result["ids"][0])
+    reopened.delete(where={"parity": "even"})
+    assert reopened.count() == 1000
+    reopened.close()
@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.models.llm.tokens import PromptBudget, TokenCounter
+from src.storage.db import Article, Database
+
+parser = pytest.importorskip("src.agents.article_parser_langgraph")
+
+VALID = {"summary": "摘要", "keywords": ["AI"], "category": "科技", "sentiment": "positive"}
+
+
+class FakeLLM:
+    """按固定响应回复的 LLM，记录收到的打包提示词"""
+
+    def __init__(self, response: str):
+        self.response = response
+        self.prompts: list[str] = []
+
+    def budget(self, output_tokens: int = 1024, max_input_tokens: int | None = None):
+        return PromptBudget(TokenCounter(), 32000, output_tokens, max_input_tokens)
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, json_mode: bool = False):
+        self.prompts.append(user_prompt)
+        return self.response
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "test.db"))
+    db.upsert_articles([
+        Article(
+            feed_name="hn",
+            title=f"文章 {i}",
+            url=f"https://example.com/{i}",
+            content="正文" * 20,
+            published_at=datetime(2024, 5, i),
+            fetched_at=datetime(2024, 5, i),
+        )
+        for i in (1, 2, 3)
+    ])
+    monkeypatch.setattr(parser, "get_db", lambda: db)
+    return db
+
+
+def test_parse_pack_response_validates_items():
+    response = json.dumps(
+        {"1": VALID, "2": {**VALID, "summary": ""}, "3": {**VALID, "category": "?"}}
+    )
+    results = parser._parse_pack_response(response, [1, 2, 3, 4])
+    assert set(results) == {1, 3}
+    assert results[3]["category"] == "其他"
+
+    listed = json.dumps([{"id": 5, **VALID}])
+    assert set(parser._parse_pack_response(f"```json\n{listed}\n```", [5])) == {5}
+    assert parser._parse_pack_response("not json", [1]) == {}
+
+
+def test_parse_packed_falls_back_to_single_parse(db, monkeypatch):
+    llm = FakeLLM(json.dumps({"1": VALID, "2": {"summary": "缺少关键词"}}))
+    monkeypatch.setattr(parser, "get_llm", lambda: llm)
+    fallback: list[int] = []
+
+    def parse_batch(ids):
+        fallback.extend(ids)
+        return [{"article_id": i, "status": "completed"} for i in ids]
+
+    monkeypatch.setattr(parser, "parse_batch", parse_batch)
+
+    results = parser.parse_packed([1, 2, 3, 99])
+
+    assert len(llm.prompts) == 1
+    assert [r["status"] for r in results] == ["completed", "completed", "completed", "failed"]
+    # 未通过校验与响应中缺失的文章回退到单篇解析，合格的直接写入
+    assert fallback == [2, 3]
+    assert db.get_analysis_by_article_id(1).summary_llm == "摘要"
+    assert db.get_analysis_by_article_id(2) is None
+
+
+def test_parse_packed_failed_call_falls_back(db, monkeypatch):
+    class FailingLLM(FakeLLM):
+        async def acomplete(self, *args, **kwargs):
+            raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(parser, "get_llm", lambda: FailingLLM(""))
+    fallback: list[int] = []
+    monkeypatch.setattr(
+        parser,
+        "parse_batch",
+        lambda ids: fallback.extend(ids) or [{"article_id": i, "status": "failed"} for i in ids],
+    )
+
+    results = parser.parse_packed([1, 2, 3])
+
+    assert fallback == [1, 2, 3]
+    assert [r["article_id"] for r in results] == [1, 2, 3]
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from src.models.llm.rate_limit import (
+    LATENCY_MIN_SAMPLES,
+    RateLimiter,
+    TokenBucket,
+    get_limiter,
+    parse_retry_after,
+)
+
+
+def test_additive_increase_and_multiplicative_decrease():
+    limiter = RateLimiter("test-aimd", max_concurrency=8)
+    started = limiter.acquire()
+    limiter.release(started, throttled=True, retry_after=0)
+    assert limiter.stats()["limit"] == 4
+
+    # 每个成功 +1/limit：约一个窗口（limit 个成功）+1，不超过上限
+    for _ in range(5):
+        limiter.release(limiter.acquire(), latency=0.1)
+    assert limiter.stats()["limit"] == 5
+    for _ in range(200):
+        limiter.release(limiter.acquire(), latency=0.1)
+    assert limiter.stats()["limit"] == 8
+
+
+def test_signals_from_before_last_decrease_are_ignored():
+    limiter = RateLimiter("test-burst", max_concurrency=16)
+    wave = [limiter.acquire() for _ in range(8)]
+    for started in wave:
+        limiter.release(started, throttled=True, retry_after=0)
+    # 同一波 429 只减半一次
+    assert limiter.stats()["limit"] == 8
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_latency_spike_decreases_after_baseline():
+    limiter = RateLimiter("test-latency", max_concurrency=16)
+    for _ in range(LATENCY_MIN_SAMPLES):
+        limiter.release(limiter.acquire(), latency=0.1)
+    limiter.release(limiter.acquire(), latency=1.0)
+    assert limiter.stats()["decreases"] == 1
+    assert limiter.stats()["limit"] == 8
+
+
+def test_retry_after_blocks_new_requests():
+    limiter = RateLimiter("test-block", max_concurrency=4)
+    limiter.release(limiter.acquire(), throttled=True, retry_after=0.2)
+    start = time.monotonic()
+    limiter.release(limiter.acquire())
+    assert time.monotonic() - start >= 0.15
+
+
+def test_concurrency_limit_blocks_until_release():
+    limiter = RateLimiter("test-slots", max_concurrency=2)
+
+    async def run() -> int:
+        peak = 0
+
+        async def call() -> None:
+            nonlocal peak
+            started = await limiter.aacquire()
+            peak = max(peak, limiter.inflight)
+            await asyncio.sleep(0.01)
+            limiter.release(started, latency=0.01)
+
+        await asyncio.gather(*(call() for _ in range(10)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)  # 每秒 1 个
+    now = time.monotonic()
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(2, now) == pytest.approx(2.0)
+
+
+def test_get_limiter_updates_existing_config():
+    first = get_limiter("test-shared", rpm=100, max_concurrency=8)
+    second = get_limiter("test-shared", rpm=10, tpm=1000, max_concurrency=2)
+    assert second is first
+    assert first.requests.capacity == 10
+    assert first.tokens.capacity == 1000
+    assert first.stats()["limit"] == 2
+
+    get_limiter("test-shared", rpm=0, tpm=0, max_concurrency=2)
+    assert first.requests is None and first.tokens is None
+
+
+def test_get_limiter_without_limits_keeps_existing_config():
+    configured = get_limiter("test-keep", rpm=100, tpm=5000, max_concurrency=4)
+    # 按默认值创建的 provider（环境变量 / 备用 provider）不覆盖已配置的配额
+    assert get_limiter("test-keep") is configured
+    assert configured.requests.capacity == 100
+    assert configured.tokens.capacity == 5000
+    assert configured.stats()["limit"] == 4
+
+    get_limiter("test-keep", rpm=50)
+    assert configured.requests.capacity == 50
+    assert configured.tokens.capacity == 5000
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"retry-after": "1.5"}) == 1.5
+    assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+    assert parse_retry_after({}) is None
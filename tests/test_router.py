@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from src.config import LLMRouterConfig
+from src.models.llm import router as router_module
+from src.models.llm.manager import DeepSeekProvider, ModelScopeProvider
+from src.models.llm.router import LLMRouter, get_histogram
+from src.models.llm.stub_server import StubConfig, start_stub
+
+
+@pytest.fixture(autouse=True)
+def fresh_histograms(monkeypatch):
+    monkeypatch.setattr(router_module, "_histograms", {})
+
+
+@pytest.fixture
+def make_stub():
+    servers = []
+
+    def make(**overrides):
+        fields = {"port": 0, "latency": "const:0.01", "tps": 0, "seed": 0}
+        server = start_stub(StubConfig(**{**fields, **overrides}))
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_router(primary_url: str, backup_url: str | None = None, **config) -> LLMRouter:
+    providers = [DeepSeekProvider(api_key="stub", base_url=primary_url)]
+    if backup_url:
+        providers.append(ModelScopeProvider(api_key="stub", base_url=backup_url))
+    return LLMRouter(providers, LLMRouterConfig(backoff_base=0, **config))
+
+
+async def test_failover_to_backup_provider(make_stub):
+    backup = make_stub()
+    # 主 provider 指向未监听的端口，连接失败后由下一个 provider 重试
+    router = make_router("http://127.0.0.1:9/v1", backup.base_url, hedge=False)
+
+    text = await router.acomplete("system", "你好")
+
+    assert text
+    assert router.failovers == 1
+    assert backup.stats()["requests"] == 1
+
+
+async def test_hedge_to_backup_when_primary_is_slow(make_stub):
+    slow, fast = make_stub(latency="const:2.0"), make_stub()
+    router = make_router(
+        slow.base_url, fast.base_url, hedge_min_samples=5, hedge_min_delay=0.1, hedge_budget=1.0
+    )
+    for _ in range(5):
+        get_histogram("deepseek").observe(0.05)
+
+    start = time.monotonic()
+    text = await router.acomplete("system", "你好")
+
+    assert text
+    assert time.monotonic() - start < 1.5
+    assert router.hedged == 1
+    assert router.hedge_wins == 1
+
+
+async def test_no_hedge_without_latency_samples(make_stub):
+    router = make_router(make_stub().base_url, make_stub().base_url, hedge_min_samples=5)
+
+    await router.acomplete("system", "你好")
+
+    assert router.hedged == 0
+    # 直方图由 provider 记录上游调用耗时
+    assert get_histogram("deepseek").samples == 1
+
+
+async def test_router_owns_retries(make_stub):
+    server = make_stub(rate_limit=1.0, retry_after=0.01)
+    router = make_router(server.base_url, max_attempts=2, hedge=False)
+
+    assert router.providers[0].max_retries == 0
+    with pytest.raises(Exception):
+        await router.acomplete("system", "你好")
+    # 只有路由的 2 次尝试，provider 不再各自重试
+    assert server.stats()["requests"] == 2
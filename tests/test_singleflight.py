@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.models.llm.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flight.ado("k", fetch) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.stats() == {"calls": 1, "saved": 4, "inflight": 0}
+
+
+async def test_different_keys_are_not_merged():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        flight.ado("a", lambda: fetch(1)), flight.ado("b", lambda: fetch(2))
+    )
+
+    assert results == [1, 2]
+    assert flight.stats()["calls"] == 2
+
+
+async def test_waiters_share_the_leader_exception():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *(flight.ado("k", fail) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def succeed():
+        return "again"
+
+    # 失败后 key 已释放，下一次调用重新发出
+    assert await flight.ado("k", succeed) == "again"
+    assert flight.stats()["calls"] == 2
+
+
+async def test_cancelled_leader_keeps_call_for_waiters():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    leader = asyncio.ensure_future(flight.ado("k", fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flight.ado("k", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await waiter == "result"
+    assert calls == 1
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_cancelled_leader_without_waiters_cancels_upstream():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    leader = asyncio.ensure_future(flight.ado("k", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert flight.stats()["inflight"] == 0
+
+
+def test_threads_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def fetch():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    leader.start()
+    started.wait()
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", fetch))) for _ in range(3)
+    ]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["result"] * 4
+    assert calls == 1
+
+
+async def test_async_caller_joins_sync_call():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.1)
+        return "sync"
+
+    thread = threading.Thread(target=flight.do, args=("k", slow))
+    thread.start()
+    started.wait()
+
+    async def never():
+        raise AssertionError("should join the in-flight call")
+
+    assert await flight.ado("k", never) == "sync"
+    thread.join()
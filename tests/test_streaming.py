@@ -0,0 +1,61 @@
+import pytest
+
+from src.models.llm.streaming import SSEDecoder, ThinkFilter, aiter_sse, iter_sse
+
+
+def filter_chunks(chunks: list[str]) -> str:
+    think = ThinkFilter()
+    return "".join(think.feed(chunk) for chunk in chunks) + think.flush()
+
+
+def split_every(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_sse_multiline_events_and_comments():
+    lines = [": ping", "data: {\"a\": 1}", "", "event: delta", "data: line1", "data:line2", ""]
+    assert list(iter_sse(lines)) == ['{"a": 1}', "line1\nline2"]
+
+
+def test_sse_flushes_last_event_without_blank_line():
+    decoder = SSEDecoder()
+    assert decoder.feed("data: [DONE]") == []
+    assert decoder.flush() == ["[DONE]"]
+    assert decoder.flush() == []
+
+
+async def test_aiter_sse_matches_iter_sse():
+    lines = ["data: 1", "", "data: 2"]
+
+    async def source():
+        for line in lines:
+            yield line
+
+    assert [event async for event in aiter_sse(source())] == list(iter_sse(lines))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 100])
+def test_think_filter_tags_split_across_chunks(size):
+    text = "<think>先分析一下\n</think>\n\n答案是 42。"
+    assert filter_chunks(split_every(text, size)) == "答案是 42。"
+
+
+@pytest.mark.parametrize("size", [1, 4, 100])
+def test_think_filter_keeps_text_around_blocks(size):
+    text = "前言 <think>推理</think>正文 <thi 不是标签"
+    assert filter_chunks(split_every(text, size)) == "前言 正文 <thi 不是标签"
+
+
+def test_think_filter_holds_back_partial_tag():
+    think = ThinkFilter()
+    assert think.feed("结论<th") == "结论"
+    assert think.feed("ink>隐藏</thi") == ""
+    assert think.feed("nk>可见") == "可见"
+
+
+def test_think_filter_drops_unclosed_block():
+    assert filter_chunks(["答案", "<think>未闭合的推理"]) == "答案"
+
+
+def test_think_filter_strips_leading_whitespace_only():
+    assert filter_chunks(["  ", "\n", "你好 ", " 世界"]) == "你好  世界"
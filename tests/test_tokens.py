@@ -0,0 +1,64 @@
+import pytest
+
+from src.models.llm.tokens import PromptBudget, Section, TokenCounter
+
+
+@pytest.fixture
+def budget():
+    return PromptBudget(TokenCounter("deepseek-chat"), context_window=4000, output_tokens=1000)
+
+
+def test_truncate_stays_within_limit():
+    counter = TokenCounter("deepseek-chat")
+    text = "大模型推理服务 latency benchmark " * 50
+    for limit in (1, 10, 57, 200):
+        assert counter.count(counter.truncate(text, limit)) <= limit
+    assert counter.truncate(text, counter.count(text)) == text
+    assert counter.truncate(text, 0) == ""
+
+
+def test_allocate_keeps_sections_that_fit(budget):
+    sections = [Section("title", "标题"), Section("body", "正文内容")]
+    assert budget.allocate(sections, 1000) == {"title": "标题", "body": "正文内容"}
+
+
+def test_allocate_water_fills_within_tier(budget):
+    counter = budget.counter
+    short, long_a, long_b = "短" * 10, "长" * 2000, "文" * 2000
+    sections = [Section("a", long_a), Section("short", short), Section("b", long_b)]
+
+    result = budget.allocate(sections, 300)
+
+    # 需求小的段拿满，余量在两个长段之间平分
+    assert result["short"] == short
+    used = {key: counter.count(text) for key, text in result.items()}
+    assert sum(used.values()) <= 300
+    assert abs(used["a"] - used["b"]) <= 2
+    assert used["a"] > 100
+
+
+def test_allocate_serves_higher_priority_first(budget):
+    counter = budget.counter
+    sections = [
+        Section("comments", "评" * 1000, priority=1),
+        Section("body", "正" * 1000, priority=0),
+    ]
+
+    result = budget.allocate(sections, counter.count("正" * 1000))
+
+    assert result["body"] == "正" * 1000
+    assert result["comments"] == ""
+
+
+def test_allocate_zero_budget(budget):
+    assert budget.allocate([Section("a", "内容")], 0) == {"a": ""}
+
+
+def test_fit_respects_fixed_text_and_input_cap():
+    counter = TokenCounter("deepseek-chat")
+    budget = PromptBudget(counter, context_window=4000, output_tokens=1000, max_input_tokens=500)
+    system = "你是一个新闻编辑助手。"
+
+    assert budget.available(system) == 500 - counter.count(system)
+    fitted = budget.fit([Section("body", "正文" * 1000)], system)
+    assert counter.count(fitted["body"]) <= budget.available(system)
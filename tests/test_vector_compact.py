@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.config import VectorDBConfig
+from src.services.vector_compact import VectorCompactJob
+from src.storage.db import Article, Database
+from src.storage.vector_store import VectorStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.upsert_articles([
+        Article(
+            feed_name="hn",
+            title=f"title {i}",
+            url=f"https://example.com/{i}",
+            published_at=datetime(2024, 5, 1),
+            fetched_at=datetime(2024, 5, 1),
+        )
+        for i in range(3)
+    ])
+    return db
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = VectorStore(
+        VectorDBConfig(path=str(tmp_path / "vectors"), collection="test", backend="numpy")
+    )
+    yield store
+    store.backend.close()
+
+
+def add_vectors(store: VectorStore, article_ids: list[int]) -> None:
+    vectors = np.random.default_rng(0).normal(size=(len(article_ids), 8))
+    store.backend.upsert(
+        [f"article_{i}" for i in article_ids],
+        vectors.tolist(),
+        ["doc"] * len(article_ids),
+        [{"article_id": i} for i in article_ids],
+    )
+
+
+def test_compaction_is_skipped_when_nothing_is_deleted(db, store, monkeypatch):
+    add_vectors(store, sorted(db.get_article_ids()))
+    calls = []
+    monkeypatch.setattr(store.backend, "compact", lambda: calls.append(1))
+
+    stats = VectorCompactJob(db, store).run()
+
+    assert stats.orphans == 0
+    assert not stats.compacted
+    assert calls == []
+
+
+def test_orphans_are_deleted_and_compacted(db, store):
+    add_vectors(store, [*sorted(db.get_article_ids()), 100, 101])
+
+    stats = VectorCompactJob(db, store).run()
+
+    assert stats.orphans == 2
+    assert stats.compacted
+    assert stats.count_after == 3
+    assert store.backend.rows == 3
+
+
+def test_pending_tombstones_trigger_compaction(db, store):
+    add_vectors(store, sorted(db.get_article_ids()))
+    store.backend.delete(ids=["article_1"])
+    assert store.backend.needs_compaction()
+
+    stats = VectorCompactJob(db, store).run()
+
+    assert stats.compacted
+    assert not store.backend.needs_compaction()
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.config import VectorDBConfig
+from src.storage.db import Article
+from src.storage.vector_store import VectorStore, epoch_seconds
+
+
+def test_build_where_bare_dates_compare_date_key():
+    where = VectorStore._build_where(start_date="2024-05-01", end_date="2024-05-03")
+    assert where == {
+        "$and": [
+            {"date_key": {"$gte": 20240501}},
+            {"date_key": {"$lte": 20240503}},
+        ]
+    }
+
+
+def test_build_where_iso_datetime_strings_compare_published_ts():
+    where = VectorStore._build_where(start_date="2024-05-01T08:00:00")
+    expected = int(datetime(2024, 5, 1, 8, tzinfo=timezone.utc).timestamp())
+    assert where == {"published_ts": {"$gte": expected}}
+
+    where = VectorStore._build_where(end_date="2024-05-01T08:00:00+08:00")
+    assert where == {"published_ts": {"$lte": expected - 8 * 3600}}
+
+
+def test_build_where_datetime_and_feed():
+    start = datetime(2024, 5, 1, 12, 30)
+    where = VectorStore._build_where(feed_name="hn", start_date=start)
+    assert where == {
+        "$and": [
+            {"feed_name": {"$eq": "hn"}},
+            {"published_ts": {"$gte": epoch_seconds(start)}},
+        ]
+    }
+
+
+def test_build_where_without_filters():
+    assert VectorStore._build_where() is None
+
+
+def test_build_where_rejects_invalid_dates():
+    with pytest.raises(ValueError):
+        VectorStore._build_where(start_date="last tuesday")
+
+
+def make_article(**overrides) -> Article:
+    fields = {
+        "id": 1,
+        "feed_name": "hn",
+        "title": "标题",
+        "url": "https://example.com/1",
+        "summary": "摘要",
+        "content": "正文",
+        "published_at": datetime(2024, 5, 1, 8),
+        "fetched_at": datetime(2024, 5, 1, 9),
+    }
+    return Article(**{**fields, **overrides})
+
+
+def make_store(tmp_path, **overrides) -> VectorStore:
+    return VectorStore(
+        VectorDBConfig(path=str(tmp_path), collection="test", backend="numpy", **overrides)
+    )
+
+
+def test_content_hash_changes_with_embedding_runtime(tmp_path):
+    article = make_article()
+    torch_hash = make_store(tmp_path / "a").content_hash(article)
+    onnx_hash = make_store(tmp_path / "b", embedding_runtime="onnx-int8").content_hash(article)
+    assert torch_hash != onnx_hash
+
+
+def test_content_hash_ignores_body_unless_chunking(tmp_path):
+    store = make_store(tmp_path)
+    assert store.content_hash(make_article()) == store.content_hash(make_article(content="新正文"))
+
+    chunked = make_store(tmp_path / "chunked", max_chunks_per_article=4)
+    assert chunked.content_hash(make_article()) != chunked.content_hash(
+        make_article(content="新正文")
+    )